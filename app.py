@@ -1,111 +1,308 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
 import datetime
-import time
 import pytz
 import random
 import json
 import os
-import re
+from importlib.util import find_spec
 
 # --- TENTATIVA DE IMPORTAÇÃO DE BIBLIOTECAS EXTERNAS ---
-try:
-    from streamlit_gsheets import GSheetsConnection
-    import plotly.graph_objects as go
-except ImportError as e:
-    st.error(f"❌ Erro Crítico de Instalação: {e}")
+# Só confere se estão instaladas: plotly e st-gsheets-connection são pesados e
+# são importados quando usados (primeira tabela / conexão com o Google Sheets)
+faltando = [m for m in ("streamlit_gsheets", "plotly") if find_spec(m) is None]
+if faltando:
+    st.error(f"❌ Erro Crítico de Instalação: módulo(s) ausente(s): {', '.join(faltando)}")
     st.info("Verifique se o arquivo 'requirements.txt' contém: st-gsheets-connection e plotly")
     st.stop()
 
+from volei.armazenamento import BackendPlanilhas, BackendSQLite, SincronizadorPlanilhas
+from volei.cache_liga import CacheLiga
+from volei.concorrencia import alteracoes_entre, novo_jogador
+from volei.conexao_google import ConexaoGoogle
+from volei.conexao_local import ConexaoLocal
+from volei.cota import ConexaoComCota
+from volei.diario import Diario
+from volei.elo import K_FACTOR, ReplayElo, estimar_elo_inicial, time_vencedor
+from volei.fila_escrita import FilaEscrita
+from volei.equilibrio import MOTORES
+from volei.estado import ArmazemEstado, ConflitoEstado
+from volei.historico import CacheHistorico
+from volei.indice_historico import FORMATO_DATA
+from volei.quadras import dividir_quadras
+from volei.rotacao import limite_atingido, nova_quadra, proxima_rodada, registrar_vitoria, substituir
+from volei.rastreamento import ConexaoRastreada, Rastreador, resumir
+from volei.ratings import MOTORES_RATING, IncertezasRating, ReplayLote, aplicar_partida, criar_motor
+from volei.sinergia import MatrizesSinergia
+from volei.tabelas import montar_figura, paginar
+from volei.times import Time
+
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Vôlei Manager", page_icon="🏐", layout="wide")
 st.title("🏐 Vôlei Manager")
 
 # --- CONSTANTES ---
-K_FACTOR = 32
 ARQUIVO_PREF_GLOBAL = "user_pref.json" 
+ROTULOS_RATING = {"elo": f"Elo (K={K_FACTOR})", "glicko2": "Glicko-2"}
+
+def config_app(chave, padrao=None):
+    """Lê opções da seção [volei] do secrets.toml (com valor padrão se ausente)."""
+    try:
+        return st.secrets.get("volei", {}).get(chave, padrao)
+    except Exception:
+        return padrao
+
+# --- MEDIÇÃO DE DESEMPENHO (uma execução por rerun) ---
+@st.cache_resource
+def obter_rastreador():
+    return Rastreador(arquivo_log=config_app("log_desempenho"))
+
+rastreador = obter_rastreador()
+
+def fechar_execucao(execucao, interrompida=False):
+    rastreador.finalizar_execucao(execucao, interrompida=interrompida)
+    recentes = st.session_state.setdefault('execucoes_recentes', [])
+    recentes.append({"Grupo": execucao['rotulo'], "Total (ms)": execucao['total_ms'], "Interrompida": interrompida})
+    del recentes[:-20]
+
+# A execução anterior que parou num st.rerun()/st.stop() não chegou ao fim do script: fecha aqui
+if st.session_state.get('execucao_atual') and 'total_ms' not in st.session_state['execucao_atual']:
+    fechar_execucao(st.session_state['execucao_atual'], interrompida=True)
+execucao = rastreador.iniciar_execucao(st.session_state.get('grupo_atual') or "")
+st.session_state['execucao_atual'] = execucao
 
 # --- CONEXÃO DEFENSIVA ---
+@st.cache_resource
+def obter_conexao_local(pasta, latencia=0.0, cota_por_minuto=None, taxa_falhas=0.0):
+    return ConexaoLocal(pasta, latencia=latencia, cota_por_minuto=cota_por_minuto, taxa_falhas=taxa_falhas)
+
+@st.cache_resource
+def obter_conexao_google():
+    from streamlit_gsheets import GSheetsConnection
+    # Operações por linha pela API pública do gspread, com a mesma Service Account
+    return ConexaoGoogle(st.connection("gsheets", type=GSheetsConnection), st.secrets["connections"]["gsheets"])
+
+@st.cache_resource
+def obter_conexao_com_cota(_conn, limite_por_minuto, id_conexao):
+    # Um orçamento por conexão e processo: todas as sessões e threads dividem a mesma cota do Google
+    return ConexaoComCota(_conn, limite_por_minuto=limite_por_minuto)
+
 try:
-    conn = st.connection("gsheets", type=GSheetsConnection)
+    if config_app("offline", False):
+        # Planilhas simuladas em CSV local: o app inteiro roda sem internet
+        conn = obter_conexao_local(config_app("pasta_offline", "dados_locais"), config_app("latencia_offline", 0.0),
+                                   config_app("cota_offline"), config_app("taxa_falhas_offline", 0.0))
+    else:
+        conn = obter_conexao_google()
 except Exception as e:
     st.error("🚨 ERRO DE CONEXÃO COM O GOOGLE SHEETS")
     st.markdown(f"**Detalhe do erro:** `{e}`")
     st.stop()
 
+# Toda chamada respeita a cota por minuto e repete erros 429/5xx; a medição fica por fora (inclui as esperas)
+conn_cota = obter_conexao_com_cota(conn, config_app("cota_por_minuto", 60), id(conn))
+# Mede leituras/escritas (as da fila e do sincronizador caem em "segundo plano")
+conn = ConexaoRastreada(conn_cota, rastreador)
+
+# --- BACKEND DE ARMAZENAMENTO ---
+@st.cache_resource
+def obter_backend(tipo):
+    planilhas = BackendPlanilhas(conn)
+    if tipo != "sqlite": return planilhas, None
+    # SQLite é o caminho rápido; a planilha vira espelho sincronizado em segundo plano
+    local = BackendSQLite(config_app("arquivo_sqlite", "volei.db"), espelho=planilhas)
+    sincronizador = SincronizadorPlanilhas(
+        local, intervalo=config_app("sincronizar_segundos", 30),
+        intervalo_leitura=config_app("ler_planilha_segundos", 300)
+    ).iniciar()
+    return local, sincronizador
+
+backend, sincronizador = obter_backend(config_app("armazenamento", "planilhas"))
+
+@st.cache_resource
+def obter_fila_escrita():
+    # Uma fila por processo: resultados de todas as sessões saem na mesma thread
+    return FilaEscrita(
+        backend, arquivo=config_app("arquivo_fila", "fila_escrita.jsonl"),
+        ao_enviar=sincronizador.agendar if sincronizador else None
+    ).iniciar()
+
+fila_escrita = obter_fila_escrita()
+
+# --- CACHE DO HISTÓRICO (compartilhado entre abas, reruns e sessões) ---
+@st.cache_resource
+def obter_cache_historico():
+    return CacheHistorico(
+        backend.ler_historico,
+        intervalo=config_app("revalidar_historico_segundos", 300)
+    )
+
+cache_historico = obter_cache_historico()
+
+# --- CACHE DO ELENCO (um por processo, compartilhado pelas sessões) ---
+def ler_jogadores_rastreado():
+    with rastreador.trecho("carregar elenco") as etapa:
+        df = backend.ler_jogadores(ttl=0)
+        etapa['linhas'] = len(df)
+        return df
+
+def ao_carregar_elenco(elenco):
+    # O backend ainda não tem o que está na fila de escrita: soma por cima para o elenco já refletir
+    elenco.somar_alteracoes(fila_escrita.alteracoes_pendentes())
+    # Grupos criados direto na planilha entram no registro Meta (só grava se houver novidade)
+    fila_escrita.completar_meta(elenco.grupos())
+
+@st.cache_resource
+def obter_cache_liga():
+    return CacheLiga(ler_jogadores_rastreado, ao_carregar=ao_carregar_elenco)
+
+cache_liga = obter_cache_liga()
+
+# Dados trazidos da planilha pelo sincronizador (edição manual) invalidam as cópias em memória
+versao_backend = getattr(backend, 'versao', 0)
+cache_historico.acompanhar_origem(versao_backend)
+cache_liga.acompanhar('backend', versao_backend)
+
+# Outro processo gravou por cima do elenco em memória (conflito resolvido na fila): relê quando a fila esvaziar
+if not fila_escrita.status()['pendentes']:
+    cache_liga.acompanhar('fila', fila_escrita.versao)
+
 # --- GERENCIAMENTO DE ARQUIVOS DE ESTADO (PERSISTÊNCIA) ---
-def get_arquivo_estado(nome_grupo):
-    if not nome_grupo: return None
-    nome_seguro = re.sub(r'[^\w\s-]', '', nome_grupo).strip().replace(' ', '_')
-    return f"state_{nome_seguro}.json"
+@st.cache_resource
+def obter_armazem_estado():
+    # Um só armazém por processo: todas as sessões enxergam as mesmas versões
+    return ArmazemEstado(atraso=config_app("salvar_estado_segundos", 0.5))
+
+armazem_estado = obter_armazem_estado()
+
+@st.cache_resource
+def obter_matrizes_sinergia():
+    # Parcerias/confrontos por grupo, salvas ao lado do estado (sinergia_<grupo>.json)
+    armazem = ArmazemEstado(atraso=config_app("salvar_sinergia_segundos", 2.0), prefixo="sinergia")
+    return MatrizesSinergia(armazem)
+
+matrizes_sinergia = obter_matrizes_sinergia()
+
+@st.cache_resource
+def obter_incertezas_rating():
+    # RD/volatilidade dos motores com incerteza por jogador (rating_<grupo>.json); o rating fica na coluna Elo
+    return IncertezasRating(ArmazemEstado(atraso=config_app("salvar_sinergia_segundos", 2.0), prefixo="rating"))
+
+incertezas_rating = obter_incertezas_rating()
+
+# --- DIÁRIO DA QUADRA (volei/diario.py) ---
+def recuperar_diario(diario):
+    """
+    Na abertura do processo: resultados anotados que não chegaram à fila de escrita entram nela, e
+    estados de quadra (state_<grupo>.json) mais antigos que o diário são refeitos a partir dele.
+    """
+    pendentes = diario.pendentes()
+    for evento in pendentes:
+        # None: a fila já tinha gravado este resultado (só a confirmação se perdeu)
+        novo = fila_escrita.enfileirar(evento['dados']['alteracoes'], evento['dados']['historico'], id_item=evento['id'])
+        diario.confirmar(evento['id'])
+        if novo: cache_historico.registrar(evento['dados']['historico'])
+    if pendentes: cache_liga.invalidar()  # a releitura soma as alterações que acabaram de entrar na fila
+    grupos = []
+    for grupo in diario.grupos():
+        estado, versao = armazem_estado.carregar(grupo)
+        seq = diario.seq_grupo(grupo)
+        if (estado or {}).get('seq_diario', 0) >= seq: continue
+        armazem_estado.salvar(grupo, {**(estado or {}), **diario.estado(grupo), 'seq_diario': seq}, versao, forcar=True)
+        grupos.append(grupo)
+    diario.recuperacao.update(resultados=len(pendentes), grupos=grupos)
+    if diario.status()['eventos']: diario.compactar()
+
+@st.cache_resource
+def obter_diario():
+    return Diario(config_app("arquivo_diario", "diario.jsonl"), compactar_a_cada=config_app("diario_compactar_eventos", 500))
+
+diario = obter_diario()
+# Abertura do processo, com fila de escrita, elenco compartilhado e estado em disco já criados
+diario.abrir(recuperar_diario)
+
+CONFIG_GRUPO = {'config_tamanho_time': 6, 'config_limite_vitorias': 3, 'config_quadras': 1, 'config_motor_rating': 'elo'}
+
+def estado_quadra():
+    """Quadra e configurações do grupo atual no formato do state_<grupo>.json (só nomes nos times)."""
+    jogo = st.session_state.get('jogo_atual')
+    estado = {c: st.session_state.get(c, []) for c in ('todos_presentes', 'todos_levantadores', 'fila_espera', 'quadras')}
+    estado.update(streak_vitorias=st.session_state.get('streak_vitorias', 0),
+                  time_vencedor_anterior=st.session_state.get('time_vencedor_anterior'),
+                  ultimos_times=st.session_state.get('ultimos_times'),
+                  jogo_atual={'A': list(jogo['A'].nomes), 'B': list(jogo['B'].nomes)} if jogo else None)
+    estado.update({c: st.session_state.get(c, padrao) for c, padrao in CONFIG_GRUPO.items()})
+    return estado
+
+def registrar_evento(tipo, dados):
+    """Anota o evento no diário antes de qualquer efeito (sessão, estado em disco, fila de escrita)."""
+    return diario.registrar(st.session_state['grupo_atual'], tipo, dados, base=estado_quadra)
 
-def salvar_estado_disco():
+def salvar_estado_disco(forcar=False):
     grupo = st.session_state.get('grupo_atual')
     if not grupo or grupo == "➕ Criar novo...": return
-
-    arquivo = get_arquivo_estado(grupo)
-    
-    estado = {
-        'fila_espera': st.session_state.get('fila_espera', []),
-        'streak_vitorias': st.session_state.get('streak_vitorias', 0),
-        'time_vencedor_anterior': st.session_state.get('time_vencedor_anterior', None),
-        'todos_presentes': st.session_state.get('todos_presentes', []),
-        'todos_levantadores': st.session_state.get('todos_levantadores', []),
-        'config_tamanho_time': st.session_state.get('config_tamanho_time', 6),
-        'config_limite_vitorias': st.session_state.get('config_limite_vitorias', 3),
-        'jogo_atual_serializado': None
-    }
-    
-    if 'jogo_atual' in st.session_state:
-        estado['jogo_atual_serializado'] = {
-            'A': st.session_state['jogo_atual']['A'].to_dict('records'),
-            'B': st.session_state['jogo_atual']['B'].to_dict('records')
-        }
+    # Times só com os nomes: Elo/Partidas vêm do elenco ao restaurar. seq_diario: último evento
+    # do diário que este estado já inclui (ver recuperar_diario)
+    estado = {**estado_quadra(), 'seq_diario': diario.seq_grupo(grupo)}
         
     try:
-        with open(arquivo, 'w') as f:
-            json.dump(estado, f)
+        with rastreador.trecho("salvar estado"):
+            st.session_state['versao_estado'] = armazem_estado.salvar(
+                grupo, estado, st.session_state.get('versao_estado', 0), forcar=forcar
+            )
+    except ConflitoEstado:
+        # Outra sessão mexeu na quadra deste grupo: adota o estado dela em vez de sobrescrever
+        carregar_estado_disco(grupo)
+        st.session_state['aviso_pendente'] = "⚠️ A quadra deste grupo foi alterada em outro aparelho. Estado atualizado."
     except Exception as e:
         print(f"Erro ao salvar cache local: {e}")
 
 def limpar_estado_memoria():
     keys_to_reset = [
         'fila_espera', 'streak_vitorias', 'time_vencedor_anterior', 
-        'todos_presentes', 'todos_levantadores', 'jogo_atual'
+        'todos_presentes', 'todos_levantadores', 'jogo_atual', 'ultimos_times', 'ultimo_sorteio',
+        'quadras', 'sorteio_quadras'
     ]
     for k in keys_to_reset:
         if k in st.session_state:
             del st.session_state[k]
-    st.session_state['config_tamanho_time'] = 6
-    st.session_state['config_limite_vitorias'] = 3
+    st.session_state.update(CONFIG_GRUPO)
 
 def carregar_estado_disco(grupo_alvo):
-    arquivo = get_arquivo_estado(grupo_alvo)
-    if arquivo and os.path.exists(arquivo):
-        try:
-            with open(arquivo, 'r') as f:
-                estado = json.load(f)
-                
-            st.session_state['fila_espera'] = estado.get('fila_espera', [])
-            st.session_state['streak_vitorias'] = estado.get('streak_vitorias', 0)
-            st.session_state['time_vencedor_anterior'] = estado.get('time_vencedor_anterior', None)
-            st.session_state['todos_presentes'] = estado.get('todos_presentes', [])
-            st.session_state['todos_levantadores'] = estado.get('todos_levantadores', [])
-            st.session_state['config_tamanho_time'] = int(estado.get('config_tamanho_time', 6))
-            st.session_state['config_limite_vitorias'] = int(estado.get('config_limite_vitorias', 3))
-            
-            if estado.get('jogo_atual_serializado'):
-                st.session_state['jogo_atual'] = {
-                    'A': pd.DataFrame(estado['jogo_atual_serializado']['A']),
-                    'B': pd.DataFrame(estado['jogo_atual_serializado']['B'])
-                }
-            else:
-                if 'jogo_atual' in st.session_state: del st.session_state['jogo_atual']
-            return True
-        except Exception as e:
-            st.warning(f"Não foi possível restaurar sessão anterior: {e}")
-            return False
-    return False
+    with rastreador.trecho("carregar estado"):
+        estado, versao = armazem_estado.carregar(grupo_alvo)
+    st.session_state['versao_estado'] = versao
+    if estado is None: return False
+    try:
+        st.session_state['fila_espera'] = estado.get('fila_espera', [])
+        st.session_state['streak_vitorias'] = estado.get('streak_vitorias', 0)
+        st.session_state['time_vencedor_anterior'] = estado.get('time_vencedor_anterior', None)
+        st.session_state['ultimos_times'] = estado.get('ultimos_times', None)
+        st.session_state['todos_presentes'] = estado.get('todos_presentes', [])
+        st.session_state['todos_levantadores'] = estado.get('todos_levantadores', [])
+        st.session_state['config_tamanho_time'] = int(estado.get('config_tamanho_time', 6))
+        st.session_state['config_limite_vitorias'] = int(estado.get('config_limite_vitorias', 3))
+        st.session_state['config_quadras'] = int(estado.get('config_quadras', 1))
+        st.session_state['config_motor_rating'] = estado.get('config_motor_rating', 'elo')
+        st.session_state['quadras'] = estado.get('quadras', [])
+        
+        jogo = estado.get('jogo_atual')
+        if not jogo and estado.get('jogo_atual_serializado'):
+            # Formato antigo: registros completos dos jogadores
+            jogo = {lado: [r['Nome'] for r in regs] for lado, regs in estado['jogo_atual_serializado'].items()}
+        if jogo:
+            elenco = carregar_dados()
+            st.session_state['jogo_atual'] = {
+                'A': Time.do_elenco(elenco, grupo_alvo, jogo['A']),
+                'B': Time.do_elenco(elenco, grupo_alvo, jogo['B'])
+            }
+        else:
+            if 'jogo_atual' in st.session_state: del st.session_state['jogo_atual']
+        return True
+    except Exception as e:
+        st.warning(f"Não foi possível restaurar sessão anterior: {e}")
+        return False
 
 # --- FUNÇÕES DE PREFERÊNCIA DO USUÁRIO ---
 def salvar_preferencia_usuario(nome_grupo):
@@ -123,12 +320,15 @@ def obter_grupo_inicial(grupos_disponiveis):
                 ultimo = dados.get("ultimo_grupo")
                 if ultimo in grupos_disponiveis: return ultimo
         except: pass
-    try:
-        df_h = conn.read(worksheet="Historico", ttl=60)
-        if not df_h.empty:
-            ultimo_ativo = df_h.iloc[-1]['Grupo']
+    ultimo_meta = fila_escrita.meta().get("ultimo_grupo")
+    if ultimo_meta in grupos_disponiveis: return ultimo_meta
+    if not ultimo_meta:
+        try:
+            # Planilha sem registro Meta: descobre pelo histórico (uma vez) e guarda para as próximas aberturas
+            ultimo_ativo = cache_historico.ultimo_grupo()
+            fila_escrita.completar_meta(grupos_disponiveis, ultimo_ativo)
             if ultimo_ativo in grupos_disponiveis: return ultimo_ativo
-    except: pass
+        except: pass
     if grupos_disponiveis: return grupos_disponiveis[0]
     return None
 
@@ -143,7 +343,11 @@ def inicializar_session_state():
         'grupo_atual': None,
         'modo_substituicao': False,
         'config_tamanho_time': 6,
-        'config_limite_vitorias': 3
+        'config_limite_vitorias': 3,
+        'config_quadras': 1,
+        'quadras': [],
+        'config_motor_equilibrio': 'auto',
+        'config_motor_rating': 'elo'
     }
     for chave, valor in chaves_padrao.items():
         if chave not in st.session_state:
@@ -151,124 +355,82 @@ def inicializar_session_state():
 
 inicializar_session_state()
 
+# Avisos disparados logo antes de um st.rerun() aparecem na execução seguinte
+if 'aviso_pendente' in st.session_state:
+    st.toast(st.session_state.pop('aviso_pendente'))
+
 # --- FUNÇÕES DE DADOS E VISUALIZAÇÃO ---
 def carregar_dados():
-    if 'cache_jogadores' in st.session_state:
-        return st.session_state['cache_jogadores']
     try:
-        df = conn.read(worksheet="Jogadores", ttl=60) 
-        df = df.dropna(how="all")
-        cols_num = ['Elo', 'Partidas', 'Vitorias']
-        for c in cols_num:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0 if c != 'Elo' else 1200)
-        st.session_state['cache_jogadores'] = df
-        return df
+        elenco = cache_liga.elenco()
+        if not st.session_state.get('sessao_contada'):
+            cache_liga.registrar_sessao()
+            st.session_state['sessao_contada'] = True
+        return elenco
     except Exception as e:
         st.error(f"Erro ao ler a aba 'Jogadores': {e}")
         st.stop()
 
-def exibir_tabela_plotly(df, colunas_mostrar, destacar_vencedor=False):
+LINHAS_POR_PAGINA = 15
+
+def exibir_tabela_plotly(df, colunas_mostrar, destacar_vencedor=False, chave="tabela"):
     """
     Gera tabela Plotly com cálculo estrito de largura e cores.
+    Só a página atual é montada e enviada ao navegador.
     """
     if df.empty: return
-    
-    fill_colors = []
-    font_colors = []
-    
-    # --- CÁLCULO AGRESSIVO DE LARGURA (Auto-Fit) ---
-    larguras = []
-    for col in colunas_mostrar:
-        # Pega o tamanho do cabeçalho
-        len_header = len(str(col))
-        
-        # Pega o tamanho do maior item da coluna
-        if not df[col].empty:
-            len_content = df[col].astype(str).map(len).max()
-        else:
-            len_content = 0
-            
-        # O tamanho final é o maior entre cabeçalho e conteúdo
-        final_len = max(len_header, len_content)
-        
-        # Ajuste fino: Colunas muito curtas (ex: Elo, Pos) precisam de um pouco mais de "ar"
-        # Colunas longas (Nomes) precisam de menos "ar" proporcional
-        if final_len < 5:
-            width_val = final_len * 1.5
-        else:
-            width_val = final_len * 0.9 # Comprime levemente textos longos
-            
-        larguras.append(width_val)
-
-    # --- LÓGICA DE CORES E CONTRASTE ESTRITA ---
-    for col in colunas_mostrar:
-        col_fill = []
-        col_font = []
-        for _, row in df.iterrows():
-            # Default: Fundo Escuro (#262730) -> Texto Branco
-            bg_color = "#262730"
-            txt_color = "white"   
-            
-            # 1. Patentes (Prioridade Baixa)
-            if 'Patente' in row:
-                pat = str(row['Patente'])
-                if "Iniciante" in pat: 
-                    bg_color = "#f1c40f"; txt_color = "black"
-                elif "Amador" in pat: 
-                    bg_color = "#d4ac0d"; txt_color = "black"
-                elif "Intermediário" in pat: 
-                    bg_color = "#1abc9c"; txt_color = "black"
-                elif "Avançado" in pat: 
-                    bg_color = "#3498db"; txt_color = "black"
-                elif "Lenda" in pat: 
-                    bg_color = "#2c3e50"; txt_color = "white"
-            
-            # 2. Vencedor (Prioridade Alta - Sobrescreve Patente)
-            if destacar_vencedor:
-                venc = str(row.get('Vencedor', ''))
-                # Time A Venceu -> Verde Claro -> Texto PRETO
-                if col == "Time A" and ("Time A" in venc or "Time_A" in venc):
-                    bg_color = "#d1e7dd"
-                    txt_color = "black" 
-                # Time B Venceu -> Amarelo Claro -> Texto PRETO
-                elif col == "Time B" and ("Time B" in venc or "Time_B" in venc):
-                    bg_color = "#fff3cd"
-                    txt_color = "black"
-
-            col_fill.append(bg_color)
-            col_font.append(txt_color)
-        
-        fill_colors.append(col_fill)
-        font_colors.append(col_font)
-
-    fig = go.Figure(data=[go.Table(
-        columnwidth=larguras, # Aplica a largura calculada
-        header=dict(
-            values=list(colunas_mostrar),
-            fill_color='#0e1117', # Cabeçalho Preto
-            font=dict(color='white', size=12), # CORRIGIDO: Removida a propriedade check_contrast
-            align='left'
-        ),
-        cells=dict(
-            values=[df[k].tolist() for k in colunas_mostrar],
-            fill_color=fill_colors,
-            font=dict(color=font_colors, size=11), # Cores calculadas acima
-            align='left',
-            height=25 # Altura reduzida para compactar verticalmente também
-        )
-    )])
-    
-    # Remove margens para a tabela ocupar tudo e ficar compacta na foto
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=0, b=0), 
-        height=400, # Altura fixa do container
-        paper_bgcolor="#0e1117", # Fundo preto para combinar com Dark Mode
-        autosize=True
-    )
-    
+
+    total_paginas = -(-len(df) // LINHAS_POR_PAGINA)
+    pagina = 1
+    if total_paginas > 1:
+        col_pag, col_info = st.columns([1, 3])
+        with col_pag:
+            pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1,
+                                     key=f"pagina_{chave}", label_visibility="collapsed")
+        with col_info:
+            st.caption(f"Página {pagina} de {total_paginas} ({len(df)} linhas)")
+
+    with rastreador.trecho(f"tabela {chave}", linhas=min(len(df), LINHAS_POR_PAGINA)):
+        df_pagina, _ = paginar(df, pagina, LINHAS_POR_PAGINA)
+        fig = montar_figura(df_pagina, colunas_mostrar, destacar_vencedor)
     st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True, 'displaylogo': False})
 
+def memorizar(nome, chave, calcular):
+    """Reaproveita o último resultado enquanto a chave (grupo, filtro, versões dos dados) não mudar."""
+    guardado = st.session_state.get(nome)
+    if guardado is not None and guardado[0] == chave: return guardado[1]
+    valor = calcular()
+    st.session_state[nome] = (chave, valor)
+    return valor
+
+# --- VISÕES EM FRAGMENTOS ---
+def fragmento(chave, nome):
+    """
+    Visão que reroda sozinha (st.fragment) quando um botão dela é clicado:
+    a quadra não refaz o ranking nem o histórico, e vice-versa.
+    """
+    def decorar(funcao):
+        @st.fragment(key=chave)
+        def executar():
+            # Rerun só do fragmento: o topo do script não rodou, então abre uma execução própria
+            propria = rastreador.iniciar_execucao(f"{st.session_state.get('grupo_atual') or ''} ({nome})") if rastreador.atual() is None else None
+            if 'aviso_pendente' in st.session_state:
+                st.toast(st.session_state.pop('aviso_pendente'))
+            try:
+                with rastreador.trecho(f"visão {nome}"):
+                    funcao()
+            finally:
+                if propria: fechar_execucao(propria)
+        return executar
+    return decorar
+
+def rerun_visao():
+    """Reroda só o fragmento que chamou; numa execução completa do script, o app inteiro."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
 
 # --- FUNÇÕES LÓGICAS ---
 def realizar_substituicao(jogador_saindo, time_alvo_str):
@@ -276,122 +438,172 @@ def realizar_substituicao(jogador_saindo, time_alvo_str):
         st.toast("⚠️ A fila de espera está vazia!")
         return
 
-    jogador_entrando = st.session_state['fila_espera'].pop(0) 
-    st.session_state['fila_espera'].append(jogador_saindo)
-    
-    time_df = st.session_state['jogo_atual'][time_alvo_str]
-    df_geral = st.session_state['cache_jogadores']
-    
-    dados_novo_lista = df_geral[(df_geral['Nome'] == jogador_entrando) & (df_geral['Grupo'] == st.session_state['grupo_atual'])]
-    if dados_novo_lista.empty:
-        st.error(f"Erro: Jogador {jogador_entrando} não encontrado no grupo atual.")
+    elenco = carregar_dados()
+    nomes, elos, partidas = elenco.valores(st.session_state['grupo_atual'], st.session_state['fila_espera'][:1])
+    if not nomes:
+        st.error(f"Erro: Jogador {st.session_state['fila_espera'][0]} não encontrado no grupo atual.")
         return
-        
-    dados_novo = dados_novo_lista.iloc[0]
-    idx_sair = time_df[time_df['Nome'] == jogador_saindo].index
-    time_df = time_df.drop(idx_sair)
-    novo_df = pd.DataFrame([dados_novo])
-    time_df = pd.concat([time_df, novo_df], ignore_index=True)
-    
-    st.session_state['jogo_atual'][time_alvo_str] = time_df
-    salvar_estado_disco()
-    st.rerun()
 
-def calcular_novo_elo(rating_vencedor, rating_perdedor):
-    expectativa_vencedor = 1 / (1 + 10 ** ((rating_perdedor - rating_vencedor) / 400))
-    return rating_vencedor + K_FACTOR * (1 - expectativa_vencedor)
+    time_ = st.session_state['jogo_atual'][time_alvo_str]
+    if jogador_saindo in time_:
+        registrar_evento('substituicao', {'quadra': None, 'lado': time_alvo_str, 'saindo': jogador_saindo, 'entrando': nomes[0]})
+        # O time é alterado no lugar: quem entra fica na posição de quem saiu
+        time_.substituir(jogador_saindo, nomes[0], elos[0], partidas[0])
+        st.session_state['fila_espera'] = st.session_state['fila_espera'][1:] + [jogador_saindo]
+    salvar_estado_disco()
+    rerun_visao()
 
-def distribuir_times_equilibrados(pool_nomes, levantadores_selecionados, tamanho_time, df_jogadores, pre_time_a=None, pre_time_b=None):
-    df_pool = df_jogadores[df_jogadores['Nome'].isin(pool_nomes)].copy()
-    levs = df_pool[df_pool['Nome'].isin(levantadores_selecionados)].sort_values(by='Elo', ascending=False).to_dict('records')
-    outros = df_pool[~df_pool['Nome'].isin(levantadores_selecionados)].sort_values(by='Elo', ascending=False).to_dict('records')
+def registrar_partida(time_venc, time_perd, nome_venc_str, grupo_selecionado, t_a_nomes, t_b_nomes, quadra=None):
+    """
+    Aplica o rating da partida (motor do grupo) no elenco, anota o resultado no diário e o enfileira
+    para gravação. time_venc/time_perd: Time (volei/times.py); quadra: índice no modo de várias
+    quadras. Retorna o delta do vencedor.
+    """
+    motor = criar_motor(st.session_state.get('config_motor_rating', 'elo'))
+    extras = incertezas_rating.do_grupo(grupo_selecionado)
+    with incertezas_rating.lock:
+        deltas = aplicar_partida(motor, {**time_venc.ratings(), **time_perd.ratings()}, extras, time_venc.nomes,
+                                 time_perd.nomes, {**time_venc.jogos(), **time_perd.jogos()})
+    # No Elo todos do time variam igual; nos outros motores o histórico guarda a média do time vencedor
+    delta = sum(deltas[n] for n in time_venc.nomes) / len(time_venc)
+    elenco = carregar_dados()
     
-    time_a = pre_time_a if pre_time_a else []
-    time_b = pre_time_b if pre_time_b else []
+    fuso_br = pytz.timezone('America/Sao_Paulo')
+    novo_registro = {
+        "Data": datetime.datetime.now(fuso_br).strftime(FORMATO_DATA),
+        "Time A": ", ".join(t_a_nomes),
+        "Time B": ", ".join(t_b_nomes),
+        "Vencedor": nome_venc_str,
+        "Pontos_Elo": f"'{delta:+.1f}",
+        "Grupo": grupo_selecionado
+    }
     
-    if pre_time_a:
-        df_pre_a = df_jogadores[df_jogadores['Nome'].isin(pre_time_a)].to_dict('records')
-        time_a = df_pre_a
-    if pre_time_b:
-        df_pre_b = df_jogadores[df_jogadores['Nome'].isin(pre_time_b)].to_dict('records')
-        time_b = df_pre_b
-
-    def alocar(jogador):
-        if len(time_a) < tamanho_time and len(time_b) < tamanho_time:
-            elo_a = sum(p['Elo'] for p in time_a)
-            elo_b = sum(p['Elo'] for p in time_b)
-            if elo_a <= elo_b: time_a.append(jogador)
-            else: time_b.append(jogador)
-        elif len(time_a) < tamanho_time: time_a.append(jogador)
-        elif len(time_b) < tamanho_time: time_b.append(jogador)
-
-    for p in levs: alocar(p)
-    for p in outros: alocar(p)
-    return pd.DataFrame(time_a), pd.DataFrame(time_b)
+    # Elenco compartilhado entre sessões: ler a base, aplicar e enfileirar sem ninguém no meio
+    with cache_liga.lock:
+        antes = elenco.registros(grupo_selecionado, time_venc.nomes + time_perd.nomes)
+        alteradas = elenco.aplicar_partida(grupo_selecionado, time_venc.nomes, time_perd.nomes,
+                                           deltas if motor.extras else delta)
+        depois = elenco.registros(grupo_selecionado, [n for _, n in alteradas])
+        alteracoes = alteracoes_entre(antes, depois)
+        # Primeiro o diário: se o processo cair daqui em diante, a abertura seguinte enfileira o resultado
+        evento = registrar_evento('resultado', {'quadra': quadra, 'lado': nome_venc_str[-1], 'A': list(t_a_nomes),
+                                                'B': list(t_b_nomes), 'alteracoes': alteracoes, 'historico': [novo_registro]})
+        try:
+            # Gravação acontece em segundo plano; a tela já segue para a próxima rodada
+            # Vai o delta (e a base em que foi calculado), não o Elo final: ver volei/concorrencia.py
+            fila_escrita.enfileirar(alteracoes, [novo_registro], id_item=evento['id'])
+            diario.confirmar(evento['id'])
+            cache_historico.registrar([novo_registro])
+            matrizes_sinergia.registrar(grupo_selecionado, time_venc.nomes, time_perd.nomes, round(abs(delta), 1))
+        except Exception as e: print(f"Erro ao salvar histórico: {e}")
+    if motor.extras: incertezas_rating.salvar(grupo_selecionado)
+    return delta
+
+# --- QUADRA ÚNICA (regras em volei/rotacao.py) ---
+def elos_do_grupo(elenco, grupo):
+    df = elenco.do_grupo(grupo)
+    return dict(zip(df['Nome'], df['Elo']))
+
+def quadra_unica():
+    """Estado da quadra única no formato de volei.rotacao (os times em jogo ficam em jogo_atual)."""
+    quadra = nova_quadra()
+    quadra.update(streak=st.session_state.get('streak_vitorias', 0),
+                  vencedores=st.session_state.get('time_vencedor_anterior'),
+                  ultimos_times=st.session_state.get('ultimos_times'))
+    return quadra
+
+def guardar_quadra_unica(quadra, elenco, grupo):
+    st.session_state['streak_vitorias'] = quadra['streak']
+    st.session_state['time_vencedor_anterior'] = quadra['vencedores']
+    st.session_state['ultimos_times'] = quadra['ultimos_times']
+    if quadra['A']:
+        st.session_state['jogo_atual'] = {'A': Time.do_elenco(elenco, grupo, quadra['A']),
+                                          'B': Time.do_elenco(elenco, grupo, quadra['B'])}
+    elif 'jogo_atual' in st.session_state: del st.session_state['jogo_atual']
 
 def processar_vitoria(time_venc, time_perd, nome_venc_str, grupo_selecionado, t_a_nomes, t_b_nomes):
-    mv, mp = time_venc['Elo'].mean(), time_perd['Elo'].mean()
-    delta = calcular_novo_elo(mv, mp) - mv
-    df_ram = st.session_state['cache_jogadores']
-    
-    for n in time_venc['Nome']:
-        idx = df_ram.index[(df_ram['Nome'] == n) & (df_ram['Grupo'] == grupo_selecionado)]
-        if not idx.empty:
-            df_ram.loc[idx, 'Elo'] += delta
-            df_ram.loc[idx, 'Partidas'] += 1
-            df_ram.loc[idx, 'Vitorias'] += 1
-    for n in time_perd['Nome']:
-        idx = df_ram.index[(df_ram['Nome'] == n) & (df_ram['Grupo'] == grupo_selecionado)]
-        if not idx.empty:
-            df_ram.loc[idx, 'Elo'] -= delta
-            df_ram.loc[idx, 'Partidas'] += 1
-    
-    conn.update(worksheet="Jogadores", data=df_ram)
-    st.session_state['cache_jogadores'] = df_ram
-    
-    try:
-        fuso_br = pytz.timezone('America/Sao_Paulo')
-        data_hora_atual = datetime.datetime.now(fuso_br).strftime("%d/%m %H:%M")
-        delta_str = f"'{delta:+.1f}"
-        
-        novo_registro = pd.DataFrame([{
-            "Data": data_hora_atual,
-            "Time A": ", ".join(t_a_nomes), 
-            "Time B": ", ".join(t_b_nomes), 
-            "Vencedor": nome_venc_str,
-            "Pontos_Elo": delta_str, 
-            "Grupo": grupo_selecionado
-        }])
-        df_h = conn.read(worksheet="Historico", ttl=0).dropna(how="all")
-        if df_h.empty: conn.update(worksheet="Historico", data=novo_registro)
-        else: conn.update(worksheet="Historico", data=pd.concat([df_h, novo_registro], ignore_index=True))
-    except Exception as e: print(f"Erro ao salvar histórico: {e}")
-    
-    venc_nomes = time_venc['Nome'].tolist()
-    anteriores = st.session_state.get('time_vencedor_anterior', [])
-    if anteriores and set(venc_nomes) == set(anteriores): st.session_state['streak_vitorias'] += 1
-    else:
-        st.session_state['streak_vitorias'] = 1
-        st.session_state['time_vencedor_anterior'] = venc_nomes
-    
-    perdedores = time_perd['Nome'].tolist()
-    st.session_state['fila_espera'] = [p for p in st.session_state['fila_espera'] if p not in perdedores] + perdedores
-    st.toast(f"✅ Salvo! {delta:+.1f} pontos Elo!")
-    if 'jogo_atual' in st.session_state: del st.session_state['jogo_atual']
+    delta = registrar_partida(time_venc, time_perd, nome_venc_str, grupo_selecionado, t_a_nomes, t_b_nomes)
+    # Mesmas regras que o diário aplica ao evento 'resultado' (volei/diario.py)
+    quadra = quadra_unica()
+    quadra.update(A=list(t_a_nomes), B=list(t_b_nomes))
+    quadra, st.session_state['fila_espera'] = registrar_vitoria(
+        quadra, "A" if nome_venc_str == "Time A" else "B", st.session_state['fila_espera'])
+    guardar_quadra_unica(quadra, carregar_dados(), grupo_selecionado)
+    st.session_state['aviso_pendente'] = f"✅ Salvo! {delta:+.1f} pontos Elo!"
     salvar_estado_disco()
-    time.sleep(1)
-    st.rerun()
+    rerun_visao()
+
+# --- VÁRIAS QUADRAS ---
+def sortear_quadras(elenco, grupo, presentes, levantadores, tamanho_time, n_quadras):
+    """Refaz todas as quadras de uma vez, começando por quem está na fila."""
+    fila_real = [p for p in st.session_state['fila_espera'] if p in presentes]
+    resto = [p for p in presentes if p not in fila_real]
+    random.shuffle(resto)
+    r = dividir_quadras(fila_real + resto, elos_do_grupo(elenco, grupo), levantadores, tamanho_time, n_quadras)
+    quadras = []
+    for q in r['quadras']:
+        quadra = nova_quadra()
+        quadra.update(A=q['A'], B=q['B'])
+        quadras.append(quadra)
+    quadras += [nova_quadra() for _ in range(n_quadras - len(quadras))]
+    registrar_evento('sorteio', {'quadras': quadras, 'fila_espera': r['fila']})
+    st.session_state['quadras'] = quadras
+    st.session_state['fila_espera'] = r['fila']
+    st.session_state['sorteio_quadras'] = {k: r[k] for k in ('amplitude', 'diferencas', 'tempo_ms')}
+    salvar_estado_disco()
+    rerun_visao()
+
+def rodada_em_quadra(indice, elenco, grupo, presentes, levantadores, tamanho_time, limite):
+    quadras = st.session_state['quadras']
+    # Ocupados: quem está jogando nas outras quadras e os vencedores que aguardam a próxima rodada delas
+    ocupados = {n for j, q in enumerate(quadras) if j != indice
+                for n in ((q['A'] + q['B']) if q['A'] else (q.get('vencedores') or []))}
+    disponiveis = [p for p in presentes if p not in ocupados]
+    quadra, fila, _ = proxima_rodada(quadras[indice], st.session_state['fila_espera'], disponiveis,
+                                     elos_do_grupo(elenco, grupo), levantadores, tamanho_time, limite,
+                                     motor=st.session_state.get('config_motor_equilibrio', 'auto'))
+    if len(quadra['A']) < tamanho_time or len(quadra['B']) < tamanho_time:
+        st.toast(f"⚠️ Não há jogadores livres suficientes para a Quadra {indice + 1}.")
+        return
+    registrar_evento('sorteio', {'quadra': indice, 'rodada': quadra, 'fila_espera': fila})
+    quadras[indice] = quadra
+    st.session_state['fila_espera'] = fila
+    salvar_estado_disco()
+    rerun_visao()
+
+def vitoria_em_quadra(indice, lado):
+    grupo = st.session_state['grupo_atual']
+    elenco = carregar_dados()
+    quadra = st.session_state['quadras'][indice]
+    outro = 'B' if lado == 'A' else 'A'
+    delta = registrar_partida(Time.do_elenco(elenco, grupo, quadra[lado]), Time.do_elenco(elenco, grupo, quadra[outro]),
+                              f"Time {lado}", grupo, quadra['A'], quadra['B'], quadra=indice)
+    st.session_state['quadras'][indice], st.session_state['fila_espera'] = registrar_vitoria(
+        quadra, lado, st.session_state['fila_espera'])
+    st.session_state['aviso_pendente'] = f"✅ Quadra {indice + 1} salva! {delta:+.1f} pontos Elo!"
+    salvar_estado_disco()
+    rerun_visao()
+
+def substituicao_em_quadra(indice, lado, saindo):
+    resultado = substituir(st.session_state['quadras'][indice], lado, saindo, st.session_state['fila_espera'])
+    if resultado is None:
+        st.toast("⚠️ A fila de espera está vazia!")
+        return
+    registrar_evento('substituicao', {'quadra': indice, 'lado': lado, 'saindo': saindo, 'entrando': resultado[2]})
+    st.session_state['quadras'][indice], st.session_state['fila_espera'], _ = resultado
+    salvar_estado_disco()
+    rerun_visao()
 
 # --- CARREGAMENTO INICIAL ---
-df_geral = carregar_dados()
+# A lista de grupos vem do registro Meta: a barra lateral aparece antes de a aba Jogadores ser lida
+grupos_conhecidos = list(fila_escrita.meta().get("grupos", []))
+if not grupos_conhecidos or cache_liga.carregado():
+    grupos_conhecidos += [g for g in carregar_dados().grupos() if g not in grupos_conhecidos]
 
 # --- SIDEBAR: SELEÇÃO DE GRUPO ---
 with st.sidebar:
     st.header("👥 Grupos")
-    if df_geral is not None and not df_geral.empty:
-        grupos_opcoes = df_geral['Grupo'].unique().tolist()
-    else:
-        grupos_opcoes = []
+    grupos_opcoes = list(grupos_conhecidos)
     
     if st.session_state['grupo_atual'] and st.session_state['grupo_atual'] not in grupos_opcoes and st.session_state['grupo_atual'] != "➕ Criar novo...":
         grupos_opcoes.append(st.session_state['grupo_atual'])
@@ -407,6 +619,7 @@ with st.sidebar:
         if grupo_inicial and grupo_inicial in opcoes_finais:
             idx = opcoes_finais.index(grupo_inicial)
             st.session_state['grupo_atual'] = grupo_inicial
+            carregar_estado_disco(grupo_inicial)
         
     grupo_selecionado = st.selectbox("Selecionar grupo:", opcoes_finais, index=idx)
     
@@ -418,7 +631,7 @@ with st.sidebar:
                 if st.session_state['grupo_atual']: salvar_estado_disco()
                 st.session_state['grupo_atual'] = novo_nome
                 limpar_estado_memoria() 
-                salvar_estado_disco()   
+                salvar_estado_disco(forcar=True)
                 salvar_preferencia_usuario(novo_nome)
                 st.rerun()
         st.stop()
@@ -434,16 +647,12 @@ with st.sidebar:
 
     st.divider()
 
-if df_geral is not None:
-    df_jogadores = df_geral[df_geral['Grupo'] == grupo_selecionado].copy()
-else:
-    df_jogadores = pd.DataFrame()
-
 # --- SIDEBAR: CONFIGURAÇÕES E FILA ---
 with st.sidebar:
     st.header("⚙️ Configurações")
     
     def on_config_change():
+        registrar_evento('configuracao', {c: st.session_state[c] for c in CONFIG_GRUPO})
         salvar_estado_disco()
 
     t_time = st.radio(
@@ -455,6 +664,18 @@ with st.sidebar:
         "Limite de vitórias:", [2, 3, 4, 5, 6], horizontal=True,
         key='config_limite_vitorias', on_change=on_config_change
     )
+
+    st.radio(
+        "Quadras:", [1, 2, 3, 4], horizontal=True, key='config_quadras', on_change=on_config_change,
+        help="Com mais de uma, a chamada é dividida em partidas simultâneas com a fila de espera compartilhada"
+    )
+
+    st.selectbox("Algoritmo de sorteio:", list(MOTORES), key='config_motor_equilibrio',
+                 help="auto/exato: busca a menor diferença de Elo possível; guloso: algoritmo antigo")
+
+    st.selectbox("Rating do grupo:", list(MOTORES_RATING), key='config_motor_rating', on_change=on_config_change,
+                 format_func=lambda m: ROTULOS_RATING.get(m, m),
+                 help="Elo: todos do time ganham/perdem o mesmo. Glicko-2: quem jogou pouco (incerteza alta) anda mais rápido")
     
     st.divider()
     st.subheader("⏳ Fila de espera")
@@ -467,104 +688,307 @@ with st.sidebar:
             salvar_estado_disco() 
             carregar_estado_disco(grupo_selecionado)
             st.cache_data.clear()
-            if 'cache_jogadores' in st.session_state: del st.session_state['cache_jogadores']
+            cache_historico.invalidar()
+            if sincronizador: sincronizador.agendar()
+            cache_liga.invalidar()
             st.rerun()
     with col_btn2:
         if st.button("⚠️ Hard Reset", help="Use se o app travar"):
             st.cache_data.clear()
+            cache_historico.invalidar()
+            cache_liga.invalidar()
             st.session_state.clear()
             if os.path.exists(ARQUIVO_PREF_GLOBAL): os.remove(ARQUIVO_PREF_GLOBAL)
             st.rerun()
 
-# --- ABAS ---
-tab1, tab2, tab3 = st.tabs(["Quadra (Jogo)", "Ranking", "Histórico"])
+    status_fila = fila_escrita.status()
+    if status_fila['falhas']:
+        st.error(f"❌ {status_fila['falhas']} resultado(s) não foram gravados: {status_fila['ultimo_erro']}")
+        if st.button("🔁 Tentar novamente"): fila_escrita.tentar_novamente()
+    elif status_fila['pendentes']:
+        st.caption(f"⏳ {status_fila['pendentes']} resultado(s) sendo gravados...")
+    recuperacao = diario.recuperacao
+    if recuperacao.get('resultados') or recuperacao.get('grupos'):
+        st.caption(f"♻️ Recuperado do diário na abertura: {recuperacao['resultados']} resultado(s), "
+                   f"quadra de {len(recuperacao['grupos'])} grupo(s)")
+    envio = fila_escrita.ultimo_envio
+    if envio:
+        st.caption(f"💾 Última gravação: {envio['linhas']} linha(s), {envio['celulas']} células ({envio['modo']})")
+    if sincronizador:
+        pend = backend.pendentes()
+        if sincronizador.ultimo_erro: st.caption(f"⚠️ Sincronização com a planilha falhou: {sincronizador.ultimo_erro}")
+        elif pend: st.caption(f"☁️ {pend} alteração(ões) aguardando envio à planilha")
+        else: st.caption("☁️ Planilha sincronizada")
+
+# --- FILA DE ESPERA (barra lateral) ---
+def exibir_fila():
+    # Chamada também de dentro da quadra: o fragmento redesenha a fila junto com os times
+    if 'fila_espera' in st.session_state and st.session_state['fila_espera']:
+        fila_visivel = [p for p in st.session_state['fila_espera'] if p in st.session_state.get('todos_presentes', [])]
+        if fila_visivel:
+            txt = "\n".join([f"**{i+1}º** {n}" for i, n in enumerate(fila_visivel)])
+            placeholder_fila.markdown(txt)
+        else: placeholder_fila.caption("Fila vazia (todos presentes jogando).")
+    else: placeholder_fila.caption("Fila vazia.")
+
+# --- FILTRO POR DIA ---
+FILTROS_DIA = ["Geral", "Último dia", "Outro dia"]
+
+def escolher_dia(tipo, chave):
+    """Dia do filtro: None em "Geral", a última sessão do grupo em "Último dia" ou o dia escolhido em "Outro dia"."""
+    if tipo == "Geral": return None
+    grupo = st.session_state['grupo_atual']
+    try: agregados = cache_historico.agregados()
+    except Exception as e:
+        print(f"Erro ao montar agregados por dia: {e}")
+        return None
+    if tipo == "Último dia": return agregados.ultimo_dia(grupo)
+    dias = agregados.dias(grupo)
+    if not dias: return None
+    return st.selectbox("Dia", dias, format_func=lambda d: f"{d:%d/%m/%Y}", key=chave, label_visibility="collapsed")
+
+def legenda_dia(grupo, dia, rotulo):
+    texto = f"📅 {rotulo}: **{dia:%d/%m/%Y}**"
+    resumo = cache_historico.agregados().resumo_do_dia(grupo, dia)
+    if resumo:
+        texto += (f" · {resumo['partidas']} partida(s), {resumo['jogadores']} jogadores"
+                  f" · ⭐ Destaque: **{resumo['destaque']}** ({resumo['saldo_destaque']:+.1f} Elo)"
+                  f" · 🏅 Mais vitórias: **{resumo['mais_vitorias']}** ({resumo['vitorias']})")
+    st.caption(texto)
+
+# --- VISÃO: RANKING ---
+def montar_ranking(df_jogadores, grupo, dia=None):
+    """Tabela do ranking já ordenada e com patentes (só quem jogou em `dia`, se dado)."""
+    df_visual = df_jogadores.copy()
+    if dia is not None:
+        df_visual = df_visual[df_visual['Nome'].isin(cache_historico.agregados().jogadores_do_dia(grupo, dia))]
+
+    df_visual = df_visual.sort_values(by="Elo", ascending=False).reset_index(drop=True)
+    df_visual['Elo'] = df_visual['Elo'].round().astype(int)
+
+    def get_patente_info(elo):
+        if elo < 1000: return "🐣 Iniciante"
+        elif elo < 1100: return "🏐 Amador"
+        elif elo < 1200: return "🥉 Intermediário"
+        elif elo < 1300: return "🥈 Avançado"
+        else: return "💎 Lenda"
+
+    if not df_visual.empty:
+        patentes = [get_patente_info(e) for e in df_visual['Elo']]
+        if 'Patente' in df_visual.columns: df_visual.drop(columns=['Patente'], inplace=True)
+        if 'Pos.' in df_visual.columns: df_visual.drop(columns=['Pos.'], inplace=True)
+
+        df_visual.insert(1, 'Patente', patentes)
+        df_visual.insert(0, 'Pos.', [f"{i+1}º" for i in range(len(df_visual))])
+    return df_visual
+
+def exibir_sinergia(grupo, nomes):
+    """Parcerias e confrontos do grupo (matrizes de volei/sinergia.py, montadas do histórico só a pedido)."""
+    sinergia = matrizes_sinergia.do_grupo(grupo)
+    no_historico = memorizar('partidas_sinergia', (grupo, cache_historico.versao),
+                             lambda: int(cache_historico.do_grupo(grupo)['Vencedor'].map(time_vencedor).notna().sum()))
+    if sinergia is None or sinergia.partidas != no_historico:
+        if sinergia is None: st.caption("Quem joga bem junto e quem trava contra quem, a partir do Histórico do grupo.")
+        else: st.caption(f"⚠️ As parcerias somam {sinergia.partidas} partida(s); o histórico tem {no_historico}.")
+        if st.button("🔁 Montar a partir do histórico", key="sinergia_montar"):
+            with st.spinner("Montando parcerias..."):
+                sinergia = matrizes_sinergia.reconstruir(grupo, cache_historico.indice())
+        if sinergia is None: return
+
+    col_tipo, col_jogador, col_min = st.columns([1, 1, 1])
+    with col_tipo: tipo = st.radio("Ver", ["Parceiros", "Adversários"], horizontal=True, key="sinergia_tipo")
+    with col_jogador: jogador = st.selectbox("Jogador", ["Todos"] + sorted(nomes), key="sinergia_jogador")
+    with col_min: min_jogos = st.number_input("Mínimo de jogos", 1, 50, 3, key="sinergia_min")
+
+    if jogador == "Todos":
+        df = sinergia.duplas(min_jogos) if tipo == "Parceiros" else sinergia.confrontos(min_jogos)
+    else:
+        df = sinergia.parceiros_de(jogador, min_jogos) if tipo == "Parceiros" else sinergia.adversarios_de(jogador, min_jogos)
+    if df.empty:
+        st.info("Nenhum par com esse mínimo de jogos.")
+        return
+    st.dataframe(df, hide_index=True, use_container_width=True,
+                 column_config={"Aproveitamento": st.column_config.NumberColumn(format="percent")})
+    st.caption(f"{len(df)} par(es) · {sinergia.partidas} partidas · Saldo_Elo: soma dos pontos ganhos/perdidos"
+               + (" jogando juntos." if tipo == "Parceiros" else " no confronto (visto pelo primeiro jogador)."))
+
+@fragmento("ranking", "Ranking")
+def exibir_ranking():
+    grupo_selecionado = st.session_state['grupo_atual']
+    elenco = carregar_dados()
+    df_jogadores = elenco.do_grupo(grupo_selecionado).copy()
 
-# --- ABA 2: RANKING ---
-with tab2:
     col_titulo, col_filtro = st.columns([1, 1])
     with col_titulo: st.markdown(f"### 🏆 Ranking: {grupo_selecionado}")
     with col_filtro:
-        tipo_ranking = st.radio("Visualização:", ["Geral", "Último dia"], horizontal=True, label_visibility="collapsed", key="rank_view")
+        tipo_ranking = st.radio("Visualização:", FILTROS_DIA, horizontal=True, label_visibility="collapsed", key="rank_view")
+        dia = escolher_dia(tipo_ranking, "rank_dia")
 
     if not df_jogadores.empty:
-        df_visual = df_jogadores.copy()
-        if tipo_ranking == "Último dia":
-            try:
-                df_h = conn.read(worksheet="Historico", ttl=0).dropna(how="all")
-                df_h_grupo = df_h[df_h['Grupo'] == grupo_selecionado]
-                if not df_h_grupo.empty:
-                    ultima_data = df_h_grupo.iloc[-1]['Data'].split(" ")[0]
-                    st.caption(f"📅 Data base: **{ultima_data}**")
-                    jogos = df_h_grupo[df_h_grupo['Data'].str.contains(ultima_data, na=False)]
-                    nomes = set()
-                    for _, row in jogos.iterrows():
-                        ta = str(row.get('Time A', row.get('Time_A', '')))
-                        tb = str(row.get('Time B', row.get('Time_B', '')))
-                        nomes.update(ta.split(", "))
-                        nomes.update(tb.split(", "))
-                    df_visual = df_visual[df_visual['Nome'].isin(nomes)]
-            except: pass
-
-        df_visual = df_visual.sort_values(by="Elo", ascending=False).reset_index(drop=True)
-        df_visual['Elo'] = df_visual['Elo'].round().astype(int)
-
-        def get_patente_info(elo):
-            if elo < 1000: return "🐣 Iniciante"
-            elif elo < 1100: return "🏐 Amador"
-            elif elo < 1200: return "🥉 Intermediário"
-            elif elo < 1300: return "🥈 Avançado"
-            else: return "💎 Lenda"
+        # Refeita só quando o elenco (ou, filtrando por dia, o histórico) muda
+        versoes = (id(elenco), elenco.versao, cache_historico.versao if dia is not None else None)
+        df_visual = memorizar('tabela_ranking', (grupo_selecionado, dia) + versoes,
+                              lambda: montar_ranking(df_jogadores, grupo_selecionado, dia))
+        if dia is not None: legenda_dia(grupo_selecionado, dia, "Data base")
 
         if not df_visual.empty:
-            patentes = [get_patente_info(e) for e in df_visual['Elo']]
-            if 'Patente' in df_visual.columns: df_visual.drop(columns=['Patente'], inplace=True)
-            if 'Pos.' in df_visual.columns: df_visual.drop(columns=['Pos.'], inplace=True)
-            
-            df_visual.insert(1, 'Patente', patentes)
-            df_visual.insert(0, 'Pos.', [f"{i+1}º" for i in range(len(df_visual))])
-
             cols_ranking = ["Pos.", "Nome", "Patente", "Elo", "Partidas", "Vitorias"]
-            exibir_tabela_plotly(df_visual[cols_ranking], cols_ranking, destacar_vencedor=False)
+            exibir_tabela_plotly(df_visual[cols_ranking], cols_ranking, destacar_vencedor=False, chave="ranking")
             st.caption("💡 Clique no ícone de câmera no canto superior direito da tabela para baixar como imagem.")
 
+    with st.expander("🤝 Parcerias e confrontos"):
+        exibir_sinergia(grupo_selecionado, df_jogadores['Nome'].tolist())
+
+    with st.expander("🔁 Recalcular ratings pelo histórico"):
+        st.caption("Refaz todos os Elos do grupo reaplicando as partidas do Histórico em ordem. "
+                   "Útil depois de corrigir/apagar resultados na planilha ou para testar outro K-Factor ou motor.")
+        motores = list(MOTORES_RATING)
+        motor_replay = st.selectbox("Motor", motores, key="motor_replay", format_func=lambda m: ROTULOS_RATING.get(m, m),
+                                    index=motores.index(st.session_state.get('config_motor_rating', 'elo')))
+        if motor_replay == "elo": k_replay = st.number_input("K-Factor", 1, 100, K_FACTOR, key="k_replay")
+        else: tau_replay = st.number_input("τ (quanto a volatilidade pode mudar)", 0.2, 1.2, 0.5, step=0.1, key="tau_replay")
+        # RD/Vol guardados: o grupo já registrou partidas com Glicko-2, mesmo que hoje esteja no Elo
+        motor_registro = 'glicko2' if incertezas_rating.do_grupo(grupo_selecionado) else st.session_state.get('config_motor_rating', 'elo')
+        manter_inicial = st.checkbox("Manter o Elo inicial de cada jogador", value=motor_registro == "elo",
+                                     disabled=motor_registro != "elo",
+                                     help="Estimado pelo Elo atual e pelos pontos registrados no histórico. Desmarcado: todos começam com 1200."
+                                          if motor_registro == "elo" else
+                                          "Indisponível: com Glicko-2 o histórico guarda só a média do time vencedor. Todos começam com 1200.")
+        if st.button("Simular recálculo"):
+            df_hist_grupo = cache_historico.do_grupo(grupo_selecionado)
+            iniciais = estimar_elo_inicial(df_hist_grupo, df_jogadores, motor_registro) if manter_inicial else None
+            if motor_replay == "elo": replay = ReplayElo(df_hist_grupo, k=k_replay, elo_inicial=iniciais)
+            else: replay = ReplayLote(df_hist_grupo, criar_motor(motor_replay, tau=tau_replay), elo_inicial=iniciais)
+            st.session_state['replay_preview'] = (grupo_selecionado, replay.comparar(df_jogadores), motor_replay)
+        preview = st.session_state.get('replay_preview')
+        if preview and preview[0] == grupo_selecionado:
+            df_diff, motor_preview = preview[1], preview[2]
+            mudancas = df_diff[df_diff['Diferenca'].abs() >= 0.5]
+            st.caption(f"{len(mudancas)} de {len(df_diff)} jogadores mudariam de Elo ({ROTULOS_RATING[motor_preview]}).")
+            colunas = ['Nome', 'Elo_atual', 'Elo', 'Diferenca', 'Partidas_atual', 'Partidas'] + [c for c in ('RD',) if c in df_diff]
+            st.dataframe(df_diff[colunas].round(1), hide_index=True, use_container_width=True)
+            if motor_preview != st.session_state.get('config_motor_rating', 'elo'):
+                st.caption("💡 Para as próximas partidas seguirem este motor, escolha-o em \"Rating do grupo\" na barra lateral.")
+            if st.button("✅ Aplicar novos ratings", type="primary"):
+                with cache_liga.lock:
+                    antes = elenco.jogadores(grupo_selecionado, df_diff['Nome']).copy()
+                    chaves = elenco.substituir_valores(grupo_selecionado, df_diff[['Nome', 'Elo', 'Partidas', 'Vitorias']])
+                    depois = elenco.jogadores(grupo_selecionado, [n for _, n in chaves])
+                    fila_escrita.enfileirar(alteracoes_entre(antes, depois), [])
+                extras = criar_motor(motor_preview).extras
+                if extras:
+                    # Incerteza recalculada junto: quem jogou muito no histórico volta a andar devagar
+                    incertezas_rating.definir(grupo_selecionado, {
+                        nome: [float(v) for v in valores] for nome, *valores in df_diff[['Nome', *extras]].itertuples(index=False)})
+                del st.session_state['replay_preview']
+                st.session_state['aviso_pendente'] = f"✅ {len(chaves)} ratings recalculados"
+                rerun_visao()
+
     with st.expander("➕ Cadastrar Novo Jogador"):
         with st.form("novo_jogador"):
             nome_input = st.text_input("Nome")
             elo_input = st.number_input("Elo Inicial", 1200, step=50)
             if st.form_submit_button("Salvar") and nome_input:
-                novo = pd.DataFrame([{"Nome": nome_input, "Elo": elo_input, "Partidas": 0, "Vitorias": 0, "Grupo": grupo_selecionado}])
-                conn.update(worksheet="Jogadores", data=pd.concat([df_geral, novo], ignore_index=True))
-                if 'cache_jogadores' in st.session_state: del st.session_state['cache_jogadores']
-                st.rerun()
+                registro = {"Nome": nome_input, "Elo": float(elo_input), "Partidas": 0, "Vitorias": 0, "Grupo": grupo_selecionado}
+                with cache_liga.lock:
+                    existe = elenco.existe(grupo_selecionado, nome_input)
+                    if not existe:
+                        elenco.adicionar(registro)
+                        fila_escrita.enfileirar([novo_jogador(registro)], [])
+                if existe: st.error(f"{nome_input} já está cadastrado neste grupo.")
+                else: rerun_visao()
+
+# --- VISÃO: HISTÓRICO ---
+def montar_historico(grupo, dia=None):
+    """Partidas do grupo (só as de `dia`, se dado), mais recentes primeiro."""
+    df_hf = cache_historico.do_grupo(grupo)
+    if not df_hf.empty and dia is not None: df_hf = df_hf.loc[cache_historico.indice().partidas_do_dia(grupo, dia)]
+    return df_hf.iloc[::-1]
 
-# --- ABA 3: HISTÓRICO ---
-with tab3:
+@fragmento("historico", "Histórico")
+def exibir_historico():
+    grupo_selecionado = st.session_state['grupo_atual']
     col_h_t, col_h_f = st.columns([1, 1])
     with col_h_t: st.markdown(f"### 📜 Histórico: {grupo_selecionado}")
     with col_h_f:
-        tipo_historico = st.radio("Visualização Histórico:", ["Geral", "Último dia"], horizontal=True, label_visibility="collapsed", key="hist_view")
+        tipo_historico = st.radio("Visualização Histórico:", FILTROS_DIA, horizontal=True, label_visibility="collapsed", key="hist_view")
+        dia = escolher_dia(tipo_historico, "hist_dia")
 
     try:
-        df_hist = conn.read(worksheet="Historico", ttl=0).dropna(how="all")
-        if "Pontos_Elo" not in df_hist.columns:
-            df_hist["Pontos_Elo"] = ""
-
-        df_hf = df_hist[df_hist['Grupo'] == grupo_selecionado].copy()
-        
+        df_hf = memorizar('tabela_historico', (grupo_selecionado, dia, cache_historico.versao),
+                          lambda: montar_historico(grupo_selecionado, dia))
         if not df_hf.empty:
-            if tipo_historico == "Último dia":
-                ultima_data_hist = df_hf.iloc[-1]['Data'].split(" ")[0]
-                st.caption(f"📅 Exibindo partidas do dia: **{ultima_data_hist}**")
-                df_hf = df_hf[df_hf['Data'].str.contains(ultima_data_hist, na=False)]
-            
-            df_hf = df_hf.iloc[::-1]
+            if dia is not None: legenda_dia(grupo_selecionado, dia, "Exibindo partidas do dia")
             cols_show = ["Data", "Time A", "Time B", "Vencedor", "Pontos_Elo"]
-            exibir_tabela_plotly(df_hf[cols_show], cols_show, destacar_vencedor=True)
+            exibir_tabela_plotly(df_hf[cols_show], cols_show, destacar_vencedor=True, chave="historico")
         else: st.info("Sem histórico.")
     except Exception as e: st.warning(f"Aguardando dados... {e}")
 
-# --- ABA 1: QUADRA (JOGO) ---
-with tab1:
+# --- VISÃO: QUADRA (JOGO) ---
+def exibir_quadras(elenco, grupo, pres_final, lev_final, tamanho_atual, limite_atual):
+    """Modo de várias quadras: sorteio de todas de uma vez e rodadas/resultados por quadra."""
+    n_quadras = st.session_state['config_quadras']
+    quadras = st.session_state['quadras'][:n_quadras]
+    quadras += [nova_quadra() for _ in range(n_quadras - len(quadras))]
+    st.session_state['quadras'] = quadras
+    elos = elos_do_grupo(elenco, grupo)
+
+    st.divider()
+    col_act, col_subs = st.columns([2, 1])
+    with col_act:
+        em_jogo = any(q['A'] or q.get('jogos') for q in quadras)
+        if st.button("🔀 Sortear todas as quadras" if em_jogo else "🏐 Iniciar Jogos", type="primary"):
+            sortear_quadras(elenco, grupo, pres_final, lev_final, tamanho_atual, n_quadras)
+    with col_subs:
+        st.session_state['modo_substituicao'] = st.toggle("Modo Substituição", value=st.session_state.get('modo_substituicao', False))
+
+    sorteio = st.session_state.get('sorteio_quadras')
+    if sorteio and sorteio['diferencas']:
+        difs = ", ".join(f"{d:.1f}" for d in sorteio['diferencas'])
+        st.caption(f"⚖️ Maior diferença entre quaisquer dois times: **{sorteio['amplitude']:.1f}** · "
+                   f"dentro de cada quadra: {difs} ({sorteio['tempo_ms']:.0f} ms)")
+    if not em_jogo and len(pres_final) < 2 * tamanho_atual * n_quadras:
+        st.caption(f"ℹ️ Presentes para {len(pres_final) // (2 * tamanho_atual)} quadra(s) completa(s).")
+
+    def render_time(i, quadra, lado):
+        nomes = quadra[lado]
+        streak = quadra.get('streak', 0)
+        media = sum(elos.get(n, 0) for n in nomes) / len(nomes)
+        titulo = "🛡️ Time A" if lado == 'A' else "⚔️ Time B"
+        st.markdown(f"**{titulo}** ({media:.0f})")
+        if streak > 0 and quadra.get('vencedores') and set(nomes) <= set(quadra['vencedores']):
+            if streak >= limite_atual: st.caption(f"🚨 Limite Atingido ({streak}/{limite_atual})")
+            else: st.caption(f"👑 Reis da Quadra ({streak}/{limite_atual} vitórias)")
+        for nome in nomes:
+            icon = "🤲" if nome in lev_final else "👤"
+            if st.session_state['modo_substituicao']:
+                c_nome, c_btn = st.columns([4, 1])
+                c_nome.write(f"{icon} {nome} ({elos.get(nome, 0):.0f})")
+                if c_btn.button("🔄", key=f"q{i}_sub_{lado}_{nome}", help="Substituir jogador"):
+                    substituicao_em_quadra(i, lado, nome)
+            else:
+                st.write(f"{icon} {nome} ({elos.get(nome, 0):.0f})")
+        if st.button(f"VITÓRIA TIME {lado} 🏆", use_container_width=True, key=f"q{i}_win_{lado}"):
+            vitoria_em_quadra(i, lado)
+
+    for i, quadra in enumerate(quadras):
+        with st.container(border=True):
+            st.markdown(f"#### 🏐 Quadra {i + 1}")
+            if quadra.get('jogos'): st.caption(f"{quadra['jogos']} jogo(s) nesta quadra")
+            if not quadra['A']:
+                if em_jogo and st.button("🔄 Próxima rodada", key=f"q{i}_prox"):
+                    rodada_em_quadra(i, elenco, grupo, pres_final, lev_final, tamanho_atual, limite_atual)
+                continue
+            cA, cM, cB = st.columns([4, 1, 4])
+            with cA: render_time(i, quadra, 'A')
+            with cM: st.markdown("<br><h3 style='text-align: center;'>VS</h3>", unsafe_allow_html=True)
+            with cB: render_time(i, quadra, 'B')
+
+@fragmento("quadra", "Quadra")
+def exibir_quadra():
+    grupo_selecionado = st.session_state['grupo_atual']
+    elenco = carregar_dados()
+    df_jogadores = elenco.do_grupo(grupo_selecionado)
     if df_jogadores.empty:
         st.warning("Cadastre jogadores primeiro.")
     else:
@@ -577,10 +1001,11 @@ with tab1:
             defs_l = [p for p in st.session_state['todos_levantadores'] if p in pres]
             levs = st.multiselect("Levantadores", pres, default=defs_l)
             if st.form_submit_button("Confirmar"):
+                registrar_evento('chamada', {'presentes': pres, 'levantadores': levs})
                 st.session_state['todos_presentes'] = pres
                 st.session_state['todos_levantadores'] = levs
                 salvar_estado_disco() 
-                st.rerun()
+                rerun_visao()
 
         pres_final = st.session_state['todos_presentes']
         lev_final = st.session_state['todos_levantadores']
@@ -591,6 +1016,8 @@ with tab1:
         # --- BLOQUEIO DE JOGADORES INSUFICIENTES ---
         if len(pres_final) < nec:
             st.error(f"❌ Mínimo de {nec} jogadores necessários para partidas de {tamanho_atual}x{tamanho_atual}. Você selecionou apenas {len(pres_final)}. Selecione mais {nec - len(pres_final)}.")
+        elif st.session_state['config_quadras'] > 1:
+            exibir_quadras(elenco, grupo_selecionado, pres_final, lev_final, tamanho_atual, limite_atual)
         else:
             st.divider()
             col_act, col_subs = st.columns([2, 1])
@@ -599,73 +1026,20 @@ with tab1:
                 txt_btn = "🔄 Próxima rodada" if 'jogo_atual' in st.session_state else "🏐 Iniciar Jogo"
                 
                 if st.button(txt_btn, type="primary"):
-                    if 'fila_espera' not in st.session_state: st.session_state['fila_espera'] = []
-                    
-                    streak = st.session_state.get('streak_vitorias', 0)
-                    anteriores = st.session_state.get('time_vencedor_anterior', [])
-                    vencedores_em_quadra = [p for p in anteriores if p in pres_final] if anteriores else []
-                    
-                    if len(vencedores_em_quadra) > tamanho_atual:
-                        vencedores_em_quadra = vencedores_em_quadra[:tamanho_atual]
-                    
-                    if streak >= limite_atual and vencedores_em_quadra:
-                        st.toast("🏆 Limite atingido! Redistribuindo vencedores e fila.")
-                        
-                        random.shuffle(vencedores_em_quadra)
-                        forca_a = []
-                        forca_b = []
-                        for i, p in enumerate(vencedores_em_quadra):
-                            if i % 2 == 0: forca_a.append(p)
-                            else: forca_b.append(p)
-                        
-                        vagas_restantes = nec - len(vencedores_em_quadra)
-                        fila_limpa = [p for p in st.session_state['fila_espera'] if p in pres_final and p not in vencedores_em_quadra]
-                        
-                        pool_para_equilibrar = []
-                        if vagas_restantes > 0:
-                            entram_da_fila = fila_limpa[:vagas_restantes]
-                            pool_para_equilibrar = entram_da_fila
-                            fila_limpa = fila_limpa[vagas_restantes:]
-                        
-                        st.session_state['fila_espera'] = fila_limpa
-                        st.session_state['streak_vitorias'] = 0
-                        st.session_state['time_vencedor_anterior'] = None
-                        
-                        t_a, t_b = distribuir_times_equilibrados(pool_para_equilibrar, lev_final, tamanho_atual, df_jogadores, pre_time_a=forca_a, pre_time_b=forca_b)
-                        st.session_state['jogo_atual'] = {'A': t_a, 'B': t_b}
-                        salvar_estado_disco()
-                        st.rerun()
-
-                    else:
-                        time_a_nomes = []
-                        if vencedores_em_quadra: time_a_nomes = vencedores_em_quadra
-                        candidatos = [p for p in pres_final if p not in time_a_nomes]
-                        fila_real = [p for p in st.session_state['fila_espera'] if p in candidatos]
-                        resto = [p for p in candidatos if p not in fila_real]
-                        random.shuffle(resto)
-                        pool_ordenado = fila_real + resto
-                        
-                        vagas_a = tamanho_atual - len(time_a_nomes)
-                        if vagas_a > 0:
-                            time_a_nomes.extend(pool_ordenado[:vagas_a])
-                            pool_ordenado = pool_ordenado[vagas_a:]
-                            
-                        novos_b = pool_ordenado[:tamanho_atual]
-                        time_b_nomes = novos_b
-                        pool_ordenado = pool_ordenado[tamanho_atual:]
-                        
-                        st.session_state['fila_espera'] = pool_ordenado
-                        
-                        if vencedores_em_quadra and streak > 0:
-                            t_a = df_jogadores[df_jogadores['Nome'].isin(time_a_nomes)]
-                            t_b = df_jogadores[df_jogadores['Nome'].isin(time_b_nomes)]
-                        else:
-                            todos = time_a_nomes + time_b_nomes
-                            t_a, t_b = distribuir_times_equilibrados(todos, lev_final, tamanho_atual, df_jogadores)
-                        
-                        st.session_state['jogo_atual'] = {'A': t_a, 'B': t_b}
-                        salvar_estado_disco()
-                        st.rerun()
+                    quadra = quadra_unica()
+                    if limite_atingido(quadra, pres_final, limite_atual):
+                        st.session_state['aviso_pendente'] = "🏆 Limite atingido! Redistribuindo vencedores e fila."
+                    quadra, fila, sorteio = proxima_rodada(
+                        quadra, st.session_state.get('fila_espera', []), pres_final,
+                        elos_do_grupo(elenco, grupo_selecionado), lev_final, tamanho_atual, limite_atual,
+                        motor=st.session_state.get('config_motor_equilibrio', 'auto'))
+                    registrar_evento('sorteio', {'quadra': None, 'rodada': quadra, 'fila_espera': fila})
+                    st.session_state['fila_espera'] = fila
+                    if sorteio: st.session_state['ultimo_sorteio'] = {k: sorteio[k] for k in ('diferenca', 'tempo_ms', 'motor', 'otimo', 'repete_times')}
+                    else: st.session_state.pop('ultimo_sorteio', None)
+                    guardar_quadra_unica(quadra, elenco, grupo_selecionado)
+                    salvar_estado_disco()
+                    rerun_visao()
 
             with col_subs:
                 if st.toggle("Modo Substituição", value=st.session_state.get('modo_substituicao', False)):
@@ -678,17 +1052,21 @@ with tab1:
                 t_b = st.session_state['jogo_atual']['B']
                 streak = st.session_state.get('streak_vitorias', 0)
                 
+                sorteio = st.session_state.get('ultimo_sorteio')
+                if sorteio:
+                    qualidade = "ótimo" if sorteio['otimo'] else "melhor encontrado"
+                    st.caption(f"⚖️ Diferença de Elo entre os times: **{sorteio['diferenca']:.1f}** ({qualidade}, {sorteio['tempo_ms']:.0f} ms)")
                 st.divider()
                 cA, cM, cB = st.columns([4, 1, 4])
                 
-                def render_team(team_df, team_name, container):
+                def render_team(time_, team_name, container):
                     with container:
                         is_streak = streak > 0 and \
                                     st.session_state.get('time_vencedor_anterior') and \
-                                    set(team_df['Nome']).issubset(set(st.session_state['time_vencedor_anterior']))
+                                    set(time_.nomes).issubset(set(st.session_state['time_vencedor_anterior']))
                         
                         titulo = f"🛡️ Time {team_name}" if team_name == 'A' else f"⚔️ Time {team_name}"
-                        st.markdown(f"### {titulo} ({team_df['Elo'].mean():.0f})")
+                        st.markdown(f"### {titulo} ({time_.media():.0f})")
                         
                         if is_streak: 
                             if streak >= limite_atual:
@@ -696,31 +1074,52 @@ with tab1:
                             else:
                                 st.caption(f"👑 Reis da Quadra ({streak}/{limite_atual} vitórias)")
                         
-                        for _, row in team_df.iterrows():
+                        for nome, elo in time_:
                             if st.session_state['modo_substituicao']:
                                 c_nome, c_btn = st.columns([4, 1])
                             else:
                                 c_nome = st.container()
                                 c_btn = None
                                 
-                            icon = "🤲" if row['Nome'] in lev_final else "👤"
-                            c_nome.write(f"**{icon} {row['Nome']}** ({row['Elo']:.0f})")
+                            icon = "🤲" if nome in lev_final else "👤"
+                            c_nome.write(f"**{icon} {nome}** ({elo:.0f})")
                             if c_btn:
-                                if c_btn.button("🔄", key=f"sub_{team_name}_{row['Nome']}", help="Substituir jogador"):
-                                    realizar_substituicao(row['Nome'], team_name)
+                                if c_btn.button("🔄", key=f"sub_{team_name}_{nome}", help="Substituir jogador"):
+                                    realizar_substituicao(nome, team_name)
                         st.markdown("---")
                         if st.button(f"VITÓRIA TIME {team_name} 🏆", use_container_width=True, key=f"win_{team_name}"):
                             other = t_b if team_name == 'A' else t_a
-                            processar_vitoria(team_df, other, f"Time {team_name}", grupo_selecionado, t_a['Nome'], t_b['Nome'])
+                            processar_vitoria(time_, other, f"Time {team_name}", grupo_selecionado, t_a.nomes, t_b.nomes)
 
                 render_team(t_a, 'A', cA)
                 with cM: st.markdown("<br><br><h2 style='text-align: center;'>VS</h2>", unsafe_allow_html=True)
                 render_team(t_b, 'B', cB)
+    exibir_fila()
+
+# --- NAVEGAÇÃO ---
+# Só a visão aberta é montada (st.tabs executaria as três a cada rerun)
+VISOES = {"Quadra (Jogo)": exibir_quadra, "Ranking": exibir_ranking, "Histórico": exibir_historico}
+visao = st.radio("Visão", list(VISOES), horizontal=True, key="visao", label_visibility="collapsed")
+VISOES[visao]()
+if visao != "Quadra (Jogo)": exibir_fila()
+
 
-if 'fila_espera' in st.session_state and st.session_state['fila_espera']:
-    fila_visivel = [p for p in st.session_state['fila_espera'] if p in st.session_state.get('todos_presentes', [])]
-    if fila_visivel:
-        txt = "\n".join([f"**{i+1}º** {n}" for i, n in enumerate(fila_visivel)])
-        placeholder_fila.markdown(txt)
-    else: placeholder_fila.caption("Fila vazia (todos presentes jogando).")
-else: placeholder_fila.caption("Fila vazia.")
+# --- PAINEL DE DESEMPENHO ---
+fechar_execucao(execucao)
+if config_app("painel_desempenho", False):
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.caption(f"Esta execução: {execucao['total_ms']:.0f} ms em {len(execucao['etapas'])} etapa(s)")
+        st.dataframe(resumir(execucao['etapas']), hide_index=True, use_container_width=True)
+        st.caption("Execuções recentes")
+        st.dataframe(pd.DataFrame(st.session_state['execucoes_recentes'][::-1]), hide_index=True, use_container_width=True)
+        if rastreador.segundo_plano:
+            st.caption("Segundo plano (fila de escrita / sincronização)")
+            st.dataframe(resumir(list(rastreador.segundo_plano)), hide_index=True, use_container_width=True)
+        c = conn_cota.relatorio()
+        st.caption(f"📶 API: {c['no_ultimo_minuto']}/{c['limite_por_minuto']} chamadas no último minuto, "
+                   f"{c['requisicoes']} no total ({c['operacoes']} operações), {c['repeticoes']} repetida(s), "
+                   f"{c['segundos_esperando']:.1f} s esperando cota")
+        r = cache_liga.relatorio()
+        st.caption(f"🗃️ Elenco compartilhado: {r['taxa_acerto']:.0%} de acertos ({r['leituras']} leitura(s) da planilha), "
+                   f"{r['sessoes']} sessão(ões) na leitura atual, {r['bytes_compacto'] / 1024:.0f} KB "
+                   f"(original {r['bytes_original'] / 1024:.0f} KB, economia ~{r['bytes_economizados'] / 1024:.0f} KB)")
@@ -0,0 +1,158 @@
+"""
+Teste de concorrência: várias sessões simuladas gravando partidas ao mesmo
+tempo na mesma planilha (ConexaoLocal) ou no mesmo banco SQLite, cada uma com
+a sua cópia (velha) do elenco, do jeito que o app faz. No fim confere, jogador
+a jogador, se todas as partidas foram contadas uma única vez.
+
+    python benchmarks/concorrencia.py --sessoes 8 --partidas 40
+    python benchmarks/concorrencia.py --backend sqlite --filas separadas
+
+--filas compartilhada: uma FilaEscrita para todas as sessões (um servidor Streamlit).
+--filas separadas: uma fila e um backend por sessão (vários servidores). No
+  SQLite a transação garante a atomicidade; no Google Sheets não existe
+  "compare-and-set", então ainda sobra uma janela entre ler e gravar.
+
+Sai com código 1 se alguma atualização se perdeu.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from volei.armazenamento import BackendPlanilhas, BackendSQLite
+from volei.concorrencia import alteracoes_entre
+from volei.conexao_local import ConexaoLocal
+from volei.elenco import Elenco
+from volei.elo import calcular_novo_elo
+from volei.fila_escrita import FilaEscrita
+
+GRUPO = "Teste"
+
+
+def criar_backend(tipo, conn, caminho_sqlite):
+    if tipo == "sqlite": return BackendSQLite(caminho_sqlite)
+    return BackendPlanilhas(conn)
+
+
+def popular(backend, n_jogadores):
+    df = pd.DataFrame({
+        "Nome": [f"J{i:03d}" for i in range(n_jogadores)],
+        "Elo": [1200.0 + 10 * (i % 20) for i in range(n_jogadores)],
+        "Partidas": 0, "Vitorias": 0, "Grupo": GRUPO,
+    })
+    if isinstance(backend, BackendSQLite): backend.substituir_jogadores(df)
+    else: backend.conn.update(worksheet="Jogadores", data=df)
+    return df
+
+
+def sessao(num, backend, fila, partidas, tamanho, pausa, registro, lock_registro):
+    rng = random.Random(num)
+    elenco = Elenco(backend.ler_jogadores(ttl=0))
+    versao = fila.versao
+    nomes = list(elenco.do_grupo(GRUPO)['Nome'])
+    for _ in range(partidas):
+        # Mesmo critério do app: relê o elenco depois de um conflito, quando a fila esvaziar
+        if fila.versao != versao and not fila.status()['pendentes']:
+            elenco = Elenco(backend.ler_jogadores(ttl=0))
+            versao = fila.versao
+        escolhidos = rng.sample(nomes, 2 * tamanho)
+        venc, perd = escolhidos[:tamanho], escolhidos[tamanho:]
+        mv = elenco.jogadores(GRUPO, venc)['Elo'].mean()
+        mp = elenco.jogadores(GRUPO, perd)['Elo'].mean()
+        delta = calcular_novo_elo(mv, mp) - mv
+
+        antes = elenco.jogadores(GRUPO, escolhidos).copy()
+        alteradas = elenco.aplicar_partida(GRUPO, venc, perd, delta)
+        depois = elenco.jogadores(GRUPO, [n for _, n in alteradas])
+        historico = {"Data": "", "Time A": ", ".join(venc), "Time B": ", ".join(perd),
+                     "Vencedor": "Time A", "Pontos_Elo": f"{delta:+.1f}", "Grupo": GRUPO}
+        fila.enfileirar(alteracoes_entre(antes, depois), [historico])
+        with lock_registro: registro.append((venc, perd, delta))
+        time.sleep(rng.uniform(0, pausa))
+
+
+def esperar_filas(filas, limite=120):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if all(f.status()['pendentes'] == 0 and not f.enviando for f in filas): return True
+        time.sleep(0.05)
+    return False
+
+
+def conferir(inicial, registro, final):
+    esperado = inicial.set_index('Nome')[['Elo', 'Partidas', 'Vitorias']].astype(float)
+    for venc, perd, delta in registro:
+        esperado.loc[venc, 'Elo'] += delta
+        esperado.loc[perd, 'Elo'] -= delta
+        esperado.loc[venc + perd, 'Partidas'] += 1
+        esperado.loc[venc, 'Vitorias'] += 1
+    obtido = final.set_index('Nome')[['Elo', 'Partidas', 'Vitorias']].astype(float).reindex(esperado.index)
+    diferentes = ((obtido - esperado).abs() > 1e-6).any(axis=1)
+    return esperado, obtido, diferentes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=["planilhas", "sqlite"], default="planilhas")
+    parser.add_argument("--filas", choices=["compartilhada", "separadas"], default="compartilhada")
+    parser.add_argument("--sessoes", type=int, default=8)
+    parser.add_argument("--partidas", type=int, default=40, help="partidas por sessão")
+    parser.add_argument("--jogadores", type=int, default=30)
+    parser.add_argument("--tamanho-time", type=int, default=4)
+    parser.add_argument("--pausa", type=float, default=0.005, help="pausa máxima entre partidas (s)")
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="volei_concorrencia_")
+    conn = ConexaoLocal(os.path.join(pasta, "planilha"))
+    caminho_sqlite = os.path.join(pasta, "volei.db")
+    principal = criar_backend(args.backend, conn, caminho_sqlite)
+    inicial = popular(principal, args.jogadores)
+
+    def nova_fila(backend):
+        return FilaEscrita(backend, arquivo=None, espera_base=0.01, espera_max=0.2).iniciar()
+
+    if args.filas == "compartilhada":
+        fila = nova_fila(principal)
+        pares = [(principal, fila)] * args.sessoes
+        filas = [fila]
+    else:
+        pares = []
+        for _ in range(args.sessoes):
+            b = criar_backend(args.backend, conn, caminho_sqlite)
+            pares.append((b, nova_fila(b)))
+        filas = [f for _, f in pares]
+
+    registro, lock_registro = [], threading.Lock()
+    inicio = time.perf_counter()
+    threads = [
+        threading.Thread(target=sessao, args=(i, b, f, args.partidas, args.tamanho_time, args.pausa, registro, lock_registro))
+        for i, (b, f) in enumerate(pares)
+    ]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    if not esperar_filas(filas): print("⚠️ Filas não esvaziaram a tempo")
+    duracao = time.perf_counter() - inicio
+
+    final = criar_backend(args.backend, conn, caminho_sqlite).ler_jogadores(ttl=0)
+    esperado, obtido, diferentes = conferir(inicial, registro, final)
+    n_hist = len(criar_backend(args.backend, conn, caminho_sqlite).ler_historico().dropna(how="all"))
+    falhas = sum(f.status()['falhas'] for f in filas)
+
+    print(f"backend={args.backend} filas={args.filas} sessões={args.sessoes} partidas={len(registro)} ({duracao:.2f}s)")
+    print(f"envios com conflito (reaplicados): {sum(f.versao for f in filas)}")
+    print(f"linhas no Historico: {n_hist} / {len(registro)}  itens com falha: {falhas}")
+    print(f"jogadores com atualização perdida: {int(diferentes.sum())} / {len(esperado)}")
+    if diferentes.any():
+        print(pd.concat({"esperado": esperado[diferentes], "obtido": obtido[diferentes]}, axis=1).head(10))
+    sys.exit(1 if diferentes.any() or n_hist != len(registro) or falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Rajada de partidas contra uma API com cota: ConexaoLocal recusando (429)
+acima de `--cota` chamadas por janela, com e sem ConexaoComCota na frente.
+
+A janela é encurtada (`--janela` segundos no lugar de 60) para o teste caber
+em poucos segundos; a proporção entre cota e rajada é a mesma do app real.
+No fim confere se todas as partidas chegaram ao Historico e aos jogadores.
+Sem o controle de cota a fila de escrita desiste dos itens depois de
+`--tentativas` recusas seguidas (ficam guardados até "Tentar de novo").
+
+    python benchmarks/cota.py --partidas 60 --cota 30 --janela 3
+    python benchmarks/cota.py --taxa-falhas 0.1
+
+Sai com código 1 se, com a cota controlada, alguma partida não foi gravada.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from volei.armazenamento import BackendPlanilhas
+from volei.concorrencia import alteracoes_entre
+from volei.conexao_local import ConexaoLocal
+from volei.cota import ConexaoComCota
+from volei.elenco import Elenco
+from volei.fila_escrita import FilaEscrita
+
+GRUPO = "Teste"
+
+
+def preparar(args):
+    conn = ConexaoLocal(latencia=args.latencia, janela=args.janela)
+    conn.update(worksheet="Jogadores", data=pd.DataFrame({
+        "Nome": [f"J{i:03d}" for i in range(24)], "Elo": 1200.0, "Partidas": 0, "Vitorias": 0, "Grupo": GRUPO,
+    }))
+    conn.update(worksheet="Historico", data=pd.DataFrame(
+        columns=["Data", "Time A", "Time B", "Vencedor", "Pontos_Elo", "Grupo"]))
+    # A cota só passa a valer depois da carga inicial
+    conn.cota_por_minuto, conn.taxa_falhas, conn.chamadas = args.cota, args.taxa_falhas, 0
+    return conn
+
+
+def rajada(args, com_cota):
+    base = preparar(args)
+    conn = ConexaoComCota(base, limite_por_minuto=args.cota, janela=args.janela, espera_base=args.espera_base,
+                          espera_max=args.janela) if com_cota else base
+    backend = BackendPlanilhas(conn)
+    fila = FilaEscrita(backend, arquivo=None, max_tentativas=args.tentativas, espera_base=args.espera_base,
+                       espera_max=args.janela).iniciar()
+    elenco = Elenco(backend.ler_jogadores(ttl=0))
+    nomes = list(elenco.do_grupo(GRUPO)['Nome'])
+    rng = random.Random(0)
+
+    inicio = time.perf_counter()
+    for i in range(args.partidas):
+        pool = rng.sample(nomes, 12)
+        antes = elenco.jogadores(GRUPO, pool).copy()
+        elenco.aplicar_partida(GRUPO, pool[:6], pool[6:], 10.0)
+        registro = {"Data": f"01/01/2024 {i // 60:02d}:{i % 60:02d}", "Time A": ", ".join(pool[:6]),
+                    "Time B": ", ".join(pool[6:]), "Vencedor": "Time A", "Pontos_Elo": "'+10.0", "Grupo": GRUPO}
+        fila.enfileirar(alteracoes_entre(antes, elenco.jogadores(GRUPO, pool)), [registro])
+        time.sleep(args.pausa)
+    while True:
+        s = fila.status()
+        if not s["pendentes"] and not s["enviando"]: break
+        time.sleep(0.05)
+    tempo = time.perf_counter() - inicio
+
+    base.cota_por_minuto, base.taxa_falhas = None, 0.0
+    historico = base.read(worksheet="Historico")
+    jogadores = base.read(worksheet="Jogadores")
+    return {
+        "tempo": tempo, "chamadas": base.chamadas, "recusadas": base.recusadas, "desistencias": s["falhas"],
+        "gravadas": len(historico), "partidas_jogadores": int(pd.to_numeric(jogadores['Partidas']).sum()) // 12,
+        "relatorio": conn.relatorio() if com_cota else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas em rajada contra uma API com cota.")
+    parser.add_argument("--partidas", type=int, default=60)
+    parser.add_argument("--pausa", type=float, default=0.02, help="segundos entre partidas")
+    parser.add_argument("--cota", type=int, default=30, help="chamadas aceitas por janela")
+    parser.add_argument("--janela", type=float, default=3.0, help="segundos da janela (60 na API real)")
+    parser.add_argument("--taxa-falhas", type=float, default=0.0, help="fração de chamadas recusadas ao acaso")
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por chamada à API simulada")
+    parser.add_argument("--tentativas", type=int, default=5, help="tentativas da fila antes de desistir")
+    parser.add_argument("--espera-base", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for rotulo, com_cota in (("sem controle", False), ("com controle", True)):
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):  # os erros da fila são contados em vez de impressos
+            r = rajada(args, com_cota)
+        erros = saida.getvalue().count("Erro ao enviar")
+        print(f"{rotulo:<13} {r['tempo']:6.2f} s  {r['chamadas']:>4} chamadas  {r['recusadas']:>3} recusadas (429)  "
+              f"{erros:>3} envios da fila falharam  {r['gravadas']}/{args.partidas} partidas gravadas"
+              f"  ({r['desistencias']} desistida(s))")
+        if r["relatorio"]:
+            c = r["relatorio"]
+            print(f"{'':<13} {c['operacoes']} operações, {c['repeticoes']} repetida(s) no cliente, "
+                  f"{c['segundos_esperando']:.2f} s esperando cota")
+    if r["gravadas"] != args.partidas or r["partidas_jogadores"] != args.partidas:
+        print("⚠️ Partidas não gravadas com o controle de cota")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Diário da quadra (volei/diario.py): custo de anotar cada evento (com fsync)
+e tempo de recuperação na abertura, com e sem compactação, depois de
+`--noites` noites simuladas (chamada, sorteios, substituições e resultados).
+
+    python benchmarks/diario.py --noites 200 --compactar 500
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from volei.diario import Diario
+from volei.rotacao import nova_quadra
+
+GRUPO = "Vôlei de Terça"
+
+
+def noite(diario, rng, jogadores, tamanho, partidas):
+    """Anota os eventos de uma noite; devolve quantos foram."""
+    presentes = rng.sample(jogadores, min(len(jogadores), 2 * tamanho + tamanho // 2 + 1))
+    diario.registrar(GRUPO, 'chamada', {'presentes': presentes, 'levantadores': presentes[:2]})
+    eventos = 1
+    for _ in range(partidas):
+        rng.shuffle(presentes)
+        a, b, fila = presentes[:tamanho], presentes[tamanho:2 * tamanho], presentes[2 * tamanho:]
+        quadra = nova_quadra()
+        quadra.update(A=a, B=b)
+        diario.registrar(GRUPO, 'sorteio', {'quadra': None, 'rodada': quadra, 'fila_espera': fila})
+        if fila and rng.random() < 0.3:
+            diario.registrar(GRUPO, 'substituicao', {'quadra': None, 'lado': 'A', 'saindo': a[0], 'entrando': fila[0]})
+            eventos += 1
+        alteracoes = [{"chave": [GRUPO, n], "base": "", "delta": {"Elo": 15.0, "Partidas": 1, "Vitorias": 1}} for n in a + b]
+        evento = diario.registrar(GRUPO, 'resultado', {'quadra': None, 'lado': 'A', 'A': a, 'B': b,
+                                                      'alteracoes': alteracoes, 'historico': [{"Grupo": GRUPO}]})
+        diario.confirmar(evento['id'])
+        eventos += 3
+    return eventos
+
+
+def medir(pasta, args, compactar_a_cada):
+    arquivo = os.path.join(pasta, f"diario_{compactar_a_cada}.jsonl")
+    diario = Diario(arquivo, compactar_a_cada=compactar_a_cada)
+    rng = random.Random(args.seed)
+    jogadores = [f"J{i:02d}" for i in range(args.jogadores)]
+    inicio = time.perf_counter()
+    eventos = sum(noite(diario, rng, jogadores, args.tamanho, args.partidas) for _ in range(args.noites))
+    anotar = (time.perf_counter() - inicio) / eventos * 1e6
+    bytes_ = sum(os.path.getsize(os.path.join(pasta, f)) for f in os.listdir(pasta) if f.startswith(f"diario_{compactar_a_cada}"))
+    inicio = time.perf_counter()
+    reaberto = Diario(arquivo, compactar_a_cada=compactar_a_cada)
+    abrir = (time.perf_counter() - inicio) * 1000
+    assert reaberto.estado(GRUPO) == diario.estado(GRUPO)
+    return {"eventos": eventos, "us_por_evento": anotar, "kb_em_disco": bytes_ / 1024,
+            "eventos_relidos": reaberto.recuperacao['eventos'], "abertura_ms": abrir}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo do diário e tempo de recuperação.")
+    parser.add_argument("--noites", type=int, default=200)
+    parser.add_argument("--partidas", type=int, default=20, help="partidas por noite")
+    parser.add_argument("--jogadores", type=int, default=30)
+    parser.add_argument("--tamanho", type=int, default=6)
+    parser.add_argument("--compactar", type=int, default=500, help="eventos entre snapshots")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="diario_")
+    try:
+        for rotulo, compactar_a_cada in (("sem compactação", 0), (f"snapshot a cada {args.compactar}", args.compactar)):
+            r = medir(pasta, args, compactar_a_cada)
+            print(f"{rotulo:>24}: {r['eventos']} eventos, {r['us_por_evento']:7.1f} µs/evento, "
+                  f"{r['kb_em_disco']:9.1f} KB em disco, abertura relendo {r['eventos_relidos']:>6} eventos: "
+                  f"{r['abertura_ms']:8.1f} ms")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
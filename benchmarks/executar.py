@@ -0,0 +1,246 @@
+"""
+Benchmarks dos caminhos quentes do app contra uma liga sintética.
+
+Troca o GSheetsConnection por uma ConexaoLocal em memória (com latência
+simulada por chamada) e mede, em ms, cada operação que o app faz numa
+rodada. O resultado vai em JSON para comparar entre commits:
+
+    python benchmarks/executar.py --saida base.json
+    (muda o código)
+    python benchmarks/executar.py --saida novo.json --comparar base.json
+
+O app.py não pode ser importado (monta a tela ao ser carregado), então as
+funções dele são reproduzidas aqui com os mesmos módulos de volei/.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.liga_sintetica import gerar_liga, gravar_liga, nome_grupo
+from volei.armazenamento import BackendPlanilhas
+from volei.cache_liga import CacheLiga
+from volei.concorrencia import alteracoes_entre
+from volei.conexao_local import ConexaoLocal
+from volei.elo import calcular_novo_elo
+from volei.equilibrio import equilibrar
+from volei.fila_escrita import FilaEscrita
+from volei.historico import CacheHistorico
+from volei.agregados_dia import AgregadosDia
+from volei.indice_historico import FORMATO_DATA, IndiceHistorico
+from volei.quadras import dividir_quadras
+from volei.sinergia import SinergiaGrupo
+from volei.tabelas import montar_figura, paginar
+from volei.times import Time
+
+LINHAS_POR_PAGINA = 15
+
+
+# --- CÓPIAS DAS FUNÇÕES DO APP (sem Streamlit) ---
+def carregar_dados(backend):
+    # Leitura a frio do cache compartilhado (o caso quente é um acesso a atributo)
+    return CacheLiga(lambda: backend.ler_jogadores(ttl=0)).elenco()
+
+
+def distribuir_times_equilibrados(pool_nomes, levantadores, tamanho_time, elenco, grupo, ultimos_times=None):
+    envolvidos = elenco.jogadores(grupo, pool_nomes)
+    resultado = equilibrar(envolvidos.to_dict('records'), levantadores, tamanho_time, evitar=ultimos_times)
+    return Time.do_elenco(elenco, grupo, resultado['A']), Time.do_elenco(elenco, grupo, resultado['B'])
+
+
+def processar_vitoria(elenco, fila, cache, time_venc, time_perd, grupo):
+    mv, mp = time_venc.media(), time_perd.media()
+    delta = calcular_novo_elo(mv, mp) - mv
+    antes = elenco.registros(grupo, time_venc.nomes + time_perd.nomes)
+    alteradas = elenco.aplicar_partida(grupo, time_venc.nomes, time_perd.nomes, delta)
+    registro = {
+        "Data": datetime.datetime.now().strftime(FORMATO_DATA),
+        "Time A": ", ".join(time_venc.nomes), "Time B": ", ".join(time_perd.nomes),
+        "Vencedor": "Time A", "Pontos_Elo": f"'{delta:+.1f}", "Grupo": grupo,
+    }
+    fila.enfileirar(alteracoes_entre(antes, elenco.registros(grupo, [n for _, n in alteradas])), [registro])
+    cache.registrar([registro])
+
+
+def realizar_substituicao(elenco, time_, grupo, saindo, entrando):
+    nomes, elos, partidas = elenco.valores(grupo, [entrando])
+    time_.substituir(saindo, nomes[0], elos[0], partidas[0])
+    return time_
+
+
+def ranking_ultimo_dia(elenco, cache, grupo):
+    agregados = cache.agregados()
+    dia = agregados.ultimo_dia(grupo)
+    df = elenco.do_grupo(grupo)
+    return df[df['Nome'].isin(agregados.jogadores_do_dia(grupo, dia))], agregados.resumo_do_dia(grupo, dia)
+
+
+def tabela_ranking(df_grupo):
+    df = df_grupo.sort_values(by="Elo", ascending=False).reset_index(drop=True)
+    df['Elo'] = df['Elo'].round().astype(int)
+    df.insert(1, 'Patente', np.select(
+        [df['Elo'] < 1000, df['Elo'] < 1100, df['Elo'] < 1200, df['Elo'] < 1300],
+        ["🐣 Iniciante", "🏐 Amador", "🥉 Intermediário", "🥈 Avançado"], "💎 Lenda"))
+    df.insert(0, 'Pos.', [f"{i+1}º" for i in range(len(df))])
+    cols = ["Pos.", "Nome", "Patente", "Elo", "Partidas", "Vitorias"]
+    pagina, _ = paginar(df[cols], 1, LINHAS_POR_PAGINA)
+    return montar_figura(pagina, cols)
+
+
+def tabela_historico(df_hist_grupo):
+    cols = ["Data", "Time A", "Time B", "Vencedor", "Pontos_Elo"]
+    pagina, _ = paginar(df_hist_grupo.iloc[::-1][cols], 1, LINHAS_POR_PAGINA)
+    return montar_figura(pagina, cols, destacar_vencedor=True)
+
+
+# --- MEDIÇÃO ---
+def medir(nome, funcao, repeticoes, conn, resultados, preparar=None):
+    tempos, chamadas = [], []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        antes = conn.chamadas
+        inicio = time.perf_counter()
+        funcao(argumento) if preparar else funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        chamadas.append(conn.chamadas - antes)
+    tempos = np.array(tempos)
+    resultados[nome] = {
+        "mediana_ms": round(float(np.median(tempos)), 3),
+        "min_ms": round(float(tempos.min()), 3),
+        "p95_ms": round(float(np.percentile(tempos, 95)), 3),
+        "max_ms": round(float(tempos.max()), 3),
+        "repeticoes": repeticoes,
+        "chamadas_api": round(float(np.mean(chamadas)), 2),
+    }
+    print(f"{nome:<28} {resultados[nome]['mediana_ms']:>10.2f} ms  (p95 {resultados[nome]['p95_ms']:.2f}, "
+          f"{resultados[nome]['chamadas_api']:g} chamadas)")
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def executar(args):
+    print(f"Gerando liga: {args.grupos} grupos, {args.jogadores} jogadores, {args.partidas} partidas...")
+    df_j, df_h = gerar_liga(args.grupos, args.jogadores, args.partidas, seed=args.seed)
+    conn = ConexaoLocal(latencia=args.latencia)
+    gravar_liga(conn, df_j, df_h)
+    backend = BackendPlanilhas(conn)
+    rng = random.Random(args.seed)
+    grupo = nome_grupo(args.grupos - 1)
+    n = args.repeticoes
+    resultados = {}
+
+    medir("carregar_dados", lambda: carregar_dados(backend), n, conn, resultados)
+    elenco = carregar_dados(backend)
+    medir("carregar_historico", lambda: CacheHistorico(backend.ler_historico, intervalo=0).todos(), max(1, n // 5), conn, resultados)
+    cache = CacheHistorico(backend.ler_historico, intervalo=0)
+    cache.todos()
+    medir("indice_historico", lambda: IndiceHistorico(cache.todos()), max(1, n // 5), conn, resultados)
+
+    nomes = list(elenco.do_grupo(grupo)['Nome'])
+    presentes = lambda: rng.sample(nomes, min(len(nomes), 18))
+    medir("distribuir_times", lambda pool: distribuir_times_equilibrados(pool, pool[:2], 6, elenco, grupo),
+          n, conn, resultados, preparar=presentes)
+
+    elos = dict(zip(elenco.do_grupo(grupo)['Nome'], elenco.do_grupo(grupo)['Elo']))
+    noite = lambda: rng.sample(nomes, min(len(nomes), 48))  # 4 quadras de 6x6
+    medir("dividir_quadras", lambda pool: dividir_quadras(pool, elos, pool[:8], 6, 4), n, conn, resultados, preparar=noite)
+
+    fila = FilaEscrita(backend, arquivo=None)  # sem thread: o envio é medido à parte
+    def sortear(_=None):
+        pool = rng.sample(nomes, 12)
+        return Time.do_elenco(elenco, grupo, pool[:6]), Time.do_elenco(elenco, grupo, pool[6:])
+    medir("processar_vitoria", lambda times: processar_vitoria(elenco, fila, cache, times[0], times[1], grupo),
+          n, conn, resultados, preparar=sortear)
+    fila.enviar()  # descarrega o que processar_vitoria acumulou: cada medição abaixo envia uma partida
+    medir("gravar_partida", lambda _: fila.enviar(), n, conn, resultados,
+          preparar=lambda: processar_vitoria(elenco, fila, cache, *sortear(), grupo))
+
+    def escalar():
+        time_a, _ = sortear()
+        fora = [x for x in nomes if x not in time_a]
+        return time_a, rng.choice(time_a.nomes), rng.choice(fora)
+    medir("realizar_substituicao", lambda a: realizar_substituicao(elenco, a[0], grupo, a[1], a[2]),
+          n, conn, resultados, preparar=escalar)
+
+    medir("agregados_dia", lambda: AgregadosDia(cache.indice()), max(1, n // 5), conn, resultados)
+    cache.agregados()  # os agregados já montados são o caso comum; a montagem foi medida acima
+    medir("ranking_ultimo_dia", lambda: ranking_ultimo_dia(elenco, cache, grupo), n, conn, resultados)
+    medir("tabela_ranking", lambda: tabela_ranking(elenco.do_grupo(grupo).copy()), n, conn, resultados)
+    medir("tabela_historico", lambda: tabela_historico(cache.do_grupo(grupo)), n, conn, resultados)
+
+    indice = cache.indice()
+    do_grupo = lambda t: t[t['Grupo'] == grupo]
+    medir("sinergia_reconstruir", lambda: SinergiaGrupo.de_historico(do_grupo(indice.partidas), do_grupo(indice.participacoes)),
+          max(1, n // 5), conn, resultados)
+    sinergia = SinergiaGrupo.de_historico(do_grupo(indice.partidas), do_grupo(indice.participacoes))
+    medir("sinergia_registrar", lambda p: sinergia.registrar(p[:6], p[6:], 15.0), n, conn, resultados,
+          preparar=lambda: rng.sample(nomes, 12))
+    medir("sinergia_consulta", lambda nome: sinergia.parceiros_de(nome, 3), n, conn, resultados,
+          preparar=lambda: rng.choice(nomes))
+
+    return {
+        "commit": commit_atual(),
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "comparar", "limite")},
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, anterior, limite):
+    """Imprime a razão atual/anterior por operação. Retorna as operações que pioraram além do limite."""
+    print(f"\nComparação com {anterior.get('commit')} (limite {limite:.2f}x):")
+    if anterior.get("parametros") != atual["parametros"]:
+        print(f"⚠️ Parâmetros diferentes: {anterior.get('parametros')} x {atual['parametros']}")
+    piores = []
+    for nome, r in atual["resultados"].items():
+        base = anterior.get("resultados", {}).get(nome)
+        if not base: continue
+        razao = r["mediana_ms"] / base["mediana_ms"] if base["mediana_ms"] else float("inf")
+        marca = "  ⚠️ regressão" if razao > limite else ""
+        if marca: piores.append(nome)
+        print(f"{nome:<28} {base['mediana_ms']:>10.2f} -> {r['mediana_ms']:>10.2f} ms  ({razao:.2f}x){marca}")
+    return piores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do app.")
+    parser.add_argument("--grupos", type=int, default=50)
+    parser.add_argument("--jogadores", type=int, default=5000)
+    parser.add_argument("--partidas", type=int, default=200000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por chamada à API simulada")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=1.25, help="razão a partir da qual conta como regressão")
+    args = parser.parse_args()
+
+    relatorio = executar(args)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f: json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados em {args.saida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: anterior = json.load(f)
+        if comparar(relatorio, anterior, args.limite): sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
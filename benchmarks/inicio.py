@@ -0,0 +1,103 @@
+"""
+Benchmark da partida a frio do app (primeira execução num processo novo).
+
+Gera uma liga sintética em CSV (modo offline), abre o app.py com o AppTest do
+Streamlit num subprocesso e mede o tempo da primeira execução, as leituras
+feitas (via log de desempenho, ver volei/rastreamento.py) e o tempo de
+importação. Roda dois cenários:
+
+* sem_meta: planilha antiga, sem o registro Meta (o app descobre o último
+  grupo lendo o Historico inteiro e cria o registro);
+* com_meta: registro Meta presente (abertura normal depois da primeira).
+
+    python benchmarks/inicio.py --latencia 0.3 --saida inicio.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def preparar(pasta, args, com_meta):
+    from benchmarks.liga_sintetica import gerar_liga, gravar_liga
+    from volei.armazenamento import BackendPlanilhas
+    from volei.conexao_local import ConexaoLocal
+
+    df_j, df_h = gerar_liga(args.grupos, args.jogadores, args.partidas, seed=args.seed)
+    conn = ConexaoLocal(os.path.join(pasta, "dados"))
+    gravar_liga(conn, df_j, df_h)
+    if com_meta:
+        BackendPlanilhas(conn).gravar_meta({"grupos": list(dict.fromkeys(df_j['Grupo'])), "ultimo_grupo": df_h['Grupo'].iloc[-1]})
+
+
+def filho(latencia):
+    """Roda no subprocesso, com a pasta da liga como diretório atual."""
+    inicio = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    importacao = time.perf_counter() - inicio
+
+    at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=600)
+    at.secrets["volei"] = {"offline": True, "pasta_offline": "dados", "latencia_offline": latencia,
+                           "log_desempenho": "desempenho.jsonl", "arquivo_fila": "fila.jsonl"}
+    inicio = time.perf_counter()
+    at.run()
+    primeira = time.perf_counter() - inicio
+    if at.exception: raise SystemExit(f"Erro no app: {at.exception[0].message}")
+
+    with open("desempenho.jsonl", encoding="utf-8") as f: execucao = json.loads(f.readlines()[-1])
+    leituras = [e for e in execucao["etapas"] if e["nome"].startswith(("conn.", "aba."))]
+    print(json.dumps({
+        "importacao_ms": round(importacao * 1000, 1),
+        "primeira_execucao_ms": round(primeira * 1000, 1),
+        "chamadas_api": len(leituras),
+        "linhas_lidas": {e["nome"]: e.get("linhas") for e in leituras},
+        "grupo_inicial": at.selectbox[0].value,
+    }))
+
+
+def executar(args):
+    resultados = {}
+    for cenario in ("sem_meta", "com_meta"):
+        pasta = tempfile.mkdtemp(prefix="volei_inicio_")
+        try:
+            preparar(pasta, args, com_meta=cenario == "com_meta")
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--filho", str(args.latencia)],
+                                   cwd=pasta, capture_output=True, text=True)
+            if saida.returncode != 0: raise SystemExit(saida.stderr[-2000:] or saida.stdout[-2000:])
+            resultados[cenario] = json.loads(saida.stdout.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+        r = resultados[cenario]
+        print(f"{cenario:<10} primeira execução {r['primeira_execucao_ms']:>9.1f} ms  "
+              f"({r['chamadas_api']} chamadas; importação {r['importacao_ms']:.0f} ms)")
+        for nome, linhas in r["linhas_lidas"].items(): print(f"{'':<12}{nome}: {linhas} linhas")
+    return {"parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "filho")}, "resultados": resultados}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da partida a frio do app.")
+    parser.add_argument("--grupos", type=int, default=50)
+    parser.add_argument("--jogadores", type=int, default=5000)
+    parser.add_argument("--partidas", type=int, default=200000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por chamada à API simulada")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--filho", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho is not None: return filho(args.filho)
+    relatorio = executar(args)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f: json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Gerador de ligas sintéticas para os benchmarks.
+
+Cada grupo joga uma sessão por semana (~20 partidas a partir das 19h) e as
+partidas de todos os grupos ficam intercaladas em ordem cronológica, como
+na aba Historico de uma planilha real. As linhas mais antigas usam o formato
+de data sem ano ("%d/%m %H:%M"), as mais novas o formato atual.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from volei.indice_historico import FORMATO_DATA
+
+PARTIDAS_POR_SESSAO = 20
+FRACAO_FORMATO_ANTIGO = 0.7
+
+
+def nome_grupo(g):
+    return f"Grupo {g:02d}"
+
+
+def gerar_liga(grupos=50, jogadores=5000, partidas=200000, tamanho_time=6, seed=0,
+               inicio=datetime.datetime(2023, 1, 2, 19, 0)):
+    """Retorna (df_jogadores, df_historico) com as colunas das abas da planilha."""
+    rng = np.random.default_rng(seed)
+    por_grupo = max(2 * tamanho_time, jogadores // grupos)
+    partidas_grupo = np.full(grupos, partidas // grupos)
+    partidas_grupo[:partidas % grupos] += 1
+
+    blocos_j, blocos_h = [], []
+    for g in range(grupos):
+        nomes = np.array([f"J{g:02d}_{i:03d}" for i in range(por_grupo)])
+        n = int(partidas_grupo[g])
+        # Times: os 2*tamanho primeiros de uma permutação aleatória por partida
+        escolhidos = rng.random((n, por_grupo)).argsort(axis=1)[:, :2 * tamanho_time]
+        vence_a = rng.random(n) < 0.5
+
+        sessao, ordem = np.divmod(np.arange(n), PARTIDAS_POR_SESSAO)
+        quando = [inicio + datetime.timedelta(days=7 * int(s) + g % 7, minutes=15 * int(o)) for s, o in zip(sessao, ordem)]
+        deltas = rng.uniform(5, 27, n)
+        blocos_h.append(pd.DataFrame({
+            "Quando": quando,
+            "Time A": [", ".join(nomes[l[:tamanho_time]]) for l in escolhidos],
+            "Time B": [", ".join(nomes[l[tamanho_time:]]) for l in escolhidos],
+            "Vencedor": np.where(vence_a, "Time A", "Time B"),
+            "Pontos_Elo": [f"+{d:.1f}" for d in deltas],
+            "Grupo": nome_grupo(g),
+        }))
+
+        # Partidas/Vitorias coerentes com o histórico gerado
+        partidas_j = np.bincount(escolhidos.ravel(), minlength=por_grupo)
+        lado_vencedor = np.where(vence_a[:, None], escolhidos[:, :tamanho_time], escolhidos[:, tamanho_time:])
+        vitorias_j = np.bincount(lado_vencedor.ravel(), minlength=por_grupo)
+        blocos_j.append(pd.DataFrame({
+            "Nome": nomes,
+            "Elo": rng.normal(1200, 120, por_grupo).round(2),
+            "Partidas": partidas_j,
+            "Vitorias": vitorias_j,
+            "Grupo": nome_grupo(g),
+        }))
+
+    df_h = pd.concat(blocos_h, ignore_index=True).sort_values("Quando", kind="stable").reset_index(drop=True)
+    corte = int(len(df_h) * FRACAO_FORMATO_ANTIGO)
+    datas = [q.strftime("%d/%m %H:%M") for q in df_h["Quando"].iloc[:corte]]
+    datas += [q.strftime(FORMATO_DATA) for q in df_h["Quando"].iloc[corte:]]
+    df_h.insert(0, "Data", datas)
+    return pd.concat(blocos_j, ignore_index=True), df_h.drop(columns="Quando")
+
+
+def gravar_liga(conn, df_jogadores, df_historico):
+    """Escreve a liga nas abas Jogadores/Historico de uma ConexaoLocal (sem contar como chamadas)."""
+    latencia, conn.latencia = conn.latencia, 0.0
+    conn.update(worksheet="Jogadores", data=df_jogadores)
+    conn.update(worksheet="Historico", data=df_historico)
+    conn.latencia = latencia
+    conn.chamadas = 0
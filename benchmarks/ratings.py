@@ -0,0 +1,127 @@
+"""
+Compara os motores de rating (volei/ratings.py) num histórico: velocidade de
+atualização e quanto cada um acerta do resultado antes de a partida acontecer.
+
+* lote: o histórico inteiro de uma vez (`ReplayLote`, vetorizado por ondas);
+* ao vivo: uma partida por vez, como o app faz (`aplicar_partida`);
+* Elo também no ReplayElo (laço em Python), como referência.
+
+A previsão de cada partida é a probabilidade que o motor dava ao vencedor
+com os ratings de antes dela: log loss, Brier e acerto (> 50%) são medidos
+nas partidas depois do `--aquecimento` (fração inicial, em que todos ainda
+estão perto do rating inicial).
+
+Sem `--historico`, usa a liga sintética com o vencedor sorteado pela força
+"verdadeira" de cada jogador (normal em torno de 1200); com ele, lê um CSV
+exportado da aba Historico (de um `--grupo` ou de todos).
+
+    python benchmarks/ratings.py
+    python benchmarks/ratings.py --historico Historico.csv --grupo "Vôlei de Terça"
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.liga_sintetica import gerar_liga
+from volei.elo import ReplayElo, expectativa, separar_time
+from volei.historico import normalizar_historico
+from volei.ratings import MotorElo, MotorGlicko2, ReplayLote, aplicar_partida
+
+
+def historico_sintetico(args):
+    _, df = gerar_liga(grupos=args.grupos, jogadores=args.jogadores, partidas=args.partidas, seed=args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    forca = {}
+    media = lambda time_: np.mean([forca.setdefault(n, rng.normal(1200, args.desvio_forca)) for n in separar_time(time_)])
+    p_a = np.array([expectativa(media(a), media(b)) for a, b in zip(df['Time A'], df['Time B'])])
+    df['Vencedor'] = np.where(rng.random(len(df)) < p_a, "Time A", "Time B")
+    return df
+
+
+def historico_csv(args):
+    df = normalizar_historico(pd.read_csv(args.historico, dtype=str))
+    if args.grupo: return df[df['Grupo'] == args.grupo].reset_index(drop=True)
+    # Mesmo nome em grupos diferentes são jogadores diferentes
+    for coluna in ('Time A', 'Time B'):
+        df[coluna] = [", ".join(f"{g}/{n}" for n in separar_time(t)) for g, t in zip(df['Grupo'], df[coluna])]
+    return df
+
+
+def metricas(previsoes, aquecimento):
+    p = np.clip(previsoes[int(len(previsoes) * aquecimento):], 1e-9, 1 - 1e-9)
+    return {
+        "log_loss": float(-np.mean(np.log(p))),
+        "brier": float(np.mean((1 - p) ** 2)),
+        "acerto": float(np.mean(np.where(p == 0.5, 0.5, p > 0.5))),
+    }
+
+
+def ao_vivo(motor, replay, n):
+    """Partidas/s aplicando uma a uma, como o app (dicts por nome)."""
+    ratings = dict(zip(replay.nomes, replay.iniciais))
+    extras = {}
+    ativas = [i for i, a in enumerate(replay.ativa) if a][:n]
+    inicio = time.perf_counter()
+    for i in ativas:
+        venc = [replay.nomes[j] for j in replay.vencedores[i]]
+        perd = [replay.nomes[j] for j in replay.perdedores[i]]
+        for nome, d in aplicar_partida(motor, ratings, extras, venc, perd).items(): ratings[nome] += d
+    return len(ativas) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Velocidade e acerto dos motores de rating.")
+    parser.add_argument("--historico", default=None, help="CSV exportado da aba Historico")
+    parser.add_argument("--grupo", default=None)
+    parser.add_argument("--grupos", type=int, default=50)
+    parser.add_argument("--jogadores", type=int, default=5000)
+    parser.add_argument("--partidas", type=int, default=200000)
+    parser.add_argument("--desvio-forca", type=float, default=150.0, help="desvio da força real (liga sintética)")
+    parser.add_argument("--k", type=float, default=32)
+    parser.add_argument("--tau", type=float, default=0.5)
+    parser.add_argument("--aquecimento", type=float, default=0.2)
+    parser.add_argument("--ao-vivo", type=int, default=5000, help="partidas medidas uma a uma")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    df = historico_csv(args) if args.historico else historico_sintetico(args)
+    inicio = time.perf_counter()
+    base = ReplayElo(df, k=args.k)
+    leitura = time.perf_counter() - inicio
+    partidas = sum(base.ativa)
+    print(f"{partidas} partidas, {len(base.nomes)} jogadores (leitura do histórico: {leitura:.2f} s)\n")
+
+    inicio = time.perf_counter()
+    base.executar()
+    resultados = [{"motor": "elo (ReplayElo, laço)", "partidas_s": partidas / (time.perf_counter() - inicio)}]
+    for motor in (MotorElo(args.k), MotorGlicko2(args.tau)):
+        replay = ReplayLote(df, motor)
+        inicio = time.perf_counter()
+        replay.executar()
+        tempo = time.perf_counter() - inicio
+        resultados.append({"motor": f"{motor.nome} (lote)", "partidas_s": partidas / tempo,
+                           **metricas(replay.previsoes, args.aquecimento)})
+        resultados.append({"motor": f"{motor.nome} (ao vivo)", "partidas_s": ao_vivo(motor, replay, args.ao_vivo)})
+        if motor.nome == "elo":
+            print(f"Elo em lote x ReplayElo: maior diferença {np.max(np.abs(np.array(replay.ratings) - base.ratings)):.2e}")
+
+    resultados.append({"motor": "sem informação (50%)", **metricas(np.full(partidas, 0.5), args.aquecimento)})
+    tabela = pd.DataFrame(resultados)
+    with pd.option_context("display.width", 200, "display.float_format", "{:.4f}".format):
+        print(tabela.to_string(index=False))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"parametros": {k: v for k, v in vars(args).items() if k != "saida"}, "resultados": resultados},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
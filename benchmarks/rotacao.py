@@ -0,0 +1,63 @@
+"""
+Compara regras de rotação (tamanho do time x limite de vitórias seguidas)
+simulando noites de jogo com as mesmas regras do app (volei.rotacao).
+
+Para cada regra: jogos por jogador (média, desigualdade na noite e mínimo),
+maior sequência de rodadas esperando e deriva do Elo em relação à força real.
+
+    python benchmarks/rotacao.py
+    python benchmarks/rotacao.py --noites 5000 --presentes 20 --processos 4
+    python benchmarks/rotacao.py --tamanhos 6 --limites 2 3 4 --motor auto --csv regras.csv
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from volei.simulacao import simular
+
+
+def _rodar(parametros):
+    tamanho, limite, kwargs = parametros
+    return simular(tamanho, limite, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula noites de jogo para várias regras de rotação.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[2, 3, 4, 5, 6])
+    parser.add_argument("--limites", type=int, nargs="+", default=[2, 3, 4, 5, 6])
+    parser.add_argument("--noites", type=int, default=1000, help="noites por regra")
+    parser.add_argument("--presentes", type=int, default=None, help="jogadores por noite (padrão: 3,5 times)")
+    parser.add_argument("--partidas", type=int, default=20, help="partidas por noite")
+    parser.add_argument("--levantadores", type=int, default=0)
+    parser.add_argument("--motor", default="guloso", help="motor do sorteio (guloso, heuristico, exato, auto)")
+    parser.add_argument("--processos", type=int, default=1, help="regras simuladas em paralelo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="salva a tabela neste arquivo")
+    args = parser.parse_args()
+
+    kwargs = dict(noites=args.noites, presentes=args.presentes, partidas=args.partidas,
+                  levantadores=args.levantadores, motor=args.motor, seed=args.seed)
+    regras = [(t, l, kwargs) for t in args.tamanhos for l in args.limites]
+    inicio = time.perf_counter()
+    if args.processos > 1:
+        with ProcessPoolExecutor(args.processos) as ex: linhas = list(ex.map(_rodar, regras))
+    else:
+        linhas = [_rodar(r) for r in regras]
+    tempo = time.perf_counter() - inicio
+
+    df = pd.DataFrame(linhas)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.2f}".format):
+        print(df.to_string(index=False))
+    total = args.noites * len(regras)
+    print(f"\n{total} noites em {tempo:.2f} s ({total / tempo:.0f} noites/s, {args.processos} processo(s))")
+    if args.csv: df.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
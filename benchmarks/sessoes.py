@@ -0,0 +1,73 @@
+"""
+Várias sessões abrindo o app no mesmo processo: elenco por sessão (como era,
+cada uma lê a aba Jogadores e guarda a própria cópia) x CacheLiga (uma
+leitura e uma cópia compacta compartilhada).
+
+    python benchmarks/sessoes.py --sessoes 30 --latencia 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.liga_sintetica import gerar_liga, gravar_liga, nome_grupo
+from volei.armazenamento import BackendPlanilhas
+from volei.cache_liga import CacheLiga
+from volei.conexao_local import ConexaoLocal
+from volei.elenco import Elenco
+
+
+def bytes_elenco(elenco):
+    return int(elenco.df.memory_usage(deep=True).sum())
+
+
+def por_sessao(backend, sessoes, reruns, grupo):
+    copias = []
+    for _ in range(sessoes):
+        elenco = Elenco(backend.ler_jogadores(ttl=0))
+        copias.append(elenco)
+        for _ in range(reruns): elenco.do_grupo(grupo)
+    return sum(bytes_elenco(e) for e in copias)
+
+
+def compartilhado(backend, sessoes, reruns, grupo):
+    cache = CacheLiga(lambda: backend.ler_jogadores(ttl=0))
+    for _ in range(sessoes):
+        cache.registrar_sessao()
+        for _ in range(reruns): cache.elenco().do_grupo(grupo)
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elenco por sessão x cache compartilhado.")
+    parser.add_argument("--grupos", type=int, default=50)
+    parser.add_argument("--jogadores", type=int, default=5000)
+    parser.add_argument("--sessoes", type=int, default=30)
+    parser.add_argument("--reruns", type=int, default=10, help="reruns por sessão")
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por chamada à API simulada")
+    args = parser.parse_args()
+
+    df_j, df_h = gerar_liga(args.grupos, args.jogadores, partidas=args.grupos * 20)
+    conn = ConexaoLocal(latencia=args.latencia)
+    gravar_liga(conn, df_j, df_h)
+    backend = BackendPlanilhas(conn)
+    grupo = nome_grupo(0)
+
+    inicio = time.perf_counter()
+    memoria = por_sessao(backend, args.sessoes, args.reruns, grupo)
+    tempo, chamadas = time.perf_counter() - inicio, conn.chamadas
+    print(f"por sessão:    {chamadas:>4} leituras  {memoria / 1e6:8.2f} MB  {tempo * 1000:9.1f} ms")
+
+    conn.chamadas = 0
+    inicio = time.perf_counter()
+    cache = compartilhado(backend, args.sessoes, args.reruns, grupo)
+    tempo = time.perf_counter() - inicio
+    r = cache.relatorio()
+    print(f"compartilhado: {conn.chamadas:>4} leituras  {r['bytes_compacto'] / 1e6:8.2f} MB  {tempo * 1000:9.1f} ms"
+          f"  (acertos {r['taxa_acerto']:.1%}; uma cópia sem compactar: {r['bytes_original'] / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Times em quadra como DataFrames (como era) x `Time` (volei/times.py): custo
+por operação de uma rodada — montar os times, substituir, desenhar, salvar o
+estado, restaurar e aplicar o resultado (elenco + alterações para a fila).
+
+    python benchmarks/times.py --tamanho 6 --repeticoes 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.liga_sintetica import gerar_liga, nome_grupo
+from volei.concorrencia import alteracoes_entre, assinatura
+from volei.elenco import COLUNAS_NUMERICAS, Elenco, compactar_jogadores
+from volei.times import Time
+
+
+# --- COMO ERA (DataFrames copiados do elenco) ---
+def montar_df(elenco, grupo, a, b):
+    return {'A': elenco.jogadores(grupo, a).copy(), 'B': elenco.jogadores(grupo, b).copy()}
+
+
+def substituir_df(elenco, jogo, grupo, saindo, entrando):
+    time_df = jogo['A']
+    dados_novo = elenco.jogadores(grupo, [entrando]).iloc[0]
+    time_df = time_df.drop(time_df[time_df['Nome'] == saindo].index)
+    jogo['A'] = pd.concat([time_df, pd.DataFrame([dados_novo])], ignore_index=True)
+
+
+def desenhar_df(jogo):
+    linhas = []
+    for time_df in jogo.values():
+        linhas.append(f"{time_df['Elo'].mean():.0f}")
+        for _, row in time_df.iterrows(): linhas.append(f"{row['Nome']} ({row['Elo']:.0f})")
+    return linhas
+
+
+def salvar_df(jogo):
+    return json.dumps({'A': jogo['A']['Nome'].tolist(), 'B': jogo['B']['Nome'].tolist()})
+
+
+def alteracoes_entre_df(antes, depois):
+    antes = antes.set_index(['Grupo', 'Nome'], drop=False)
+    alteracoes = []
+    for chave, linha in depois.set_index(['Grupo', 'Nome'], drop=False).iterrows():
+        base = antes.loc[chave]
+        delta = {c: (float(linha[c]) - float(base[c])) if c == 'Elo' else int(linha[c]) - int(base[c])
+                 for c in COLUNAS_NUMERICAS}
+        alteracoes.append({"chave": list(chave), "base": assinatura(base), "delta": delta})
+    return alteracoes
+
+
+def aplicar_df(elenco, jogo, grupo):
+    venc, perd = jogo['A'], jogo['B']
+    jogadores = pd.concat([venc, perd])
+    ratings = dict(zip(jogadores['Nome'], jogadores['Elo']))
+    delta = 32 * (1 - 1 / (1 + 10 ** ((perd['Elo'].mean() - venc['Elo'].mean()) / 400)))
+    antes = elenco.jogadores(grupo, list(venc['Nome']) + list(perd['Nome'])).copy()
+    pos_v, pos_p = elenco.posicoes(grupo, venc['Nome']), elenco.posicoes(grupo, perd['Nome'])
+    ajustes = np.zeros((len(pos_v) + len(pos_p), 3))
+    ajustes[:len(pos_v)] = [delta, 1, 1]
+    ajustes[len(pos_v):] = [-delta, 1, 0]
+    cols = [elenco.df.columns.get_loc(c) for c in COLUNAS_NUMERICAS]
+    pos = pos_v + pos_p
+    elenco.df.iloc[pos, cols] = elenco.df.iloc[pos, cols].to_numpy(dtype=float) + ajustes
+    return len(ratings), alteracoes_entre_df(antes, elenco.jogadores(grupo, list(ratings)))
+
+
+# --- AGORA (Time) ---
+def montar_time(elenco, grupo, a, b):
+    return {'A': Time.do_elenco(elenco, grupo, a), 'B': Time.do_elenco(elenco, grupo, b)}
+
+
+def substituir_time(elenco, jogo, grupo, saindo, entrando):
+    nomes, elos, partidas = elenco.valores(grupo, [entrando])
+    jogo['A'].substituir(saindo, nomes[0], elos[0], partidas[0])
+
+
+def desenhar_time(jogo):
+    linhas = []
+    for time_ in jogo.values():
+        linhas.append(f"{time_.media():.0f}")
+        for nome, elo in time_: linhas.append(f"{nome} ({elo:.0f})")
+    return linhas
+
+
+def salvar_time(jogo):
+    return json.dumps({'A': jogo['A'].nomes, 'B': jogo['B'].nomes})
+
+
+def aplicar_time(elenco, jogo, grupo):
+    venc, perd = jogo['A'], jogo['B']
+    ratings = {**venc.ratings(), **perd.ratings()}
+    delta = 32 * (1 - 1 / (1 + 10 ** ((perd.media() - venc.media()) / 400)))
+    antes = elenco.registros(grupo, venc.nomes + perd.nomes)
+    elenco.aplicar_partida(grupo, venc.nomes, perd.nomes, delta)
+    return len(ratings), alteracoes_entre(antes, elenco.registros(grupo, list(ratings)))
+
+
+MODELOS = {
+    "DataFrame": (montar_df, substituir_df, desenhar_df, salvar_df, aplicar_df),
+    "Time": (montar_time, substituir_time, desenhar_time, salvar_time, aplicar_time),
+}
+
+
+def medir(elenco, grupo, nomes, tamanho, repeticoes, funcoes, seed):
+    montar, substituir, desenhar, salvar, aplicar = funcoes
+    rng = random.Random(seed)
+    tempos = {k: 0.0 for k in ("montar", "substituir", "desenhar", "salvar", "restaurar", "aplicar")}
+    for _ in range(repeticoes):
+        pool = rng.sample(nomes, 2 * tamanho + 1)
+        a, b, entrando = pool[:tamanho], pool[tamanho:2 * tamanho], pool[-1]
+        t0 = time.perf_counter(); jogo = montar(elenco, grupo, a, b)
+        t1 = time.perf_counter(); substituir(elenco, jogo, grupo, a[0], entrando)
+        t2 = time.perf_counter(); desenhar(jogo)
+        t3 = time.perf_counter(); estado = json.loads(salvar(jogo))
+        t4 = time.perf_counter(); jogo = montar(elenco, grupo, estado['A'], estado['B'])
+        t5 = time.perf_counter(); aplicar(elenco, jogo, grupo)
+        t6 = time.perf_counter()
+        for k, (ini, fim) in zip(tempos, ((t0, t1), (t1, t2), (t2, t3), (t3, t4), (t4, t5), (t5, t6))):
+            tempos[k] += fim - ini
+    return {k: v / repeticoes * 1e6 for k, v in tempos.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times em DataFrame x registros compactos (Time).")
+    parser.add_argument("--grupos", type=int, default=50)
+    parser.add_argument("--jogadores", type=int, default=5000)
+    parser.add_argument("--tamanho", type=int, default=6, help="jogadores por time")
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df_j, _ = gerar_liga(args.grupos, args.jogadores, partidas=args.grupos)
+    grupo = nome_grupo(0)
+    resultados = {}
+    for modelo, funcoes in MODELOS.items():
+        elenco = Elenco(compactar_jogadores(df_j))  # cada modelo aplica os resultados no seu elenco
+        nomes = list(elenco.do_grupo(grupo)['Nome'])
+        resultados[modelo] = medir(elenco, grupo, nomes, args.tamanho, args.repeticoes, funcoes, args.seed)
+
+    tabela = pd.DataFrame(resultados).T
+    tabela['rodada'] = tabela.sum(axis=1)
+    print(f"µs por operação ({args.tamanho}x{args.tamanho}, {args.repeticoes} rodadas)\n")
+    with pd.option_context("display.float_format", "{:.1f}".format):
+        print(tabela.to_string())
+    print(f"\nrodada {tabela.loc['DataFrame', 'rodada'] / tabela.loc['Time', 'rodada']:.1f}x mais rápida com Time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""BackendSQLite com espelho na planilha (ConexaoLocal)."""
+import pandas as pd
+
+from volei.armazenamento import BackendPlanilhas, BackendSQLite
+from volei.conexao_local import ConexaoLocal
+from volei.planilhas import COLUNAS_HISTORICO, esquecer_cabecalhos
+
+
+def backend_com_espelho(tmp_path):
+    esquecer_cabecalhos()
+    conn = ConexaoLocal()
+    conn.update(worksheet="Jogadores", data=pd.DataFrame(
+        {"Nome": ["Ana", "Bia"], "Elo": 1200.0, "Partidas": 0, "Vitorias": 0, "Grupo": "G"}))
+    conn.update(worksheet="Historico", data=pd.DataFrame(columns=COLUNAS_HISTORICO))
+    backend = BackendSQLite(str(tmp_path / "volei.db"), espelho=BackendPlanilhas(conn))
+    assert backend.trazer_do_espelho()
+    return backend, conn
+
+
+def test_partida_gravada_nao_parece_edicao_manual(tmp_path):
+    backend, conn = backend_com_espelho(tmp_path)
+    versao = backend.versao
+    backend.anexar_historico([{"Data": "01/01/2024 20:00", "Time A": "Ana", "Time B": "Bia", "Vencedor": "Time A",
+                               "Pontos_Elo": "'+12.3", "Grupo": "G"}])
+    backend.enviar_pendencias()
+    assert conn._abas["Historico"][1][4] == "+12.3"  # a planilha some com o apóstrofo
+
+    assert not backend.trazer_do_espelho()
+    assert backend.versao == versao
+    assert backend.ler_historico()["Pontos_Elo"].tolist() == ["'+12.3"]
+
+
+def test_edicao_manual_na_planilha_chega_ao_local(tmp_path):
+    backend, conn = backend_com_espelho(tmp_path)
+    backend.anexar_historico([{"Data": "01/01/2024 20:00", "Time A": "Ana", "Time B": "Bia", "Vencedor": "Time A",
+                               "Pontos_Elo": "'+12.3", "Grupo": "G"}])
+    backend.enviar_pendencias()
+    conn._abas["Historico"][1][4] = "-12.3"
+
+    assert backend.trazer_do_espelho()
+    assert float(str(backend.ler_historico()["Pontos_Elo"].iloc[0]).lstrip("'")) == -12.3
+
+
+def test_pendencias_depois_de_reiniciar_nao_apagam_edicao_na_planilha(tmp_path):
+    backend, conn = backend_com_espelho(tmp_path)
+    # Partida gravada localmente e o processo cai antes de sincronizar
+    atual = backend.ler_jogadores()
+    atual.loc[atual['Nome'] == "Ana", ["Elo", "Partidas", "Vitorias"]] = [1216.0, 1, 1]
+    backend.gravar_jogadores(atual, [("G", "Ana")])
+    # Enquanto isso alguém corrige a Bia direto na planilha
+    conn._abas["Jogadores"][2][1] = "1300"
+
+    reiniciado = BackendSQLite(backend.caminho, espelho=BackendPlanilhas(conn))
+    assert reiniciado.enviar_pendencias() == 1
+    planilha = conn.read(worksheet="Jogadores").set_index("Nome")
+    assert float(planilha.loc["Ana", "Elo"]) == 1216.0 and int(planilha.loc["Ana", "Partidas"]) == 1
+    assert float(planilha.loc["Bia", "Elo"]) == 1300.0
+    # O mapa de linhas ficou montado: as próximas escritas também são por linha
+    assert reiniciado.espelho.gravar_jogadores(reiniciado.ler_jogadores(), [("G", "Ana")])["modo"] == "linhas"
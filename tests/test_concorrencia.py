@@ -0,0 +1,200 @@
+"""Alterações com base (volei/concorrencia.py): sessões com cópias velhas não apagam o trabalho umas das outras."""
+import pandas as pd
+import pytest
+
+from volei.armazenamento import BackendPlanilhas, BackendSQLite
+from volei.concorrencia import (aplicar_alteracoes, alteracoes_entre, assinatura, mesclar_alteracoes,
+                                novo_jogador)
+from volei.conexao_local import ConexaoLocal
+from volei.elenco import Elenco
+from volei.fila_escrita import FilaEscrita
+from volei.planilhas import COLUNAS_HISTORICO, esquecer_cabecalhos
+
+
+def jogadores():
+    return pd.DataFrame({"Nome": ["Ana", "Bia", "Caio", "Duda"], "Elo": [1200.0, 1250.0, 1180.0, 1300.0],
+                         "Partidas": [10, 12, 8, 20], "Vitorias": [5, 7, 3, 12], "Grupo": "G"})
+
+
+def test_alteracoes_entre_registros_e_dataframes():
+    antes = jogadores()
+    depois = antes.copy()
+    depois.loc[0, ["Elo", "Partidas", "Vitorias"]] = [1216.5, 11, 6]
+    depois.loc[2, ["Elo", "Partidas"]] = [1163.5, 9]
+
+    alteracoes = alteracoes_entre(antes.to_dict('records'), depois.to_dict('records'))
+    assert alteracoes == alteracoes_entre(antes, depois)
+    por_nome = {a['chave'][1]: a for a in alteracoes}
+    assert por_nome['Ana']['delta'] == {"Elo": 16.5, "Partidas": 1, "Vitorias": 1}
+    assert por_nome['Caio']['delta'] == {"Elo": -16.5, "Partidas": 1, "Vitorias": 0}
+    assert por_nome['Bia']['delta'] == {"Elo": 0.0, "Partidas": 0, "Vitorias": 0}
+    assert por_nome['Ana']['base'] == assinatura(antes.iloc[0]) == "1200.0000|10.0000|5.0000"
+
+
+def test_mesclar_soma_deltas_e_guarda_a_primeira_base():
+    a1 = {"chave": ["G", "Ana"], "base": "b1", "delta": {"Elo": 10.0, "Partidas": 1, "Vitorias": 1}}
+    a2 = {"chave": ["G", "Ana"], "base": "b2", "delta": {"Elo": -4.0, "Partidas": 1, "Vitorias": 0}}
+    b1 = {"chave": ["G", "Bia"], "base": "b3", "delta": {"Elo": 3.0, "Partidas": 1, "Vitorias": 0}}
+    mescladas = mesclar_alteracoes([a1, b1, a2])
+    assert [m['chave'] for m in mescladas] == [["G", "Ana"], ["G", "Bia"]]
+    assert mescladas[0] == {"chave": ["G", "Ana"], "base": "b1", "delta": {"Elo": 6.0, "Partidas": 2, "Vitorias": 1}}
+    assert a1['delta'] == {"Elo": 10.0, "Partidas": 1, "Vitorias": 1}  # entradas não são alteradas
+
+
+def test_mesclar_cadastro_com_partidas_seguintes():
+    registro = {"Nome": "Eva", "Elo": 1200.0, "Partidas": 0, "Vitorias": 0, "Grupo": "G"}
+    delta = {"chave": ["G", "Eva"], "base": "x", "delta": {"Elo": 8.0, "Partidas": 1, "Vitorias": 1}}
+    [mesclada] = mesclar_alteracoes([novo_jogador(registro), delta])
+    assert mesclada['registro'] == registro and mesclada['delta'] == delta['delta']
+
+    df, alteradas, conflitos = aplicar_alteracoes(jogadores(), [mesclada])
+    eva = df.set_index('Nome').loc['Eva']
+    assert (eva['Elo'], eva['Partidas'], eva['Vitorias']) == (1208.0, 1, 1)
+    assert alteradas == [("G", "Eva")] and conflitos == 0
+
+
+def test_aplicar_sem_conflito():
+    atual = jogadores()
+    depois = atual.copy()
+    depois.loc[1, ["Elo", "Partidas", "Vitorias"]] = [1260.0, 13, 8]
+    df, alteradas, conflitos = aplicar_alteracoes(atual, alteracoes_entre(atual.iloc[[1]], depois.iloc[[1]]))
+    assert conflitos == 0 and alteradas == [("G", "Bia")]
+    assert df.loc[1, "Elo"] == 1260.0 and df.loc[1, "Partidas"] == 13 and df["Partidas"].dtype.kind == "i"
+    assert atual.loc[1, "Elo"] == 1250.0  # df_atual não é alterado
+
+
+def test_aplicar_base_velha_conta_conflito_e_soma_sobre_o_valor_novo():
+    lida = jogadores()
+    atual = lida.copy()
+    atual.loc[0, ["Elo", "Partidas", "Vitorias"]] = [1190.0, 11, 5]  # outra sessão gravou antes
+    alteracao = {"chave": ["G", "Ana"], "base": assinatura(lida.iloc[0]),
+                 "delta": {"Elo": 12.0, "Partidas": 1, "Vitorias": 1}}
+    df, alteradas, conflitos = aplicar_alteracoes(atual, [alteracao])
+    assert conflitos == 1 and alteradas == [("G", "Ana")]
+    assert (df.loc[0, "Elo"], df.loc[0, "Partidas"], df.loc[0, "Vitorias"]) == (1202.0, 12, 6)
+
+
+def test_aplicar_jogador_apagado_e_cadastro_repetido():
+    atual = jogadores()
+    apagado = {"chave": ["G", "Zeca"], "base": "", "delta": {"Elo": 5.0, "Partidas": 1, "Vitorias": 1}}
+    repetido = novo_jogador({"Nome": "Ana", "Elo": 1500.0, "Partidas": 0, "Vitorias": 0, "Grupo": "G"})
+    df, alteradas, conflitos = aplicar_alteracoes(atual, [apagado, repetido])
+    assert conflitos == 2 and alteradas == [("G", "Ana")]
+    assert df.loc[0, "Elo"] == 1200.0 and len(df) == 4
+
+
+def test_aplicar_sobrescrever_formato_antigo_da_fila():
+    registro = {"Nome": "Ana", "Elo": 1333.0, "Partidas": 30, "Vitorias": 20, "Grupo": "G"}
+    df, _, conflitos = aplicar_alteracoes(jogadores(), [{"chave": ["G", "Ana"], "registro": registro, "sobrescrever": True}])
+    assert conflitos == 0 and (df.loc[0, "Elo"], df.loc[0, "Partidas"]) == (1333.0, 30)
+
+
+# --- DUAS SESSÕES GRAVANDO NO MESMO JOGADOR ---
+def partida(elenco, vencedores, perdedores, delta):
+    """Como o app registra uma partida: registros antes, aplica no elenco da sessão, registros depois."""
+    nomes = vencedores + perdedores
+    antes = elenco.registros("G", nomes)
+    elenco.aplicar_partida("G", vencedores, perdedores, delta)
+    return alteracoes_entre(antes, elenco.registros("G", nomes))
+
+
+@pytest.fixture(params=["planilhas", "sqlite"])
+def backend(request, tmp_path):
+    esquecer_cabecalhos()
+    conn = ConexaoLocal()
+    conn.update(worksheet="Jogadores", data=jogadores())
+    conn.update(worksheet="Historico", data=pd.DataFrame(columns=COLUNAS_HISTORICO))
+    if request.param == "planilhas":
+        backend = BackendPlanilhas(conn)
+        backend.ler_jogadores(ttl=0)
+        return backend
+    backend = BackendSQLite(str(tmp_path / "volei.db"))
+    backend.substituir_jogadores(jogadores())
+    return backend
+
+
+def test_dois_escritores_no_mesmo_jogador(backend):
+    # As duas sessões leram o mesmo elenco; Ana joga (e ganha) nas duas
+    sessao_1, sessao_2 = Elenco(backend.ler_jogadores()), Elenco(backend.ler_jogadores())
+    alteracoes_1 = partida(sessao_1, ["Ana", "Bia"], ["Caio", "Duda"], 15.0)
+    alteracoes_2 = partida(sessao_2, ["Ana", "Caio"], ["Bia", "Duda"], 9.0)
+
+    assert backend.aplicar_alteracoes(alteracoes_1)["conflitos"] == 0
+    assert backend.aplicar_alteracoes(alteracoes_2)["conflitos"] == 4  # a base das quatro linhas ficou velha
+
+    final = backend.ler_jogadores(ttl=0).set_index('Nome')
+    assert final.loc["Ana", "Elo"] == pytest.approx(1200.0 + 15.0 + 9.0)
+    assert final.loc["Bia", "Elo"] == pytest.approx(1250.0 + 15.0 - 9.0)
+    assert final.loc["Caio", "Elo"] == pytest.approx(1180.0 - 15.0 + 9.0)
+    assert final.loc["Duda", "Elo"] == pytest.approx(1300.0 - 15.0 - 9.0)
+    assert final["Partidas"].tolist() == [12, 14, 10, 22]
+    assert final.loc["Ana", "Vitorias"] == 7 and final.loc["Duda", "Vitorias"] == 12
+
+
+def test_duas_filas_com_varias_partidas_nao_perdem_deltas(backend):
+    sessoes = [Elenco(backend.ler_jogadores()), Elenco(backend.ler_jogadores())]
+    filas = [FilaEscrita(backend, arquivo=None), FilaEscrita(backend, arquivo=None)]
+    esperado = {n: 0.0 for n in ["Ana", "Bia", "Caio", "Duda"]}
+    for i in range(6):
+        s = i % 2
+        venc, perd = (["Ana", "Bia"], ["Caio", "Duda"]) if i % 3 else (["Caio", "Duda"], ["Ana", "Bia"])
+        delta = 5.0 + i
+        filas[s].enfileirar(partida(sessoes[s], venc, perd, delta), [])
+        for n in venc: esperado[n] += delta
+        for n in perd: esperado[n] -= delta
+        if i == 3: filas[0].enviar()  # envios intercalados com partidas ainda na outra fila
+    for fila in filas: fila.enviar()
+
+    final = backend.ler_jogadores(ttl=0).set_index('Nome')
+    inicial = jogadores().set_index('Nome')
+    for nome, soma in esperado.items():
+        assert final.loc[nome, "Elo"] == pytest.approx(inicial.loc[nome, "Elo"] + soma)
+        assert final.loc[nome, "Partidas"] == inicial.loc[nome, "Partidas"] + 6
+
+
+# --- NOVA TENTATIVA DEPOIS DE UMA ESCRITA QUE JÁ TINHA GRAVADO ---
+class FalhaDepoisDeGravar:
+    """Backend cuja resposta se perde na primeira escrita de deltas (timeout/5xx depois de gravar)."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.falhas = 1
+
+    def aplicar_alteracoes(self, alteracoes, conferir=False):
+        resumo = self.backend.aplicar_alteracoes(alteracoes, conferir)
+        if self.falhas:
+            self.falhas -= 1
+            raise TimeoutError("resposta perdida")
+        return resumo
+
+    def __getattr__(self, nome):
+        return getattr(self.backend, nome)
+
+
+def test_nova_tentativa_nao_soma_delta_ja_gravado(backend, tmp_path):
+    fila = FilaEscrita(FalhaDepoisDeGravar(backend), arquivo=str(tmp_path / "fila.jsonl"))
+    fila.enfileirar(partida(Elenco(backend.ler_jogadores()), ["Ana", "Bia"], ["Caio", "Duda"], 15.0), [])
+    with pytest.raises(TimeoutError):
+        fila.enviar()
+    # Partida nova enquanto a primeira esperava: não entra no lote conferido
+    fila.enfileirar(partida(Elenco(backend.ler_jogadores()), ["Ana", "Caio"], ["Bia", "Duda"], 5.0), [])
+    assert fila.enviar() == 1
+    assert fila.enviar() == 1
+
+    final = backend.ler_jogadores(ttl=0).set_index('Nome')
+    assert final.loc["Ana", "Elo"] == pytest.approx(1220.0) and final.loc["Bia", "Elo"] == pytest.approx(1260.0)
+    assert final["Partidas"].tolist() == [12, 14, 10, 22]
+    assert final["Vitorias"].tolist() == [7, 8, 4, 12]
+
+
+def test_queda_depois_de_gravar_deltas(backend, tmp_path):
+    arquivo = str(tmp_path / "fila.jsonl")
+    fila = FilaEscrita(backend, arquivo=arquivo)
+    fila.enfileirar(partida(Elenco(backend.ler_jogadores()), ["Ana", "Bia"], ["Caio", "Duda"], 15.0), [])
+    fila.backend = FalhaDepoisDeGravar(backend)
+    with pytest.raises(TimeoutError):
+        fila.enviar()  # o processo "cai" aqui: a fila em disco ainda tem o item
+
+    assert FilaEscrita(backend, arquivo=arquivo).enviar() == 1
+    final = backend.ler_jogadores(ttl=0).set_index('Nome')
+    assert final.loc["Ana", "Elo"] == pytest.approx(1215.0) and final.loc["Caio", "Elo"] == pytest.approx(1165.0)
+    assert final["Partidas"].tolist() == [11, 13, 9, 21]
@@ -0,0 +1,111 @@
+"""ConexaoGoogle (volei/conexao_google.py) com o gspread simulado: sem rede."""
+import pytest
+
+from volei import conexao_google
+from volei.conexao_google import ConexaoGoogle
+from volei.cota import ConexaoComCota
+from volei.planilhas import obter_aba
+
+SECRETS = {"spreadsheet": "https://docs.google.com/spreadsheets/d/abc", "type": "service_account"}
+
+
+class Planilha:
+    def __init__(self):
+        self.abertas = []
+        self.inexistentes = set()
+
+    def worksheet(self, nome):
+        self.abertas.append(nome)
+        if nome in self.inexistentes: raise conexao_google.gspread.WorksheetNotFound(nome)
+        return Aba(nome)
+
+
+class Aba:
+    def __init__(self, titulo):
+        self.title = titulo
+        self.erro = None
+
+    def batch_get(self, intervalos, **kwargs):
+        if self.erro: raise self.erro
+        return [[["x"]] for _ in intervalos]
+
+
+class ErroApi(Exception):
+    def __init__(self, codigo):
+        super().__init__(f"APIError {codigo}")
+        self.codigo = codigo
+
+
+class Cliente:
+    def __init__(self):
+        self.chamadas = []
+        self.planilha = Planilha()
+
+    def open_by_url(self, url):
+        self.chamadas.append(("url", url))
+        return self.planilha
+
+    def open(self, titulo, folder_id=None):
+        self.chamadas.append(("titulo", titulo, folder_id))
+        return self.planilha
+
+
+class GSheets:
+    def read(self, worksheet=None, **kwargs): return f"lido {worksheet}"
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    cliente, credenciais = Cliente(), []
+    monkeypatch.setattr(conexao_google.gspread, "service_account_from_dict",
+                        lambda info: credenciais.append(info) or cliente)
+    cliente.credenciais = credenciais
+    return cliente
+
+
+def test_abre_a_planilha_uma_vez_com_a_service_account(cliente):
+    url = "https://docs.google.com/spreadsheets/d/abc/edit"
+    conn = ConexaoGoogle(GSheets(), {"spreadsheet": url, "type": "service_account", "client_email": "x@y"})
+    assert obter_aba(conn, "Historico").title == "Historico"
+    assert obter_aba(conn, "Jogadores").title == "Jogadores"
+    assert cliente.chamadas == [("url", url)]
+    assert cliente.credenciais == [{"type": "service_account", "client_email": "x@y"}]
+    assert conn.read(worksheet="Meta") == "lido Meta"
+
+
+def test_planilha_pelo_titulo(cliente):
+    conn = ConexaoGoogle(GSheets(), {"spreadsheet": "Vôlei", "worksheet": "pasta", "type": "service_account"})
+    conn.aba("Historico")
+    assert cliente.chamadas == [("titulo", "Vôlei", "pasta")]
+
+
+def test_planilha_publica_nao_tem_aba(cliente):
+    conn = ConexaoGoogle(GSheets(), {"spreadsheet": "https://docs.google.com/spreadsheets/d/abc"})
+    assert obter_aba(conn, "Historico") is None
+    assert obter_aba(ConexaoComCota(conn), "Historico") is None
+    assert cliente.chamadas == []
+
+
+def test_cada_aba_e_aberta_uma_vez(cliente):
+    conn = ConexaoComCota(ConexaoGoogle(GSheets(), SECRETS))
+    for _ in range(3):
+        conn.aba("Jogadores").batch_get(["A1:E1"])
+    conn.aba("Historico")
+    assert cliente.planilha.abertas == ["Jogadores", "Historico"]
+    assert conn.relatorio()["requisicoes"] == 3 + 2  # três leituras + a abertura de cada aba
+
+
+def test_aba_apagada_sai_do_cache(cliente):
+    google = ConexaoGoogle(GSheets(), SECRETS)
+    conn = ConexaoComCota(google, max_tentativas=1)
+    google.aba("Jogadores").erro = ErroApi(400)  # "Unable to parse range": aba renomeada na planilha
+    with pytest.raises(ErroApi):
+        conn.aba("Jogadores").batch_get(["A1:E1"])
+    assert google.aba_aberta("Jogadores") is None
+    assert conn.aba("Jogadores").batch_get(["A1:E1"]) == [[["x"]]]
+    assert cliente.planilha.abertas == ["Jogadores", "Jogadores"]
+
+    cliente.planilha.inexistentes.add("Meta")
+    with pytest.raises(conexao_google.gspread.WorksheetNotFound):
+        google.aba("Meta")
+    assert google.aba_aberta("Meta") is None
@@ -0,0 +1,212 @@
+"""ConexaoComCota (volei/cota.py) contra a ConexaoLocal, com o relógio simulado."""
+import pandas as pd
+import pytest
+
+from volei import cota
+from volei.armazenamento import BackendPlanilhas
+from volei.conexao_local import AbaLocal, ConexaoLocal, ErroCota
+from volei.cota import ConexaoComCota, OrcamentoRequisicoes
+from volei.fila_escrita import FilaEscrita
+from volei.planilhas import COLUNAS_HISTORICO, esquecer_cabecalhos
+
+
+class Erro503(Exception):
+    codigo = 503
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """time.monotonic/time.sleep de mentira: dormir só avança o relógio (e fica anotado)."""
+    class Relogio:
+        def __init__(self):
+            self.agora = 1000.0
+            self.esperas = []
+
+        def monotonic(self): return self.agora
+
+        def sleep(self, segundos):
+            self.esperas.append(segundos)
+            self.agora += segundos
+    r = Relogio()
+    monkeypatch.setattr(cota.time, "monotonic", r.monotonic)
+    monkeypatch.setattr(cota.time, "sleep", r.sleep)
+    monkeypatch.setattr(cota.random, "uniform", lambda a, b: 1.0)
+    return r
+
+
+@pytest.fixture(autouse=True)
+def _cabecalhos():
+    esquecer_cabecalhos()
+    yield
+    esquecer_cabecalhos()
+
+
+def planilha():
+    conn = ConexaoLocal()
+    conn.update(worksheet="Jogadores", data=pd.DataFrame(
+        {"Nome": ["Ana", "Bia"], "Elo": 1200.0, "Partidas": 0, "Vitorias": 0, "Grupo": "G"}))
+    conn.update(worksheet="Historico", data=pd.DataFrame(columns=COLUNAS_HISTORICO))
+    return conn
+
+
+def falhando(funcao, erros):
+    """Envolve `funcao` para levantar os erros dados (um por chamada) antes de passar a funcionar."""
+    erros = list(erros)
+    chamadas = []
+
+    def chamada(*args, **kwargs):
+        chamadas.append(args)
+        if erros: raise erros.pop(0)
+        return funcao(*args, **kwargs)
+    chamada.chamadas = chamadas
+    return chamada
+
+
+def test_429_repete_com_espera_exponencial(relogio):
+    base = planilha()
+    base.read = falhando(base.read, [ErroCota("429"), ErroCota("429"), ErroCota("429")])
+    conn = ConexaoComCota(base, limite_por_minuto=1000, espera_base=1.0, espera_max=32.0)
+    df = conn.read(worksheet="Jogadores")
+    assert list(df["Nome"]) == ["Ana", "Bia"]
+    assert relogio.esperas == [1.0, 2.0, 4.0]
+    assert conn.relatorio()["repeticoes"] == 3
+
+
+def test_espera_limitada_por_espera_max(relogio):
+    base = planilha()
+    base.read = falhando(base.read, [ErroCota("429")] * 4)
+    conn = ConexaoComCota(base, limite_por_minuto=1000, max_tentativas=5, espera_base=1.0, espera_max=3.0)
+    conn.read(worksheet="Jogadores")
+    assert relogio.esperas == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_desiste_depois_de_max_tentativas(relogio):
+    base = planilha()
+    base.read = falhando(base.read, [ErroCota("429")] * 10)
+    conn = ConexaoComCota(base, limite_por_minuto=1000, max_tentativas=3)
+    with pytest.raises(ErroCota):
+        conn.read(worksheet="Jogadores")
+    assert len(base.read.chamadas) == 3
+    assert conn.requisicoes == 3 and conn.repeticoes == 2
+
+
+def test_erro_permanente_nao_repete(relogio):
+    base = planilha()
+    base.read = falhando(base.read, [ValueError("aba não existe")])
+    conn = ConexaoComCota(base, limite_por_minuto=1000)
+    with pytest.raises(ValueError):
+        conn.read(worksheet="Jogadores")
+    assert len(base.read.chamadas) == 1 and relogio.esperas == []
+
+
+def test_orcamento_janela_deslizante(relogio):
+    orcamento = OrcamentoRequisicoes(limite_por_minuto=3, janela=60.0, folga=1.0)
+    for _ in range(3):
+        orcamento.reservar()
+        relogio.agora += 10
+    assert relogio.esperas == [] and orcamento.usadas() == 3
+    orcamento.reservar()  # no limite: espera a primeira chamada (t=1000) sair da janela
+    assert relogio.agora == pytest.approx(1060.0)
+    orcamento.reservar()  # e a próxima espera a segunda (t=1010)
+    assert relogio.agora == pytest.approx(1070.0)
+    assert relogio.esperas == [pytest.approx(30.0), pytest.approx(10.0)]
+    assert orcamento.usadas() == 3
+
+
+def test_orcamento_espaca_perto_do_limite(relogio):
+    orcamento = OrcamentoRequisicoes(limite_por_minuto=10, janela=60.0, folga=0.5)
+    for _ in range(5): orcamento.reservar()
+    assert relogio.esperas == []
+    orcamento.reservar()  # acima da folga: uma chamada a cada janela/limite segundos
+    assert relogio.esperas == [pytest.approx(6.0)]
+
+
+def test_orcamento_evita_recusas_da_api(relogio):
+    base = planilha()
+    base.cota_por_minuto, base.janela = 5, 60.0
+    base._recentes.clear()  # a cota só vale depois da carga inicial
+    conn = ConexaoComCota(base, limite_por_minuto=5, janela=60.0)
+    for _ in range(12): conn.read(worksheet="Jogadores")
+    assert base.recusadas == 0 and conn.repeticoes == 0
+    assert sum(relogio.esperas) >= 60.0
+
+
+def test_append_nao_repete_5xx_depois_de_gravar(relogio, monkeypatch):
+    base = planilha()
+    original = AbaLocal.append_rows
+
+    def grava_e_falha(self, values, **kwargs):
+        original(self, values, **kwargs)
+        raise Erro503("503 Service Unavailable")
+    monkeypatch.setattr(AbaLocal, "append_rows", grava_e_falha)
+    conn = ConexaoComCota(base, limite_por_minuto=1000)
+    aba = conn.aba("Historico")
+    with pytest.raises(Erro503):
+        aba.append_rows([["01/01/2024", "A", "B", "Time A", "'+10.0", "G"]])
+    assert len(base._abas["Historico"]) == 2  # cabeçalho + uma linha
+
+
+def test_append_repete_429(relogio, monkeypatch):
+    base = planilha()
+    original = AbaLocal.append_rows
+    erros = [ErroCota("429")]
+
+    def recusa_uma_vez(self, values, **kwargs):
+        if erros: raise erros.pop()
+        original(self, values, **kwargs)
+    monkeypatch.setattr(AbaLocal, "append_rows", recusa_uma_vez)
+    conn = ConexaoComCota(base, limite_por_minuto=1000)
+    conn.aba("Historico").append_rows([["x"] * 6])
+    assert len(base._abas["Historico"]) == 2 and conn.repeticoes == 1
+
+
+def test_update_nao_repete_5xx_mas_leitura_sim(relogio):
+    base = planilha()
+    base.update = falhando(base.update, [Erro503("503")])
+    base.read = falhando(base.read, [Erro503("503")])
+    conn = ConexaoComCota(base, limite_por_minuto=1000)
+    conn.read(worksheet="Jogadores")
+    with pytest.raises(Erro503):
+        conn.update(worksheet="Meta", data=pd.DataFrame({"Chave": ["a"], "Valor": ["b"]}))
+    assert len(base.update.chamadas) == 1
+
+
+def test_falha_de_conexao_antes_do_envio_repete_gravacao(relogio):
+    class NewConnectionError(OSError):
+        pass
+    base = planilha()
+    base.update = falhando(base.update, [NewConnectionError("sem rede")])
+    conn = ConexaoComCota(base, limite_por_minuto=1000)
+    conn.update(worksheet="Meta", data=pd.DataFrame({"Chave": ["a"], "Valor": ["b"]}))
+    assert len(base.update.chamadas) == 2
+
+
+def test_fila_nao_duplica_historico(relogio, monkeypatch):
+    base = planilha()
+    original = AbaLocal.append_rows
+    falhas = [Erro503("503")]
+
+    def grava_e_falha_uma_vez(self, values, **kwargs):
+        original(self, values, **kwargs)
+        if falhas and self.title == "Historico": raise falhas.pop()
+    monkeypatch.setattr(AbaLocal, "append_rows", grava_e_falha_uma_vez)
+    backend = BackendPlanilhas(ConexaoComCota(base, limite_por_minuto=1000))
+    backend.ler_jogadores(ttl=0)
+    fila = FilaEscrita(backend, arquivo=None)
+    registro = {"Data": "01/01/2024 20:00", "Time A": "Ana", "Time B": "Bia", "Vencedor": "Time A",
+                "Pontos_Elo": "'+16.0", "Grupo": "G"}
+    delta = {"Elo": 16.0, "Partidas": 1, "Vitorias": 1}
+    fila.enfileirar([{"chave": ["G", "Ana"], "base": "", "delta": delta}], [registro])
+    with pytest.raises(Erro503):
+        fila.enviar()
+    # Mesmo resultado enfileirado de novo (diário reenviando) e uma partida nova no mesmo lote
+    id_item = fila._itens[0]["id"]
+    fila.enfileirar([], [registro], id_item=id_item)
+    fila.enfileirar([], [{**registro, "Data": "01/01/2024 20:15"}])
+    assert fila.enviar() == 2
+
+    historico = base.read(worksheet="Historico")
+    assert list(historico["Data"]) == ["01/01/2024 20:00", "01/01/2024 20:15"]
+    assert [linha[4] for linha in base._abas["Historico"][1:]] == ["+16.0", "+16.0"]
+    jogadores = base.read(worksheet="Jogadores").set_index("Nome")
+    assert jogadores.loc["Ana", "Elo"] == 1216.0 and jogadores.loc["Ana", "Partidas"] == 1
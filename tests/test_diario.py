@@ -0,0 +1,55 @@
+"""Diário da quadra (volei/diario.py): recuperação na abertura e confirmações."""
+import time
+
+from volei.armazenamento import BackendSQLite
+from volei.diario import Diario
+from volei.fila_escrita import FilaEscrita
+
+GRUPO = "G"
+
+
+def resultado(diario, a=("Ana",), b=("Bia",)):
+    return diario.registrar(GRUPO, 'resultado', {'quadra': None, 'lado': 'A', 'A': list(a), 'B': list(b),
+                                                 'alteracoes': [], 'historico': [{"Grupo": GRUPO}]})
+
+
+def test_resultado_nao_confirmado_volta_como_pendente(tmp_path):
+    arquivo = str(tmp_path / "diario.jsonl")
+    diario = Diario(arquivo)
+    confirmado, perdido = resultado(diario), resultado(diario)
+    diario.confirmar(confirmado['id'])
+
+    reaberto = Diario(arquivo)
+    assert [e['id'] for e in reaberto.pendentes()] == [perdido['id']]
+    assert reaberto.estado(GRUPO) == diario.estado(GRUPO)
+
+
+def test_abrir_recupera_uma_vez(tmp_path):
+    diario = Diario(str(tmp_path / "diario.jsonl"))
+    chamadas = []
+    diario.abrir(chamadas.append)
+    diario.abrir(chamadas.append)
+    assert chamadas == [diario] and diario.recuperado
+
+
+def esperar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.01)
+
+
+def test_confirmacao_perdida_nao_grava_o_resultado_de_novo(tmp_path):
+    arquivo = str(tmp_path / "diario.jsonl")
+    backend = BackendSQLite(str(tmp_path / "volei.db"))
+    diario = Diario(arquivo)
+    evento = resultado(diario)
+    fila = FilaEscrita(backend, arquivo=str(tmp_path / "fila_escrita.jsonl")).iniciar()
+    fila.enfileirar([], evento['dados']['historico'], id_item=evento['id'])
+    esperar(lambda: len(backend.ler_historico()) == 1 and not fila.status()['pendentes'])
+    # Queda antes de confirmar: a abertura seguinte, com a fila já rodando, reenvia o resultado
+    fila = FilaEscrita(backend, arquivo=fila.arquivo).iniciar()
+    [pendente] = Diario(arquivo).pendentes()
+    assert fila.enfileirar([], pendente['dados']['historico'], id_item=pendente['id']) is None
+    time.sleep(0.1)
+    assert fila.status()['pendentes'] == 0 and len(backend.ler_historico()) == 1
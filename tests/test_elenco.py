@@ -0,0 +1,50 @@
+"""Elenco (volei/elenco.py): consultas e partidas sem copiar colunas inteiras."""
+import numpy as np
+import pandas as pd
+
+from volei.elenco import Elenco, compactar_jogadores
+
+
+def liga(n=200):
+    return compactar_jogadores(pd.DataFrame({
+        "Nome": [f"J{i:03d}" for i in range(n)], "Elo": 1200.0, "Partidas": 0, "Vitorias": 0,
+        "Grupo": ["A" if i % 2 else "B" for i in range(n)]}))
+
+
+def test_partida_escreve_nas_posicoes_sem_trocar_as_colunas():
+    base = liga()
+    elenco = Elenco(base)
+    colunas = {c: elenco.df[c].to_numpy() for c in ("Elo", "Partidas", "Vitorias")}
+    antes = elenco.do_grupo("A")
+
+    alteradas = elenco.aplicar_partida("A", ["J001", "J003"], ["J005", "J999"], 12.5)
+    assert alteradas == [("A", "J001"), ("A", "J003"), ("A", "J005")]
+    for c, valores in colunas.items():
+        assert np.shares_memory(elenco.df[c].to_numpy(), valores)  # mesma coluna, escrita no lugar
+    linhas = elenco.jogadores("A", ["J001", "J005", "J007"])
+    assert linhas["Elo"].tolist() == [1212.5, 1187.5, 1200.0]
+    assert linhas["Partidas"].tolist() == [1, 1, 0] and linhas["Vitorias"].tolist() == [1, 0, 0]
+    assert elenco.df["Partidas"].dtype == np.int32 and elenco.versao == 1
+
+    # Quem leu antes (e o DataFrame recebido) não muda por baixo
+    assert (antes["Elo"] == 1200.0).all() and (base["Elo"] == 1200.0).all()
+
+
+def test_consulta_de_todas_as_linhas_e_copia():
+    elenco = Elenco(liga(4).assign(Grupo="A"))
+    todos = elenco.do_grupo("A")
+    elenco.aplicar_partida("A", ["J000"], ["J001"], 10.0)
+    assert todos["Elo"].tolist() == [1200.0] * 4
+
+
+def test_adicionar_somar_e_substituir_continuam_no_lugar():
+    elenco = Elenco(liga(4))
+    elenco.adicionar({"Nome": "Eva", "Elo": 1250.0, "Partidas": 3, "Vitorias": 2, "Grupo": "A"})
+    elenco.aplicar_partida("A", ["Eva"], ["J001"], 5.0)
+    elenco.somar_alteracoes([{"chave": ["A", "Eva"], "base": "", "delta": {"Elo": 1.0, "Partidas": 1, "Vitorias": 0}},
+                             {"chave": ["A", "Eva"], "base": "", "delta": {"Elo": 1.0, "Partidas": 1, "Vitorias": 1}}])
+    assert elenco.registros("A", ["Eva"]) == [{"Elo": 1257.0, "Partidas": 6, "Vitorias": 4, "Grupo": "A", "Nome": "Eva"}]
+
+    elenco.substituir_valores("A", pd.DataFrame({"Nome": ["J001", "Zeca"], "Elo": [1111.0, 1.0]}))
+    assert elenco.valores("A", ["J001", "Eva"]) == (["J001", "Eva"], [1111.0, 1257.0], [1, 6])
+    assert elenco.df.loc[elenco.posicao[("A", "J001")], "Elo"] == 1111.0
@@ -0,0 +1,31 @@
+"""estimar_elo_inicial (volei/elo.py)."""
+import pandas as pd
+import pytest
+
+from volei.elo import ReplayElo, estimar_elo_inicial
+
+
+def historico():
+    return pd.DataFrame({
+        "Time A": ["Ana, Bia", "Ana, Caio", "Bia, Caio"],
+        "Time B": ["Caio, Duda", "Bia, Duda", "Ana, Duda"],
+        "Vencedor": ["Time A", "Time B", "Time A"],
+    })
+
+
+def test_estima_o_elo_inicial_de_partidas_do_elo():
+    iniciais = {"Ana": 1300.0, "Bia": 1200.0, "Caio": 1150.0, "Duda": 1250.0}
+    df = historico()
+    replay = ReplayElo(df, elo_inicial=iniciais)
+    replay.executar()
+    df["Pontos_Elo"] = [f"'{d:+.1f}" for d in replay.deltas]
+    atual = replay.resultado()[["Nome", "Elo"]]
+
+    estimado = estimar_elo_inicial(df, atual)
+    assert estimado == pytest.approx(iniciais, abs=0.2)  # Pontos_Elo é gravado com uma casa
+
+
+def test_nao_estima_grupos_de_outros_motores():
+    df = historico().assign(Pontos_Elo=["'+12.0", "'+9.5", "'+14.2"])
+    atual = pd.DataFrame({"Nome": ["Ana", "Bia", "Caio", "Duda"], "Elo": 1200.0})
+    assert estimar_elo_inicial(df, atual, motor="glicko2") is None
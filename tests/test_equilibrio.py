@@ -0,0 +1,96 @@
+"""Motores de equilíbrio (volei/equilibrio.py) contra a força bruta em elencos pequenos."""
+import itertools
+import random
+
+import pytest
+
+from volei.equilibrio import equilibrar
+
+
+def elenco(n, seed):
+    rng = random.Random(seed)
+    return [{"Nome": f"J{i}", "Elo": round(rng.uniform(900, 1600), 1)} for i in range(n)]
+
+
+def forca_bruta(jogadores, levantadores, tamanho, fixos_a=(), fixos_b=(), evitar=()):
+    """Menor diferença entre médias entre todas as divisões válidas (levantadores espalhados, sem repetir times)."""
+    elos = {j['Nome']: j['Elo'] for j in jogadores}
+    livres = [n for n in elos if n not in fixos_a and n not in fixos_b]
+    total = min(len(elos), 2 * tamanho)
+    na = min(tamanho, max((total + 1) // 2, len(fixos_a)), total - len(fixos_b))
+    nb = min(tamanho, total - na)
+    livres = livres[:na + nb - len(fixos_a) - len(fixos_b)]
+    evitar = [frozenset(t) for t in evitar]
+    melhor = None
+    for escolha in itertools.combinations(livres, na - len(fixos_a)):
+        a = list(fixos_a) + list(escolha)
+        b = list(fixos_b) + [n for n in livres if n not in escolha]
+        if abs(sum(n in levantadores for n in a) - sum(n in levantadores for n in b)) > 1: continue
+        if frozenset(a) in evitar or frozenset(b) in evitar: continue
+        dif = abs(sum(elos[n] for n in a) / na - sum(elos[n] for n in b) / nb)
+        melhor = dif if melhor is None else min(melhor, dif)
+    return melhor
+
+
+@pytest.mark.parametrize("n, tamanho, seed", [(4, 2, 0), (6, 3, 1), (7, 3, 2), (8, 4, 3), (10, 5, 4),
+                                              (12, 6, 5), (11, 6, 6), (9, 4, 7), (14, 6, 8)])
+def test_exato_igual_a_forca_bruta(n, tamanho, seed):
+    jogadores = elenco(n, seed)
+    levantadores = ["J1", "J4"]
+    r = equilibrar(jogadores, levantadores, tamanho, motor="exato", tempo_limite=30)
+    assert r["otimo"] and r["levantadores_ok"]
+    assert r["diferenca"] == pytest.approx(forca_bruta(jogadores, levantadores, tamanho))
+    assert len(r["A"]) <= tamanho and len(r["B"]) <= tamanho and not set(r["A"]) & set(r["B"])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_auto_otimo_e_heuristico_nunca_melhor_que_o_exato(seed):
+    jogadores = elenco(12, seed)
+    exato = equilibrar(jogadores, [], 6, motor="exato", tempo_limite=30)
+    auto = equilibrar(jogadores, [], 6, motor="auto", tempo_limite=30)
+    heuristico = equilibrar(jogadores, [], 6, motor="heuristico", tempo_limite=30)
+    assert auto["diferenca"] == pytest.approx(exato["diferenca"])
+    assert heuristico["diferenca"] >= exato["diferenca"] - 1e-9
+    assert sorted(heuristico["A"] + heuristico["B"]) == sorted(j["Nome"] for j in jogadores)
+
+
+@pytest.mark.parametrize("motor", ["exato", "heuristico", "auto"])
+def test_fixos_ficam_no_time_pedido(motor):
+    jogadores = elenco(10, 11)
+    fixos_a, fixos_b = ["J0", "J3"], ["J5"]
+    r = equilibrar(jogadores, [], 5, fixos_a=fixos_a, fixos_b=fixos_b, motor=motor, tempo_limite=30)
+    assert set(fixos_a) <= set(r["A"]) and set(fixos_b) <= set(r["B"])
+    if motor != "heuristico":
+        assert r["diferenca"] == pytest.approx(forca_bruta(jogadores, [], 5, fixos_a, fixos_b))
+
+
+@pytest.mark.parametrize("motor", ["exato", "auto"])
+def test_nao_repete_os_times_da_partida_anterior(motor):
+    jogadores = elenco(8, 21)
+    anterior = equilibrar(jogadores, [], 4, motor="exato", tempo_limite=30)
+    r = equilibrar(jogadores, [], 4, evitar=[anterior["A"], anterior["B"]], motor=motor, tempo_limite=30)
+    assert not r["repete_times"]
+    assert {frozenset(r["A"]), frozenset(r["B"])} != {frozenset(anterior["A"]), frozenset(anterior["B"])}
+    assert r["diferenca"] == pytest.approx(forca_bruta(jogadores, [], 4, evitar=[anterior["A"], anterior["B"]]))
+
+
+def test_repete_quando_nao_ha_outra_opcao():
+    jogadores = elenco(2, 0)
+    r = equilibrar(jogadores, [], 1, evitar=[["J0"]], motor="exato")
+    assert r["repete_times"] and sorted(r["A"] + r["B"]) == ["J0", "J1"]
+
+
+@pytest.mark.parametrize("motor", ["exato", "heuristico", "guloso"])
+def test_levantadores_espalhados(motor):
+    jogadores = elenco(12, 31)
+    levantadores = ["J0", "J1", "J2", "J3"]  # os quatro de maior Elo estariam juntos sem a restrição
+    for j, elo in zip(jogadores[:4], (1700, 1690, 1680, 1670)): j["Elo"] = elo
+    r = equilibrar(jogadores, levantadores, 6, motor=motor, tempo_limite=30)
+    assert sum(n in levantadores for n in r["A"]) == 2 and sum(n in levantadores for n in r["B"]) == 2
+
+
+def test_sobra_quem_nao_cabe():
+    jogadores = elenco(15, 41)
+    r = equilibrar(jogadores, [], 6, motor="exato", tempo_limite=30)
+    # Os primeiros da lista (ordem de prioridade da fila) jogam; os últimos ficam de fora
+    assert sorted(r["A"] + r["B"], key=lambda n: int(n[1:])) == [f"J{i}" for i in range(12)]
@@ -0,0 +1,120 @@
+"""CacheHistorico (volei/historico.py): partidas registradas antes de a fila gravar."""
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from volei.historico import CacheHistorico
+from volei.planilhas import COLUNAS_HISTORICO
+
+
+def partida(minuto, pontos="'+12.3", grupo="G"):
+    return {"Data": f"01/01/2024 20:{minuto:02d}", "Time A": "Ana, Bia", "Time B": "Caio, Duda",
+            "Vencedor": "Time A", "Pontos_Elo": pontos, "Grupo": grupo}
+
+
+class Planilha:
+    """Aba Historico em memória; `gravadas` é o que a fila de escrita já enviou."""
+    def __init__(self, linhas=()):
+        self.gravadas = list(linhas)
+        self.leituras = 0
+
+    def ler(self):
+        self.leituras += 1
+        return pd.DataFrame(self.gravadas, columns=COLUNAS_HISTORICO)
+
+
+def test_registrada_sobrevive_a_invalidar_ate_ser_gravada():
+    planilha = Planilha([partida(0)])
+    cache = CacheHistorico(planilha.ler, intervalo=0)
+    assert len(cache.todos()) == 1
+    cache.registrar([partida(15)])
+    assert len(cache.todos()) == 2
+
+    cache.invalidar()  # releitura antes de a fila esvaziar
+    assert cache.todos()['Data'].tolist() == ["01/01/2024 20:00", "01/01/2024 20:15"]
+    assert len(cache.do_grupo("G")) == 2
+
+    # A fila gravou (a planilha devolve sem o apóstrofo): nem some nem aparece duas vezes
+    planilha.gravadas.append({**partida(15), "Pontos_Elo": "+12.3"})
+    cache.invalidar()
+    assert cache.todos()['Data'].tolist() == ["01/01/2024 20:00", "01/01/2024 20:15"]
+    assert cache._pendentes == []
+    cache.invalidar()
+    assert len(cache.todos()) == 2
+
+
+def test_registrada_antes_da_primeira_leitura():
+    planilha = Planilha([partida(0)])
+    cache = CacheHistorico(planilha.ler, intervalo=0)
+    cache.registrar([partida(15)])
+    assert len(cache.todos()) == 2
+
+
+def test_partidas_iguais_contam_separadas():
+    planilha = Planilha()
+    cache = CacheHistorico(planilha.ler, intervalo=0)
+    cache.todos()
+    cache.registrar([partida(15), partida(15)])
+    planilha.gravadas.append(partida(15, pontos=12.3))
+    cache.invalidar()
+    assert len(cache.todos()) == 2 and len(cache._pendentes) == 1
+
+
+def test_indice_e_agregados_depois_da_recarga():
+    planilha = Planilha([partida(0)])
+    cache = CacheHistorico(planilha.ler, intervalo=0)
+    cache.agregados()
+    cache.registrar([partida(15)])
+    cache.invalidar()
+    assert len(cache.indice().partidas) == 2
+
+
+def test_uma_revalidacao_por_vez():
+    liberar = threading.Event()
+    planilha = Planilha([partida(0)])
+
+    def ler_devagar():
+        if planilha.leituras: liberar.wait(5)
+        return planilha.ler()
+    cache = CacheHistorico(ler_devagar, intervalo=0.01)
+    cache.todos()
+    time.sleep(0.02)
+    cache.registrar([partida(15)])
+    threads = [threading.Thread(target=cache.todos) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    liberar.set()
+    for _ in range(100):
+        if not cache._revalidando: break
+        time.sleep(0.01)
+    assert planilha.leituras == 2
+    assert len(cache.todos()) == 2  # a recarga em segundo plano não apagou a partida registrada
+
+
+def test_consultas_sobrevivem_a_invalidar_de_outra_thread():
+    planilha = Planilha([partida(i % 60, grupo="GH"[i % 2]) for i in range(50)])
+    cache = CacheHistorico(planilha.ler, intervalo=0)
+    parar, erros = threading.Event(), []
+
+    def invalidando():
+        while not parar.is_set(): cache.invalidar()
+
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread = threading.Thread(target=invalidando)
+    thread.start()
+    try:
+        for _ in range(60):
+            try:
+                assert len(cache.todos()) == 50 and len(cache.do_grupo("G")) == 25
+                assert len(cache.do_grupo("X")) == 0
+                cache.indice()
+            except Exception as e:
+                erros.append(e)
+    finally:
+        parar.set()
+        thread.join()
+        sys.setswitchinterval(intervalo)
+    assert erros == []
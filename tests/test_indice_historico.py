@@ -0,0 +1,78 @@
+"""interpretar_datas e IndiceHistorico (volei/indice_historico.py)."""
+import datetime
+import types
+
+import pandas as pd
+
+from volei import indice_historico
+from volei.indice_historico import IndiceHistorico, interpretar_datas
+
+
+def ts(*args):
+    return pd.Timestamp(datetime.datetime(*args))
+
+
+def test_formato_atual_com_ano():
+    datas = interpretar_datas(["05/03/2024 20:15", "'06/03/24 21:00"], agora=datetime.datetime(2026, 1, 1))
+    assert datas.tolist() == [ts(2024, 3, 5, 20, 15), ts(2024, 3, 6, 21, 0)]
+
+
+def test_formato_antigo_atravessando_a_virada_do_ano():
+    agora = datetime.datetime(2025, 1, 20, 12, 0)
+    datas = interpretar_datas(["28/12 20:00", "30/12 21:30", "02/01 19:00", "14/01 20:00"], agora=agora)
+    assert datas.tolist() == [ts(2024, 12, 28, 20, 0), ts(2024, 12, 30, 21, 30), ts(2025, 1, 2, 19, 0),
+                              ts(2025, 1, 14, 20, 0)]
+
+
+def test_formato_antigo_com_varias_viradas():
+    agora = datetime.datetime(2025, 3, 1)
+    datas = interpretar_datas(["15/11 20:00", "20/12 20:00", "10/01 20:00", "15/11 20:00", "03/01 20:00",
+                               "20/02 20:00"], agora=agora)
+    assert [d.year for d in datas] == [2023, 2023, 2024, 2024, 2025, 2025]
+
+
+def test_ultima_linha_no_futuro_fica_no_ano_anterior():
+    # Aberto em janeiro, a última partida sem ano é de dezembro: foi no ano passado
+    datas = interpretar_datas(["30/12 20:00"], agora=datetime.datetime(2025, 1, 3))
+    assert datas.tolist() == [ts(2024, 12, 30, 20, 0)]
+    # Diferença de fuso/relógio de algumas horas não joga a partida de hoje para o ano passado
+    datas = interpretar_datas(["03/01 23:30"], agora=datetime.datetime(2025, 1, 3, 21, 0))
+    assert datas.tolist() == [ts(2025, 1, 3, 23, 30)]
+
+
+def test_formatos_misturados_e_datas_ilegiveis():
+    agora = datetime.datetime(2025, 1, 10)
+    datas = interpretar_datas(["20/12 20:00", "", None, "31/12/2024 22:00", "05/01 20:00", "ontem"], agora=agora)
+    assert datas[0] == ts(2024, 12, 20, 20, 0)
+    assert pd.isna(datas[1]) and pd.isna(datas[2]) and pd.isna(datas[5])
+    assert datas[3] == ts(2024, 12, 31, 22, 0) and datas[4] == ts(2025, 1, 5, 20, 0)
+
+
+def test_indice_separa_as_sessoes_pela_data_deduzida():
+    df = pd.DataFrame({
+        "Data": ["31/12 21:00", "31/12 22:00", "02/01 20:00"],
+        "Time A": ["Ana, Bia", "Ana, Caio", "Bia, Caio"],
+        "Time B": ["Caio, Duda", "Bia, Duda", "Ana, Duda"],
+        "Vencedor": ["Time A", "Time B", "Time A"],
+        "Pontos_Elo": ["'+16.0", "'+12.5", "+15.0"],
+        "Grupo": "G",
+    })
+    indice = IndiceHistorico(df, agora=datetime.datetime(2025, 1, 5))
+    assert indice.partidas_do_dia("G", datetime.date(2024, 12, 31)) == [0, 1]
+    assert indice.ultima_sessao("G") == datetime.date(2025, 1, 2)
+    assert indice.jogadores_do_dia("G", datetime.date(2025, 1, 2)) == {"Ana", "Bia", "Caio", "Duda"}
+    assert indice.partidas_do_jogador("G", "Duda") == [0, 1, 2]
+    assert indice.partidas["Pontos"].tolist() == [16.0, 12.5, 15.0]
+
+
+def test_agora_padrao_e_a_hora_de_brasilia(monkeypatch):
+    instante = datetime.datetime(2025, 1, 1, 4, 0, tzinfo=datetime.timezone.utc)  # 01:00 em Brasília
+
+    class Relogio(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # Servidor com relógio local atrás de Brasília: ainda é 31/12 lá
+            return instante.astimezone(tz) if tz else datetime.datetime(2024, 12, 31, 20, 0)
+
+    monkeypatch.setattr(indice_historico, "datetime", types.SimpleNamespace(datetime=Relogio))
+    assert interpretar_datas(["31/12 23:00", "01/01 00:45"]).tolist() == [ts(2024, 12, 31, 23, 0), ts(2025, 1, 1, 0, 45)]
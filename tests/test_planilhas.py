@@ -0,0 +1,50 @@
+"""Escrita incremental nas abas (volei/planilhas.py) sobre a ConexaoLocal."""
+import pandas as pd
+
+from volei.armazenamento import BackendPlanilhas
+from volei.conexao_local import ConexaoLocal
+from volei.planilhas import (COLUNAS_HISTORICO, SincronizadorJogadores, anexar_historico, anexar_linhas,
+                             esquecer_cabecalhos)
+
+
+def partida(minuto):
+    return {"Data": f"01/01/2024 20:{minuto:02d}", "Time A": "Ana", "Time B": "Bia", "Vencedor": "Time A",
+            "Pontos_Elo": "'+10.0", "Grupo": "G"}
+
+
+def test_anexa_na_ordem_de_colunas_da_aba():
+    esquecer_cabecalhos()
+    conn = ConexaoLocal()
+    conn.update(worksheet="Historico", data=pd.DataFrame(columns=["Grupo", *COLUNAS_HISTORICO[:-1]]))
+    anexar_historico(conn, [partida(0)])
+    assert conn._abas["Historico"][1] == ["G", "01/01/2024 20:00", "Ana", "Bia", "Time A", "+10.0"]
+
+
+def test_releitura_esquece_cabecalho_de_aba_reordenada():
+    esquecer_cabecalhos()
+    conn = ConexaoLocal()
+    backend = BackendPlanilhas(conn)
+    conn.update(worksheet="Historico", data=pd.DataFrame(columns=COLUNAS_HISTORICO))
+    backend.anexar_historico([partida(0)])
+
+    # Alguém reordenou as colunas na planilha; a revalidação do histórico relê a aba
+    df = backend.ler_historico()
+    conn.update(worksheet="Historico", data=df[["Grupo", *COLUNAS_HISTORICO[:-1]]])
+    backend.ler_historico()
+    backend.anexar_historico([partida(5)])
+    assert conn._abas["Historico"][0][0] == "Grupo"
+    assert conn._abas["Historico"][2] == ["G", "01/01/2024 20:05", "Ana", "Bia", "Time A", "+10.0"]
+
+
+def test_regravacao_completa_esquece_cabecalho():
+    esquecer_cabecalhos()
+    conn = ConexaoLocal()
+    jogadores = pd.DataFrame({"Nome": ["Ana"], "Elo": [1200.0], "Partidas": [0], "Vitorias": [0], "Grupo": ["G"]})
+    conn.update(worksheet="Jogadores", data=jogadores)
+    anexar_linhas(conn, "Jogadores", jogadores.assign(Nome="Bia"))
+
+    # Regravação completa com outra ordem de colunas: o próximo anexo segue a ordem nova
+    sync = SincronizadorJogadores(jogadores)
+    sync._enviar_completo(conn, jogadores[["Grupo", "Nome", "Elo", "Partidas", "Vitorias"]])
+    anexar_linhas(conn, "Jogadores", jogadores.assign(Nome="Caio"))
+    assert conn._abas["Jogadores"][-1] == ["G", "Caio", "1200.0", "0", "0"]
@@ -0,0 +1,52 @@
+"""Divisão em várias quadras (volei/quadras.py): quadras completas, fila e equilíbrio entre todos os times."""
+import random
+
+import pytest
+
+from volei.quadras import dividir_quadras
+
+
+def elos(n, seed):
+    rng = random.Random(seed)
+    return {f"J{i}": round(rng.uniform(900, 1600), 1) for i in range(n)}
+
+
+def media(e, nomes): return sum(e[n] for n in nomes) / len(nomes)
+
+
+def test_so_quadras_completas_e_o_resto_volta_para_a_fila():
+    e = elos(19, 1)
+    pool = list(e) + ["Fantasma"]  # sem Elo: fica de fora
+    r = dividir_quadras(pool, e, [], 3, n_quadras=5)
+    assert len(r["quadras"]) == 3 and len(r["diferencas"]) == 3
+    em_quadra = [n for q in r["quadras"] for lado in ("A", "B") for n in q[lado]]
+    assert all(len(q["A"]) == len(q["B"]) == 3 for q in r["quadras"])
+    # Os primeiros do pool jogam; quem sobra volta na mesma ordem
+    assert sorted(em_quadra) == sorted(pool[:18])
+    assert r["fila"] == ["J18"]
+
+
+def test_sem_gente_para_uma_quadra():
+    e = elos(5, 2)
+    r = dividir_quadras(list(e), e, [], 3, n_quadras=2)
+    assert r["quadras"] == [] and r["fila"] == list(e) and r["amplitude"] == 0.0
+
+
+def test_levantadores_espalhados_entre_os_times():
+    e = elos(16, 3)
+    levantadores = {"J0", "J1", "J2", "J3", "J4"}
+    r = dividir_quadras(list(e), e, levantadores, 4, n_quadras=2)
+    contagem = sorted(sum(n in levantadores for n in q[lado]) for q in r["quadras"] for lado in ("A", "B"))
+    assert contagem == [1, 1, 1, 2]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_times_proximos_da_media_geral(seed):
+    e = elos(24, seed)
+    r = dividir_quadras(list(e), e, [], 4, n_quadras=3, tempo_limite=1.0)
+    medias = [media(e, q[lado]) for q in r["quadras"] for lado in ("A", "B")]
+    assert r["amplitude"] == pytest.approx(max(medias) - min(medias))
+    assert r["diferencas"] == pytest.approx([abs(media(e, q["A"]) - media(e, q["B"])) for q in r["quadras"]])
+    # Bem melhor que uma divisão na ordem do pool
+    ingenua = [media(e, list(e)[i:i + 4]) for i in range(0, 24, 4)]
+    assert r["amplitude"] < (max(ingenua) - min(ingenua)) / 2
@@ -0,0 +1,151 @@
+"""Motores de rating (volei/ratings.py): Glicko-2 contra o exemplo de Glickman e lotes contra partida a partida."""
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from volei.elo import ReplayElo
+from volei.ratings import (ESCALA_GLICKO, MotorElo, MotorGlicko2, ReplayLote, _g, _volatilidade, aplicar_partida,
+                           lote, matriz_times, ondas)
+
+
+# --- GLICKO-2: EXEMPLO DO ARTIGO ("Example of the Glicko-2 system", Glickman) ---
+def test_exemplo_de_glickman():
+    # Jogador 1500 / RD 200 / σ 0.06 contra 1400/30 (vitória), 1550/100 e 1700/300 (derrotas), τ = 0.5
+    mu, phi, sigma, tau = 0.0, 200 / ESCALA_GLICKO, 0.06, 0.5
+    oponentes = np.array([[1400, 30], [1550, 100], [1700, 300]], dtype=float)
+    resultados = np.array([1.0, 0.0, 0.0])
+    mu_j, phi_j = (oponentes[:, 0] - 1500) / ESCALA_GLICKO, oponentes[:, 1] / ESCALA_GLICKO
+    g = _g(phi_j ** 2)
+    e = 1 / (1 + np.exp(-g * (mu - mu_j)))
+    v = 1 / np.sum(g ** 2 * e * (1 - e))
+    delta = v * np.sum(g * (resultados - e))
+    # O artigo arredonda g e E nos passos intermediários: v e Δ batem até a terceira casa
+    assert v == pytest.approx(1.7785, abs=1e-3) and delta == pytest.approx(-0.4834, abs=1e-3)
+
+    [sigma_novo] = _volatilidade(np.array([phi ** 2]), np.array([sigma]), np.array([v]), np.array([delta]), tau)
+    assert sigma_novo == pytest.approx(0.05999, abs=1e-5)
+
+    phi_novo = 1 / math.sqrt(1 / (phi ** 2 + sigma_novo ** 2) + 1 / v)
+    mu_novo = mu + phi_novo ** 2 * np.sum(g * (resultados - e))
+    assert mu_novo * ESCALA_GLICKO + 1500 == pytest.approx(1464.06, abs=0.01)
+    assert phi_novo * ESCALA_GLICKO == pytest.approx(151.52, abs=0.01)
+
+
+def volatilidade_de_referencia(phi, sigma, v, delta, tau, eps=1e-6):
+    """Passo 5 do artigo, escalar, linha a linha."""
+    a = math.log(sigma ** 2)
+
+    def f(x):
+        return math.exp(x) * (delta ** 2 - phi ** 2 - v - math.exp(x)) / (2 * (phi ** 2 + v + math.exp(x)) ** 2) - (x - a) / tau ** 2
+    A = a
+    if delta ** 2 > phi ** 2 + v: B = math.log(delta ** 2 - phi ** 2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0: k += 1
+        B = a - k * tau
+    fA, fB = f(A), f(B)
+    while abs(B - A) > eps:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0: A, fA = B, fB
+        else: fA = fA / 2
+        B, fB = C, fC
+    return math.exp(A / 2)
+
+
+def test_volatilidade_vetorizada_igual_a_escalar():
+    rng = np.random.default_rng(0)
+    phi = rng.uniform(0.2, 2.0, 200)
+    sigma = rng.uniform(0.03, 0.09, 200)
+    v = rng.uniform(0.3, 30.0, 200)
+    delta = rng.normal(0, 3.0, 200)  # inclui os dois ramos (Δ² acima e abaixo de φ² + v)
+    vetorizada = _volatilidade(phi ** 2, sigma, v, delta, 0.5)
+    escalar = [volatilidade_de_referencia(*args, 0.5) for args in zip(phi, sigma, v, delta)]
+    assert vetorizada == pytest.approx(escalar, abs=1e-7)
+
+
+def test_partida_um_contra_um_segue_o_artigo():
+    ratings = {"Ana": 1500.0, "Bia": 1400.0}
+    extras = {"Ana": [200.0, 0.06], "Bia": [30.0, 0.06]}
+    deltas = aplicar_partida(MotorGlicko2(tau=0.5), ratings, extras, ["Ana"], ["Bia"])
+
+    # Ana contra um oponente só (Bia), pelas fórmulas do artigo
+    phi, phi_j = 200 / ESCALA_GLICKO, 30 / ESCALA_GLICKO
+    g = 1 / math.sqrt(1 + 3 * phi_j ** 2 / math.pi ** 2)
+    e = 1 / (1 + math.exp(-g * (0 - (-100 / ESCALA_GLICKO))))
+    v = 1 / (g ** 2 * e * (1 - e))
+    sigma = volatilidade_de_referencia(phi, 0.06, v, v * g * (1 - e), 0.5)
+    phi_novo = 1 / math.sqrt(1 / (phi ** 2 + sigma ** 2) + 1 / v)
+    assert deltas["Ana"] == pytest.approx(phi_novo ** 2 * g * (1 - e) * ESCALA_GLICKO, abs=1e-6)
+    assert extras["Ana"] == pytest.approx([phi_novo * ESCALA_GLICKO, sigma], abs=1e-6)
+    assert deltas["Bia"] < 0
+
+
+def test_glicko2_rd_alto_anda_mais():
+    ratings = {n: 1500.0 for n in ("Novato", "Assiduo", "X", "Y")}
+    extras = {"Novato": [350.0, 0.06], "Assiduo": [60.0, 0.06], "X": [100.0, 0.06], "Y": [100.0, 0.06]}
+    deltas = aplicar_partida(MotorGlicko2(), ratings, extras, ["Novato", "Assiduo"], ["X", "Y"])
+    assert deltas["Novato"] > deltas["Assiduo"] > 0
+
+
+def test_elo_igual_ao_do_app():
+    deltas = aplicar_partida(MotorElo(k=32), {"A": 1300.0, "B": 1100.0, "C": 1200.0, "D": 1200.0}, {}, ["A", "B"], ["C", "D"])
+    assert deltas == pytest.approx({"A": 16.0, "B": 16.0, "C": -16.0, "D": -16.0})
+
+
+# --- LOTES ---
+def partidas_aleatorias(n_jogadores, n_partidas, tamanho, seed):
+    rng = random.Random(seed)
+    V, P = [], []
+    for _ in range(n_partidas):
+        t = rng.randint(1, tamanho)
+        pool = rng.sample(range(n_jogadores), 2 * t - rng.randint(0, 1))  # às vezes um time com um a menos
+        V.append(tuple(pool[:t]))
+        P.append(tuple(pool[t:]))
+    return V, P
+
+
+def jogadores(motor, n, seed):
+    rng = np.random.default_rng(seed)
+    jog = {'r': rng.uniform(1000, 1600, n)}
+    if motor.extras:
+        jog['RD'] = rng.uniform(50, 350, n)
+        jog['Vol'] = rng.uniform(0.04, 0.08, n)
+    return jog
+
+
+@pytest.mark.parametrize("motor", [MotorElo(), MotorGlicko2()], ids=["elo", "glicko2"])
+@pytest.mark.parametrize("n_jogadores, tamanho", [(10, 4), (40, 6), (200, 6)])
+def test_lote_igual_a_partida_a_partida(motor, n_jogadores, tamanho):
+    V, P = partidas_aleatorias(n_jogadores, 300, tamanho, seed=n_jogadores)
+    em_lote, uma_a_uma = jogadores(motor, n_jogadores, 1), jogadores(motor, n_jogadores, 1)
+
+    previsoes = lote(motor, em_lote, matriz_times(V), matriz_times(P))
+    esperadas = [motor.onda(uma_a_uma, matriz_times([v]), matriz_times([p]))[0] for v, p in zip(V, P)]
+    for coluna in em_lote:
+        np.testing.assert_allclose(em_lote[coluna], uma_a_uma[coluna], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(previsoes, esperadas, rtol=0, atol=1e-12)
+
+
+def test_ondas_separam_partidas_com_jogador_em_comum():
+    numero = ondas([[0, 1], [2, 3], [1, 2], [4, 5], [0, 5]], 6)
+    assert numero.tolist() == [0, 0, 1, 0, 1]
+
+
+def test_replay_lote_com_elo_igual_ao_replay_elo():
+    rng = random.Random(3)
+    nomes = [f"J{i}" for i in range(12)]
+    linhas = []
+    for _ in range(200):
+        pool = rng.sample(nomes, 8)
+        linhas.append({"Time A": ", ".join(pool[:4]), "Time B": ", ".join(pool[4:]),
+                       "Vencedor": rng.choice(["Time A", "Time B"])})
+    df = pd.DataFrame(linhas)
+    iniciais = {n: 1100.0 + 20 * i for i, n in enumerate(nomes)}
+    esperado = ReplayElo(df, elo_inicial=iniciais).resultado()
+    obtido = ReplayLote(df, MotorElo(), elo_inicial=iniciais).resultado()
+    np.testing.assert_allclose(obtido["Elo"], esperado["Elo"], atol=1e-9)
+    assert obtido["Partidas"].tolist() == esperado["Partidas"].tolist()
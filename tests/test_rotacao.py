@@ -0,0 +1,82 @@
+"""Regras de rotação de uma quadra (volei/rotacao.py): rei da quadra, fila e substituições."""
+from volei.rotacao import limite_atingido, nova_quadra, proxima_rodada, registrar_vitoria, substituir
+
+ELOS = {f"J{i}": 1000 + 10 * i for i in range(10)}
+
+
+def sem_embaralhar(lista): pass
+
+
+def rodada(quadra, fila, limite=3, tamanho=2, disponiveis=None):
+    return proxima_rodada(quadra, fila, disponiveis or list(ELOS), ELOS, [], tamanho, limite,
+                          embaralhar=sem_embaralhar)
+
+
+def em_jogo(a, b):
+    quadra = nova_quadra()
+    quadra.update(A=list(a), B=list(b))
+    return quadra
+
+
+def test_sequencia_cresce_com_os_mesmos_vencedores_e_recomeca_com_outros():
+    quadra, fila = registrar_vitoria(em_jogo(["J0", "J1"], ["J2", "J3"]), "A", [])
+    assert (quadra["streak"], quadra["vencedores"], quadra["jogos"]) == (1, ["J0", "J1"], 1)
+    assert quadra["A"] is None and quadra["B"] is None
+    assert quadra["ultimos_times"] == [["J0", "J1"], ["J2", "J3"]]
+
+    quadra.update(A=["J1", "J0"], B=["J4", "J5"])  # mesma dupla, em outra ordem
+    quadra, fila = registrar_vitoria(quadra, "A", fila)
+    assert (quadra["streak"], quadra["jogos"]) == (2, 2)
+
+    quadra.update(A=["J1", "J0"], B=["J6", "J7"])
+    quadra, fila = registrar_vitoria(quadra, "B", fila)
+    assert (quadra["streak"], quadra["vencedores"], quadra["jogos"]) == (1, ["J6", "J7"], 3)
+
+
+def test_perdedores_vao_para_o_fim_da_fila():
+    fila = ["J4", "J2", "J5"]  # J2 na fila por engano não fica duplicado
+    quadra, fila = registrar_vitoria(em_jogo(["J0", "J1"], ["J2", "J3"]), "A", fila)
+    assert fila == ["J4", "J5", "J2", "J3"]
+
+
+def test_vencedores_ficam_como_time_a_e_a_fila_completa():
+    quadra = nova_quadra()
+    quadra.update(streak=1, vencedores=["J0", "J1"])
+    quadra, fila, sorteio = rodada(quadra, ["J5", "J4", "J3", "J2"])
+    assert sorteio is None
+    assert quadra["A"] == ["J0", "J1"] and quadra["B"] == ["J5", "J4"]
+    assert fila[:2] == ["J3", "J2"] and not {"J0", "J1", "J4", "J5"} & set(fila)
+
+
+def test_limite_atingido_separa_os_vencedores():
+    quadra = nova_quadra()
+    quadra.update(streak=3, vencedores=["J8", "J9"])
+    assert limite_atingido(quadra, list(ELOS), 3)
+    assert not limite_atingido(quadra, ["J0", "J1"], 3)  # vencedores ausentes não contam
+
+    quadra, fila, sorteio = rodada(quadra, ["J0", "J1", "J2", "J3"])
+    assert sorteio is not None
+    assert ("J8" in quadra["A"]) != ("J9" in quadra["A"])
+    assert ("J8" in quadra["B"]) != ("J9" in quadra["B"])
+    assert set(quadra["A"] + quadra["B"]) == {"J8", "J9", "J0", "J1"}
+    assert (quadra["streak"], quadra["vencedores"]) == (0, None)
+    assert fila[:2] == ["J2", "J3"]
+
+
+def test_abaixo_do_limite_nao_separa():
+    quadra = nova_quadra()
+    quadra.update(streak=2, vencedores=["J8", "J9"])
+    assert not limite_atingido(quadra, list(ELOS), 3)
+    quadra, _, sorteio = rodada(quadra, ["J0", "J1"])
+    assert sorteio is None and quadra["A"] == ["J8", "J9"] and quadra["streak"] == 2
+
+
+def test_substituir():
+    quadra = em_jogo(["J0", "J1"], ["J2", "J3"])
+    assert substituir(quadra, "B", "J3", []) is None
+
+    nova, fila, entrando = substituir(quadra, "B", "J3", ["J4", "J5"])
+    assert entrando == "J4"
+    assert nova["B"] == ["J2", "J4"] and nova["A"] == ["J0", "J1"]
+    assert fila == ["J5", "J3"]
+    assert quadra["B"] == ["J2", "J3"]  # o estado recebido não é alterado
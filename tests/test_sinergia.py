@@ -0,0 +1,112 @@
+"""Matrizes de parcerias e confrontos (volei/sinergia.py): soma incremental, reconstrução e persistência."""
+import datetime
+import random
+
+import pandas as pd
+import pytest
+
+from volei.estado import ArmazemEstado
+from volei.indice_historico import IndiceHistorico
+from volei.sinergia import MatrizesSinergia, SinergiaGrupo
+
+NOMES = ["Ana", "Bia", "Caio", "Duda", "Edu", "Fabi"]
+
+
+def partidas_aleatorias(n, seed):
+    """(vencedores, perdedores, pontos) de n partidas 3x3 entre NOMES."""
+    rng = random.Random(seed)
+    partidas = []
+    for _ in range(n):
+        nomes = rng.sample(NOMES, 6)
+        partidas.append((nomes[:3], nomes[3:], round(rng.uniform(5, 25), 1)))
+    return partidas
+
+
+def historico(partidas, grupo="G"):
+    """Aba Historico com as partidas, alternando o lado vencedor."""
+    linhas = []
+    for i, (venc, perd, pontos) in enumerate(partidas):
+        a, b, vencedor = (venc, perd, "Time A") if i % 2 == 0 else (perd, venc, "Time B")
+        linhas.append({"Data": f"{1 + i % 28:02d}/01/2025 20:00", "Time A": ", ".join(a), "Time B": ", ".join(b),
+                       "Vencedor": vencedor, "Pontos_Elo": f"'+{pontos}", "Grupo": grupo})
+    return IndiceHistorico(pd.DataFrame(linhas), agora=datetime.datetime(2025, 2, 1))
+
+
+def test_registrar_soma_parcerias_e_confrontos():
+    s = SinergiaGrupo()
+    s.registrar(["Ana", "Bia"], ["Caio", "Duda"], 10)
+    s.registrar(["Caio", "Ana"], ["Bia", "Duda"], 6)
+    assert s.partidas == 2
+    assert s.parceria("Ana", "Bia") == s.parceria("Bia", "Ana") == (1, 1, 10.0)
+    assert s.parceria("Caio", "Duda") == (1, 0, -10.0)
+    assert s.parceria("Bia", "Duda") == (1, 0, -6.0)
+    assert s.confronto("Ana", "Caio") == (1, 1, 10.0)
+    assert s.confronto("Ana", "Bia") == (1, 1, 6.0) and s.confronto("Bia", "Ana") == (1, 0, -6.0)
+    assert s.confronto("Duda", "Ana") == (2, 0, -16.0)
+    assert s.parceria("Ana", "Fabi") == (0, 0, 0.0)
+
+
+def test_reconstruir_pelo_historico_da_o_mesmo_que_registrar():
+    partidas = partidas_aleatorias(40, 1)
+    incremental = SinergiaGrupo()
+    for venc, perd, pontos in partidas: incremental.registrar(venc, perd, pontos)
+    indice = historico(partidas)
+    reconstruida = SinergiaGrupo.de_historico(indice.partidas, indice.participacoes)
+    assert reconstruida.partidas == incremental.partidas == 40
+    for a in NOMES:
+        for b in NOMES:
+            if a == b: continue
+            assert reconstruida.parceria(a, b) == pytest.approx(incremental.parceria(a, b))
+            assert reconstruida.confronto(a, b) == pytest.approx(incremental.confronto(a, b))
+
+
+def test_serializar_e_de_dict():
+    s = SinergiaGrupo()
+    for venc, perd, pontos in partidas_aleatorias(15, 2): s.registrar(venc, perd, pontos)
+    copia = SinergiaGrupo.de_dict(s.serializar())
+    assert copia.serializar() == s.serializar()
+    assert copia.confronto("Fabi", "Ana") == pytest.approx(s.confronto("Fabi", "Ana"))
+    # A parceria carregada continua compartilhada entre os dois lados
+    copia.registrar(["Ana", "Bia"], ["Caio", "Duda"], 5)
+    assert copia.parceria("Bia", "Ana") == copia.parceria("Ana", "Bia")
+
+
+def test_consultas():
+    s = SinergiaGrupo()
+    s.registrar(["Ana", "Bia"], ["Caio", "Duda"], 10)
+    s.registrar(["Ana", "Bia"], ["Caio", "Edu"], 8)
+    s.registrar(["Ana", "Caio"], ["Bia", "Duda"], 4)
+
+    parceiros = s.parceiros_de("Ana")
+    assert parceiros["Parceiro"].tolist() == ["Bia", "Caio"]
+    assert parceiros.iloc[0][["Jogos", "Vitorias", "Aproveitamento", "Saldo_Elo"]].tolist() == [2, 2, 1.0, 18.0]
+    assert s.parceiros_de("Ana", min_jogos=2)["Parceiro"].tolist() == ["Bia"]
+
+    duplas = s.duplas()
+    assert len(duplas) == len({frozenset(p) for p in zip(duplas["Jogador"], duplas["Parceiro"])})
+    assert duplas.iloc[0][["Jogador", "Parceiro"]].tolist() == ["Ana", "Bia"]
+    # Cada confronto aparece uma vez, visto por quem leva vantagem
+    confrontos = s.confrontos()
+    assert (confrontos["Saldo_Elo"] >= 0).all()
+    assert confrontos[(confrontos["Jogador"] == "Ana") & (confrontos["Adversario"] == "Duda")]["Jogos"].tolist() == [2]
+    assert s.adversarios_de("Duda")["Saldo_Elo"].tolist() == [-4.0, -10.0, -14.0]
+
+
+def test_matrizes_do_grupo_em_disco(tmp_path):
+    armazem = ArmazemEstado(pasta=str(tmp_path), atraso=60, prefixo="sinergia")
+    matrizes = MatrizesSinergia(armazem)
+    matrizes.registrar("G", ["Ana"], ["Bia"], 10)  # sem matrizes ainda: fica para a reconstrução
+    assert matrizes.do_grupo("G") is None
+
+    partidas = partidas_aleatorias(10, 3)
+    matrizes.reconstruir("G", historico(partidas[:9]))
+    matrizes.registrar("G", *partidas[9])
+    armazem.descarregar()
+    assert (tmp_path / "sinergia_G.json").exists()
+
+    esperada = SinergiaGrupo()
+    for venc, perd, pontos in partidas: esperada.registrar(venc, perd, pontos)
+    lida = MatrizesSinergia(ArmazemEstado(pasta=str(tmp_path), prefixo="sinergia")).do_grupo("G")
+    assert lida.partidas == 10
+    assert lida.parceria("Ana", "Bia") == pytest.approx(esperada.parceria("Ana", "Bia"))
+    assert lida.confronto("Caio", "Edu") == pytest.approx(esperada.confronto("Caio", "Edu"))
@@ -0,0 +1 @@
+"""Módulos de apoio do Vôlei Manager (dados, planilhas e lógica de jogo)."""
@@ -0,0 +1,94 @@
+"""
+Agregados diários por jogador: (Grupo, Dia, Jogador) -> Partidas, Vitorias, Saldo_Elo.
+
+São montados de uma vez a partir do IndiceHistorico, na primeira consulta
+depois de cada recarga do histórico: uma tabela ordenada por (Grupo, Dia)
+e um dicionário (grupo, dia) -> fatia dela. Depois cada partida gravada é
+somada com `anexar` num dicionário à parte, sem varrer o histórico de novo.
+Assim o "Último dia" (ou qualquer outro dia) é uma consulta direta, e o
+resumo da sessão (destaque, mais vitórias) sai só das linhas do dia.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_DIA = ["Partidas", "Vitorias", "Saldo_Elo"]
+
+
+def _somar(partidas, participacoes):
+    """Soma por (Grupo, Dia, Jogador) e nº de partidas por (Grupo, Dia), só das partidas com data e vencedor."""
+    validas = partidas[partidas['Timestamp'].notna() & partidas['Lado_vencedor'].notna()]
+    linhas = participacoes[['Jogador', 'Venceu']].join(validas[['Grupo', 'Dia', 'Pontos']], how='inner')
+    venceu = linhas['Venceu'].astype(bool).to_numpy()
+    linhas = linhas.assign(Venceu=venceu, Saldo_Elo=np.where(venceu, linhas['Pontos'], -linhas['Pontos']))
+    soma = linhas.groupby(['Grupo', 'Dia', 'Jogador'], sort=True).agg(
+        Partidas=('Venceu', 'size'), Vitorias=('Venceu', 'sum'), Saldo_Elo=('Saldo_Elo', 'sum'))
+    return soma.reset_index(), validas.groupby(['Grupo', 'Dia'], sort=False).size()
+
+
+class AgregadosDia:
+    def __init__(self, indice):
+        soma, por_dia = _somar(indice.partidas, indice.participacoes)
+        self._base = soma[['Jogador'] + COLUNAS_DIA]
+        self._fatias = {}    # (grupo, dia) -> (início, fim) em _base
+        self._novos = {}     # (grupo, dia) -> {jogador: [partidas, vitorias, saldo_elo]} gravados depois
+        self._partidas = {k: int(n) for k, n in por_dia.items()}
+        self._datas = {}     # grupo -> dias com partidas, em ordem
+        if soma.empty: return
+        # Ordenada por (Grupo, Dia): cada dia é uma fatia contígua, delimitada onde a chave muda
+        grupos, dias = soma['Grupo'].to_numpy(), soma['Dia'].to_numpy()
+        quebras = np.flatnonzero((grupos[1:] != grupos[:-1]) | (dias[1:] != dias[:-1])) + 1
+        inicios = np.concatenate(([0], quebras)).tolist()
+        fins = inicios[1:] + [len(soma)]
+        for ini, fim in zip(inicios, fins):
+            grupo, dia = grupos[ini], dias[ini]
+            self._fatias[(grupo, dia)] = (ini, fim)
+            self._datas.setdefault(grupo, []).append(dia)
+
+    def anexar(self, partidas, participacoes):
+        """Soma partidas novas (tabelas `partidas`/`participacoes` no formato do IndiceHistorico)."""
+        soma, por_dia = _somar(partidas, participacoes)
+        for chave, n in por_dia.items(): self._partidas[chave] = self._partidas.get(chave, 0) + int(n)
+        for grupo, dia, jogador, n, v, saldo in soma.itertuples(index=False, name=None):
+            if (grupo, dia) not in self._fatias and (grupo, dia) not in self._novos:
+                bisect.insort(self._datas.setdefault(grupo, []), dia)
+            atual = self._novos.setdefault((grupo, dia), {}).setdefault(jogador, [0, 0, 0.0])
+            atual[0], atual[1], atual[2] = atual[0] + int(n), atual[1] + int(v), atual[2] + float(saldo)
+
+    # --- CONSULTAS ---
+    def dias(self, grupo):
+        """Dias com partidas do grupo, do mais recente para o mais antigo."""
+        return self._datas.get(grupo, [])[::-1]
+
+    def ultimo_dia(self, grupo):
+        datas = self._datas.get(grupo)
+        return datas[-1] if datas else None
+
+    def do_dia(self, grupo, dia):
+        """DataFrame (índice Jogador) com Partidas, Vitorias e Saldo_Elo do dia."""
+        ini, fim = self._fatias.get((grupo, dia), (0, 0))
+        df = self._base.iloc[ini:fim].set_index('Jogador')
+        novos = self._novos.get((grupo, dia))
+        if novos:
+            extra = pd.DataFrame.from_dict(novos, orient='index', columns=COLUNAS_DIA)
+            df = df.add(extra, fill_value=0).astype({"Partidas": int, "Vitorias": int})
+        df.index.name = 'Jogador'
+        return df
+
+    def jogadores_do_dia(self, grupo, dia):
+        ini, fim = self._fatias.get((grupo, dia), (0, 0))
+        return set(self._base['Jogador'].iloc[ini:fim]) | set(self._novos.get((grupo, dia), ()))
+
+    def resumo_do_dia(self, grupo, dia):
+        """Partidas e jogadores do dia, quem mais ganhou Elo e quem mais venceu (None se o dia não tem partidas)."""
+        df = self.do_dia(grupo, dia)
+        if df.empty: return None
+        destaque = df['Saldo_Elo'].idxmax()
+        mais_vitorias = df.sort_values(['Vitorias', 'Saldo_Elo'], ascending=False).index[0]
+        return {
+            "partidas": self._partidas.get((grupo, dia), 0),
+            "jogadores": len(df),
+            "destaque": destaque, "saldo_destaque": float(df.at[destaque, 'Saldo_Elo']),
+            "mais_vitorias": mais_vitorias, "vitorias": int(df.at[mais_vitorias, 'Vitorias']),
+        }
@@ -0,0 +1,341 @@
+"""
+Backends de armazenamento dos dados da liga (Jogadores e Historico).
+
+Todos expõem a mesma interface:
+    ler_jogadores()                     -> DataFrame normalizado
+    gravar_jogadores(df, chaves)        -> resumo da escrita (dict)
+    aplicar_alteracoes(alteracoes, conferir=False) -> resumo da escrita, com nº de conflitos
+                                           (conferir: nova tentativa, não soma de novo deltas já gravados)
+    ler_historico()                     -> DataFrame cru da aba Historico
+    anexar_historico(registros, conferir=False) -> None (conferir: nova tentativa, não
+                                           repete linhas que o envio anterior já gravou)
+    ler_meta() / gravar_meta(meta)      -> registro pequeno de abertura (ver volei/meta.py)
+
+* BackendPlanilhas: lê e grava direto no Google Sheets.
+* BackendSQLite: SQLite local como caminho principal; um SincronizadorPlanilhas
+  (thread) espelha as mudanças para o Sheets e traz edições manuais de volta.
+
+`aplicar_alteracoes` é o caminho usado pela fila de escrita: relê os valores
+atuais das linhas envolvidas e aplica os deltas sobre eles (ver volei/concorrencia.py).
+"""
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from volei.concorrencia import aplicar_alteracoes
+from volei.elenco import normalizar_jogadores
+from volei.meta import COLUNAS_META, meta_de_tabela, tabela_de_meta
+from volei.planilhas import COLUNAS_HISTORICO, SincronizadorJogadores, anexar_historico, esquecer_cabecalhos, obter_aba
+
+COLUNAS_JOGADORES = ["Nome", "Elo", "Partidas", "Vitorias", "Grupo"]
+
+
+class BackendPlanilhas:
+    nome = "planilhas"
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._sync = None
+        self._lock = threading.Lock()
+
+    def ler_jogadores(self, ttl=60):
+        df = normalizar_jogadores(self.conn.read(worksheet="Jogadores", ttl=ttl))
+        with self._lock:
+            # O índice original (linha da planilha) é o que permite gravar só as linhas alteradas
+            self._sync = SincronizadorJogadores(df)
+        return df
+
+    def gravar_jogadores(self, df, chaves):
+        if self._sync is None:
+            # Processo novo (ex.: pendências do SQLite depois de reiniciar): sem o mapa de linhas a escrita
+            # regravaria a aba inteira com `df`, por cima de edições feitas direto na planilha
+            self.ler_jogadores(ttl=0)
+        with self._lock:
+            self._sync.marcar(chaves)
+            return self._sync.enviar(self.conn, df)
+
+    def aplicar_alteracoes(self, alteracoes, conferir=False):
+        chaves = [tuple(a['chave']) for a in alteracoes]
+        if not chaves: return {"modo": "nada", "linhas": 0, "celulas": 0, "intervalos": 0, "conflitos": 0}
+        with self._lock:
+            # Caminho curto: lê só as linhas envolvidas (não serve para cadastrar jogador novo)
+            atuais = None
+            if self._sync is not None and not any('registro' in a for a in alteracoes):
+                atuais = self._sync.ler_linhas(self.conn, chaves)
+            if atuais is not None:
+                df, alteradas, conflitos = aplicar_alteracoes(atuais, alteracoes, conferir)
+                df = df.set_index(['Grupo', 'Nome'], drop=False)
+                resumo = self._sync.enviar_linhas(obter_aba(self.conn, "Jogadores"), {k: df.loc[k] for k in alteradas})
+                return {**resumo, "conflitos": conflitos}
+
+        # Releitura completa da aba (primeira escrita, jogador novo ou linhas fora do lugar)
+        df, alteradas, conflitos = aplicar_alteracoes(self.ler_jogadores(ttl=0), alteracoes, conferir)
+        return {**self.gravar_jogadores(df, alteradas), "conflitos": conflitos}
+
+    def ler_historico(self):
+        df = self.conn.read(worksheet="Historico", ttl=0)
+        # Releitura (revalidação do cache, sincronização do SQLite): alguém pode ter limpado ou reordenado a aba
+        esquecer_cabecalhos("Historico")
+        return df
+
+    def anexar_historico(self, registros, conferir=False):
+        anexar_historico(self.conn, registros, conferir)
+
+    # --- META ---
+    def ler_meta(self):
+        try:
+            return meta_de_tabela(self.conn.read(worksheet="Meta", ttl=0))
+        except Exception:
+            return {}  # planilha sem a aba Meta
+
+    def gravar_meta(self, meta):
+        self.conn.update(worksheet="Meta", data=tabela_de_meta(meta))
+
+
+# --- SQLITE LOCAL ---
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS jogadores (
+    Nome TEXT NOT NULL, Elo REAL, Partidas INTEGER, Vitorias INTEGER, Grupo TEXT NOT NULL,
+    PRIMARY KEY (Grupo, Nome)
+);
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Data TEXT, "Time A" TEXT, "Time B" TEXT, Vencedor TEXT, Pontos_Elo TEXT, Grupo TEXT
+);
+-- Mudanças locais ainda não enviadas ao Sheets
+CREATE TABLE IF NOT EXISTS pendencias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL, grupo TEXT, nome TEXT, historico_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (Chave TEXT PRIMARY KEY, Valor TEXT);
+"""
+
+
+class BackendSQLite:
+    nome = "sqlite"
+
+    def __init__(self, caminho, espelho=None):
+        """espelho: BackendPlanilhas para onde as mudanças são copiadas (None = só local)."""
+        self.caminho = caminho
+        self.espelho = espelho
+        self.versao = 0  # muda quando dados chegam de fora (edição manual na planilha)
+        # Envio ao espelho pode ter falhado depois de gravar (ou o processo caiu no meio): confere antes de anexar
+        self._conferir_historico = True
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(caminho, check_same_thread=False)
+        self._db.executescript(_ESQUEMA)
+        self._db.commit()
+
+    def vazio(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jogadores").fetchone()[0] == 0
+
+    # --- JOGADORES ---
+    def ler_jogadores(self, ttl=None):
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {', '.join(COLUNAS_JOGADORES)} FROM jogadores ORDER BY rowid", self._db)
+        return normalizar_jogadores(df)
+
+    def gravar_jogadores(self, df, chaves):
+        chaves = list(chaves)
+        linhas = df.set_index(['Grupo', 'Nome'], drop=False).loc[chaves, COLUNAS_JOGADORES]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO jogadores (Nome, Elo, Partidas, Vitorias, Grupo) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (Grupo, Nome) DO UPDATE SET Elo = excluded.Elo, "
+                "Partidas = excluded.Partidas, Vitorias = excluded.Vitorias",
+                [(n, float(e), int(p), int(v), g) for n, e, p, v, g in linhas.itertuples(index=False, name=None)]
+            )
+            if self.espelho is not None:
+                self._db.executemany("INSERT INTO pendencias (tipo, grupo, nome) VALUES ('jogador', ?, ?)", chaves)
+            self._db.commit()
+        return {"modo": "local", "linhas": len(chaves), "celulas": len(chaves) * len(COLUNAS_JOGADORES), "intervalos": 1}
+
+    def aplicar_alteracoes(self, alteracoes, conferir=False):
+        chaves = [tuple(a['chave']) for a in alteracoes]
+        if not chaves: return {"modo": "nada", "linhas": 0, "celulas": 0, "intervalos": 0, "conflitos": 0}
+        with self._lock:
+            # BEGIN IMMEDIATE: leitura e escrita na mesma transação, também contra outros processos
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                marcadores = ", ".join(["(?, ?)"] * len(chaves))
+                atuais = pd.read_sql_query(
+                    f"SELECT {', '.join(COLUNAS_JOGADORES)} FROM jogadores WHERE (Grupo, Nome) IN (VALUES {marcadores})",
+                    self._db, params=[str(v) for chave in chaves for v in chave]
+                )
+                df, alteradas, conflitos = aplicar_alteracoes(atuais, alteracoes, conferir)
+                resumo = self.gravar_jogadores(df, alteradas)
+            except Exception:
+                self._db.rollback()
+                raise
+        return {**resumo, "conflitos": conflitos}
+
+    def substituir_jogadores(self, df):
+        with self._lock:
+            self._db.execute("DELETE FROM jogadores")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO jogadores (Nome, Elo, Partidas, Vitorias, Grupo) VALUES (?, ?, ?, ?, ?)",
+                [(str(n), float(e), int(p), int(v), str(g))
+                 for n, e, p, v, g in df.reindex(columns=COLUNAS_JOGADORES).itertuples(index=False, name=None)]
+            )
+            self._db.commit()
+
+    # --- HISTÓRICO ---
+    def ler_historico(self):
+        colunas = ", ".join(f'"{c}"' for c in COLUNAS_HISTORICO)
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {colunas} FROM historico ORDER BY id", self._db)
+
+    def anexar_historico(self, registros, conferir=False):
+        # Transação local: ou grava tudo ou nada, não há o que conferir
+        colunas = ", ".join(f'"{c}"' for c in COLUNAS_HISTORICO)
+        with self._lock:
+            for r in registros:
+                cur = self._db.execute(
+                    f"INSERT INTO historico ({colunas}) VALUES (?, ?, ?, ?, ?, ?)",
+                    [r.get(c, "") for c in COLUNAS_HISTORICO]
+                )
+                if self.espelho is not None:
+                    self._db.execute("INSERT INTO pendencias (tipo, historico_id) VALUES ('historico', ?)", (cur.lastrowid,))
+            self._db.commit()
+
+    def substituir_historico(self, df):
+        colunas = ", ".join(f'"{c}"' for c in COLUNAS_HISTORICO)
+        df = df.dropna(how="all").reindex(columns=COLUNAS_HISTORICO).astype(object)
+        with self._lock:
+            self._db.execute("DELETE FROM historico")
+            self._db.executemany(
+                f"INSERT INTO historico ({colunas}) VALUES (?, ?, ?, ?, ?, ?)",
+                [[None if pd.isna(v) else str(v) for v in linha] for linha in df.itertuples(index=False, name=None)]
+            )
+            self._db.commit()
+
+    # --- META ---
+    def ler_meta(self):
+        with self._lock:
+            return meta_de_tabela(pd.read_sql_query(f"SELECT {', '.join(COLUNAS_META)} FROM meta", self._db))
+
+    def gravar_meta(self, meta):
+        with self._lock:
+            self._db.execute("DELETE FROM meta")
+            self._db.executemany("INSERT INTO meta (Chave, Valor) VALUES (?, ?)",
+                                 tabela_de_meta(meta).itertuples(index=False, name=None))
+            if self.espelho is not None:
+                self._db.execute("INSERT INTO pendencias (tipo) VALUES ('meta')")
+            self._db.commit()
+
+    # --- SINCRONIZAÇÃO ---
+    def pendentes(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pendencias").fetchone()[0]
+
+    def enviar_pendencias(self):
+        """Copia para o espelho tudo que está em `pendencias`. Retorna quantas foram enviadas."""
+        with self._lock:
+            pend = self._db.execute("SELECT id, tipo, grupo, nome, historico_id FROM pendencias ORDER BY id").fetchall()
+        if not pend: return 0
+        chaves = list(dict.fromkeys((g, n) for _, t, g, n, _ in pend if t == 'jogador'))
+        ids_hist = [h for _, t, _, _, h in pend if t == 'historico']
+        if chaves:
+            self.espelho.gravar_jogadores(self.ler_jogadores(), chaves)
+        if ids_hist:
+            colunas = ", ".join(f'"{c}"' for c in COLUNAS_HISTORICO)
+            marcadores = ", ".join("?" * len(ids_hist))
+            with self._lock:
+                df_h = pd.read_sql_query(f"SELECT {colunas} FROM historico WHERE id IN ({marcadores}) ORDER BY id", self._db, params=ids_hist)
+            conferir, self._conferir_historico = self._conferir_historico, True
+            self.espelho.anexar_historico(df_h.to_dict('records'), conferir=conferir)
+        if any(t == 'meta' for _, t, _, _, _ in pend):
+            self.espelho.gravar_meta(self.ler_meta())
+        with self._lock:
+            self._db.execute("DELETE FROM pendencias WHERE id <= ?", (pend[-1][0],))
+            self._db.commit()
+        self._conferir_historico = False
+        return len(pend)
+
+    def trazer_do_espelho(self):
+        """Substitui os dados locais pelos da planilha se houver diferença (e nada pendente)."""
+        if self.pendentes(): return False
+        remoto_j = self.espelho.ler_jogadores(ttl=0)
+        remoto_h = self.espelho.ler_historico().dropna(how="all")
+        mudou = False
+        with self._lock:
+            # Alguém gravou localmente enquanto líamos a planilha: fica para a próxima rodada
+            if self.pendentes(): return False
+            if not _como_texto(remoto_j, COLUNAS_JOGADORES).equals(_como_texto(self.ler_jogadores(), COLUNAS_JOGADORES)):
+                self.substituir_jogadores(remoto_j)
+                mudou = True
+            if not _como_texto(remoto_h, COLUNAS_HISTORICO).equals(_como_texto(self.ler_historico(), COLUNAS_HISTORICO)):
+                self.substituir_historico(remoto_h)
+                mudou = True
+            if mudou: self.versao += 1
+            if not self.ler_meta():
+                # Banco novo: o registro de abertura vem da planilha (sem virar pendência)
+                remoto_meta = self.espelho.ler_meta()
+                if remoto_meta:
+                    self._db.executemany("INSERT OR REPLACE INTO meta (Chave, Valor) VALUES (?, ?)",
+                                         tabela_de_meta(remoto_meta).itertuples(index=False, name=None))
+                    self._db.commit()
+        return mudou
+
+
+def _pontos_canonicos(valor):
+    """'+12.3 (como gravado), +12.3 (como a planilha devolve) e 12.3 (lido como número) são o mesmo valor."""
+    texto = valor.lstrip("'")
+    try: return f"{float(texto):+.4f}"
+    except ValueError: return texto
+
+
+def _como_texto(df, colunas):
+    """Forma canônica para comparar dados locais e remotos (tipos podem diferir)."""
+    df = df.reindex(columns=colunas).astype(object).fillna("").astype(str).reset_index(drop=True)
+    if 'Pontos_Elo' in colunas: df['Pontos_Elo'] = df['Pontos_Elo'].map(_pontos_canonicos)
+    return df
+
+
+class SincronizadorPlanilhas:
+    """
+    Thread que envia as pendências do BackendSQLite ao Google Sheets a cada
+    `intervalo` segundos e, a cada `intervalo_leitura`, relê a planilha para
+    trazer edições manuais.
+    """
+    def __init__(self, backend, intervalo=30, intervalo_leitura=300):
+        self.backend = backend
+        self.intervalo = intervalo
+        self.intervalo_leitura = intervalo_leitura
+        self._ultima_leitura = 0.0
+        self.ultimo_erro = None
+        self.ultima_sincronizacao = None
+        self._acordar = threading.Event()
+        self._thread = threading.Thread(target=self._laco, daemon=True)
+
+    def iniciar(self):
+        if self.backend.vazio():
+            # Primeira execução: o banco local começa como cópia da planilha
+            self.sincronizar(forcar_leitura=True)
+        self._thread.start()
+        return self
+
+    def agendar(self):
+        """Pede uma sincronização imediata (ex.: logo após gravar uma partida)."""
+        self._acordar.set()
+
+    def sincronizar(self, forcar_leitura=False):
+        try:
+            self.backend.enviar_pendencias()
+            if forcar_leitura or time.monotonic() - self._ultima_leitura > self.intervalo_leitura:
+                self.backend.trazer_do_espelho()
+                self._ultima_leitura = time.monotonic()
+            self.ultimo_erro = None
+            self.ultima_sincronizacao = time.time()
+        except Exception as e:
+            self.ultimo_erro = str(e)
+            print(f"Erro ao sincronizar com o Google Sheets: {e}")
+
+    def _laco(self):
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            self.sincronizar()
@@ -0,0 +1,83 @@
+"""
+Cache da aba Jogadores compartilhado por todas as sessões do processo.
+
+Antes cada sessão do navegador lia a aba e guardava a própria cópia do
+elenco em `st.session_state`. Aqui o elenco é lido uma vez, guardado com
+tipos compactos (`compactar_jogadores`) e indexado por Grupo (o `Elenco`
+separa as linhas de cada grupo). As sessões alteram o mesmo objeto, sempre
+com `lock` em volta de ler-aplicar-ler (para os deltas da fila de escrita
+saírem coerentes); releituras acontecem só quando alguém invalida o cache.
+
+`relatorio()` mostra quanto isso economiza: acertos, leituras da planilha,
+sessões atendidas por leitura e memória do elenco compacto x original.
+"""
+import threading
+
+from volei.elenco import Elenco, compactar_jogadores
+
+
+def _bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+class CacheLiga:
+    def __init__(self, ler, ao_carregar=None):
+        """ler: função sem argumentos que devolve a aba Jogadores normalizada; ao_carregar(elenco) após cada leitura."""
+        self._ler = ler
+        self._ao_carregar = ao_carregar
+        self._elenco = None
+        self._versoes = {}
+        self.lock = threading.RLock()
+        self.acertos = 0
+        self.leituras = 0
+        self.sessoes = 0  # sessões que usaram a leitura atual
+        self.bytes_original = 0
+        self.bytes_compacto = 0
+
+    def carregado(self):
+        return self._elenco is not None
+
+    def elenco(self):
+        with self.lock:
+            if self._elenco is not None:
+                self.acertos += 1
+                return self._elenco
+            df = self._ler()
+            compacto = compactar_jogadores(df)
+            self.bytes_original, self.bytes_compacto = _bytes(df), _bytes(compacto)
+            self._elenco = Elenco(compacto)
+            self.leituras += 1
+            self.sessoes = 0
+        if self._ao_carregar: self._ao_carregar(self._elenco)
+        return self._elenco
+
+    def registrar_sessao(self):
+        """Conta uma sessão nova atendida pela leitura atual (sem o cache, ela teria lido a aba de novo)."""
+        with self.lock: self.sessoes += 1
+
+    # --- INVALIDAÇÃO ---
+    def acompanhar(self, origem, versao):
+        """Invalida quando `versao` da origem (backend, fila de escrita...) muda em relação à última vista."""
+        with self.lock:
+            anterior = self._versoes.get(origem)
+            self._versoes[origem] = versao
+            if anterior is not None and anterior != versao: self.invalidar()
+
+    def invalidar(self):
+        with self.lock:
+            self._elenco = None
+
+    # --- RELATÓRIO ---
+    def relatorio(self):
+        consultas = self.acertos + self.leituras
+        sessoes = max(self.sessoes, 1)
+        return {
+            "acertos": self.acertos,
+            "leituras": self.leituras,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "sessoes": self.sessoes,
+            "bytes_compacto": self.bytes_compacto,
+            "bytes_original": self.bytes_original,
+            # Uma cópia original por sessão (como era) x uma cópia compacta para todas
+            "bytes_economizados": sessoes * self.bytes_original - self.bytes_compacto,
+        }
@@ -0,0 +1,118 @@
+"""
+Controle de concorrência otimista para a aba Jogadores.
+
+Cada sessão trabalha com a sua cópia do elenco, que pode estar velha. Por
+isso as escritas não levam valores absolutos: levam a *alteração* (quanto
+somar em Elo/Partidas/Vitorias) e a assinatura dos valores em que a sessão
+se baseou. Na hora de gravar, o backend lê os valores atuais dessas linhas;
+se a assinatura não bate, outra sessão gravou antes (conflito) e a alteração
+é reaplicada sobre os valores novos em vez de sobrescrevê-los.
+
+Formato de uma alteração (serializável em JSON, vai para a fila de escrita):
+    {"chave": [grupo, nome], "base": "<assinatura>", "delta": {"Elo": 16.1, "Partidas": 1, "Vitorias": 1}}
+    {"chave": [grupo, nome], "registro": {...}}   # jogador novo (ignorado se já existir)
+
+Uma escrita pode falhar depois de gravada (timeout na resposta, queda antes de
+a fila anotar o envio). Na nova tentativa (`conferir=True`), linhas que já têm
+os valores de base + delta são reconhecidas como gravadas e ficam como estão.
+"""
+import pandas as pd
+
+from volei.elenco import COLUNAS_NUMERICAS
+
+
+def assinatura(linha):
+    """Resumo dos valores numéricos de um jogador, para saber se mudaram desde a leitura."""
+    return "|".join(f"{float(linha[c]):.4f}" for c in COLUNAS_NUMERICAS)
+
+
+def _assinatura_depois(alteracao):
+    """Assinatura da linha depois de a alteração ser aplicada sobre a base que a sessão leu (None sem base)."""
+    try:
+        if 'registro' in alteracao: base = [float(alteracao['registro'][c]) for c in COLUNAS_NUMERICAS]
+        else: base = [float(v) for v in alteracao.get('base', "").split("|")]
+    except (KeyError, ValueError): return None
+    delta = alteracao.get('delta', {})
+    return "|".join(f"{v + delta.get(c, 0):.4f}" for v, c in zip(base, COLUNAS_NUMERICAS))
+
+
+def alteracoes_entre(antes, depois):
+    """
+    Alterações que levam as linhas `antes` para `depois`: listas de dicts
+    (`Elenco.registros`) ou DataFrames com Grupo, Nome e as colunas numéricas.
+    """
+    if isinstance(antes, pd.DataFrame): antes = antes.to_dict('records')
+    if isinstance(depois, pd.DataFrame): depois = depois.to_dict('records')
+    bases = {(r['Grupo'], r['Nome']): r for r in antes}
+    alteracoes = []
+    for linha in depois:
+        chave = (linha['Grupo'], linha['Nome'])
+        base = bases[chave]
+        delta = {c: (float(linha[c]) - float(base[c])) if c == 'Elo' else int(linha[c]) - int(base[c])
+                 for c in COLUNAS_NUMERICAS}
+        alteracoes.append({"chave": list(chave), "base": assinatura(base), "delta": delta})
+    return alteracoes
+
+
+def novo_jogador(registro):
+    return {"chave": [registro['Grupo'], registro['Nome']], "registro": dict(registro)}
+
+
+def mesclar_alteracoes(alteracoes):
+    """
+    Junta as alterações de várias partidas por chave: deltas somados, base da
+    primeira (a que a sessão leu antes de todas elas).
+    """
+    por_chave = {}
+    for a in alteracoes:
+        chave = tuple(a['chave'])
+        atual = por_chave.get(chave)
+        if atual is None:
+            por_chave[chave] = {**a, "delta": dict(a.get('delta', {}))}
+        elif 'delta' in a:
+            if 'delta' not in atual: atual['delta'] = {}
+            for c, d in a['delta'].items(): atual['delta'][c] = atual['delta'].get(c, 0) + d
+    return list(por_chave.values())
+
+
+def aplicar_alteracoes(df_atual, alteracoes, conferir=False):
+    """
+    Aplica as alterações sobre os valores atuais.
+
+    df_atual: linhas atuais (ao menos as chaves envolvidas), com as colunas da aba.
+    conferir: nova tentativa de um envio que falhou; alterações já gravadas não são somadas de novo.
+    Retorna (df_resultado, chaves_alteradas, conflitos): df_resultado é df_atual
+    com as alterações aplicadas e os jogadores novos no fim.
+    """
+    df = df_atual.reset_index(drop=True)
+    existentes = set(zip(df['Grupo'], df['Nome']))
+    novos = [a['registro'] for a in alteracoes if 'registro' in a and tuple(a['chave']) not in existentes]
+    if novos: df = pd.concat([df, pd.DataFrame(novos).reindex(columns=df.columns)], ignore_index=True)
+    else: df = df.copy()
+    for c in COLUNAS_NUMERICAS: df[c] = df[c].astype(float)
+
+    posicao = {k: i for i, k in enumerate(zip(df['Grupo'], df['Nome']))}
+    cols = {c: df.columns.get_loc(c) for c in COLUNAS_NUMERICAS}
+    cadastrados = {(r['Grupo'], r['Nome']) for r in novos}
+    alteradas, conflitos = [], 0
+    for a in alteracoes:
+        chave = tuple(a['chave'])
+        i = posicao.get(chave)
+        if i is None:
+            conflitos += 1  # jogador apagado (ou renomeado) na planilha: nada onde aplicar
+            continue
+        if conferir and chave not in cadastrados and not a.get('sobrescrever') and assinatura(df.iloc[i]) == _assinatura_depois(a):
+            continue  # o envio anterior já tinha gravado esta alteração
+        if 'registro' in a:
+            if a.get('sobrescrever'):
+                for c, j in cols.items(): df.iat[i, j] = float(a['registro'][c])
+            elif chave not in cadastrados:
+                conflitos += 1  # outra sessão cadastrou o mesmo nome antes: fica o que já estava
+        elif a.get('base') != assinatura(df.iloc[i]):
+            conflitos += 1  # alguém gravou depois da leitura desta sessão: o delta vai sobre o valor novo
+        for c, d in a.get('delta', {}).items(): df.iat[i, cols[c]] += d
+        alteradas.append(chave)
+
+    for c in COLUNAS_NUMERICAS:
+        if c != 'Elo': df[c] = df[c].round().astype(int)
+    return df, list(dict.fromkeys(alteradas)), conflitos
@@ -0,0 +1,72 @@
+"""
+Conexão com o Google Sheets de verdade.
+
+Leituras e regravações completas (`read`, `update`) continuam pelo
+GSheetsConnection (st-gsheets-connection). As operações por linha
+(`append_rows`, `batch_update`, `batch_get`...) precisam do Worksheet do
+gspread, que o st-gsheets-connection só expõe por métodos privados: aqui ele
+vem da API pública do gspread, autenticada com a mesma Service Account de
+[connections.gsheets] nos secrets.
+
+No gspread, `Spreadsheet.worksheet(nome)` relê os metadados da planilha (uma
+requisição). Cada aba é aberta uma vez e guardada; sai do cache quando some
+(WorksheetNotFound) ou quando uma operação nela falha com 400/404 (aba
+renomeada ou apagada na planilha, ver `esquecer_aba`).
+"""
+import threading
+
+import gspread
+
+
+class ConexaoGoogle:
+    def __init__(self, conn, secrets):
+        """conn: GSheetsConnection; secrets: conteúdo de [connections.gsheets] (dict)."""
+        self._conn = conn
+        credenciais = dict(secrets)
+        self._planilha_id = credenciais.pop("spreadsheet", None)
+        self._pasta = credenciais.pop("worksheet", None)  # o st-gsheets-connection usa como pasta do Drive
+        # Sem Service Account (planilha pública) só dá para ler
+        self._credenciais = credenciais if credenciais.get("type") == "service_account" else None
+        self._planilha = None
+        self._abas = {}
+        self._lock = threading.Lock()
+
+    def _abrir_planilha(self):
+        with self._lock:
+            if self._planilha is None:
+                cliente = gspread.service_account_from_dict(self._credenciais)
+                if str(self._planilha_id).startswith("http"): self._planilha = cliente.open_by_url(self._planilha_id)
+                else: self._planilha = cliente.open(self._planilha_id, folder_id=self._pasta)
+            return self._planilha
+
+    def aba(self, nome):
+        """Worksheet (gspread) da aba, ou None se a conexão não tem Service Account."""
+        if self._credenciais is None: return None
+        aba = self.aba_aberta(nome)
+        if aba is not None: return aba
+        try:
+            aba = self._abrir_planilha().worksheet(nome)
+        except gspread.WorksheetNotFound:
+            self.esquecer_aba(nome)
+            raise
+        with self._lock: self._abas[nome] = aba
+        return aba
+
+    def aba_aberta(self, nome):
+        """Worksheet já aberto (sem requisição) ou None."""
+        with self._lock: return self._abas.get(nome)
+
+    def esquecer_aba(self, nome=None):
+        """Descarta o Worksheet guardado (de uma aba ou de todos): a próxima `aba` busca de novo."""
+        with self._lock:
+            if nome is None: self._abas.clear()
+            else: self._abas.pop(nome, None)
+
+    def read(self, worksheet=None, **kwargs):
+        return self._conn.read(worksheet=worksheet, **kwargs)
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        return self._conn.update(worksheet=worksheet, data=data, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
@@ -0,0 +1,189 @@
+"""
+Substituto local do GSheetsConnection, para rodar o app sem internet.
+
+Cada aba vira um CSV numa pasta (ou fica só em memória se `pasta=None`).
+Implementa o que o app usa da conexão real: `read`, `update` e, via
+`aba(nome)`, as operações de aba do gspread (`row_values`, `append_rows`,
+`batch_update`, `batch_get`, `get_all_values`, `clear`).
+
+`latencia` (segundos) simula o tempo de ida e volta de cada chamada à API,
+e `chamadas` conta quantas foram feitas (usado pelos benchmarks).
+`cota_por_minuto` e `taxa_falhas` simulam o limite de requisições do Google:
+acima da cota (ou ao acaso, na taxa dada) a chamada falha com `ErroCota` (429).
+"""
+import csv
+import io
+import os
+import random
+import re
+import threading
+import time
+
+from collections import deque
+
+import pandas as pd
+
+
+class ErroCota(Exception):
+    """Equivalente local do 429 RESOURCE_EXHAUSTED da API do Google Sheets."""
+    codigo = 429
+
+
+def _coluna_para_indice(letras):
+    n = 0
+    for ch in letras: n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+def interpretar_intervalo(a1):
+    """'A5:E7' -> (linha_ini, col_ini, linha_fim, col_fim), 1-based nas linhas e 0-based nas colunas."""
+    m = re.fullmatch(r"([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?", a1.split("!")[-1])
+    if not m: raise ValueError(f"Intervalo inválido: {a1}")
+    c1, l1, c2, l2 = m.groups()
+    c2, l2 = c2 or c1, l2 or l1
+    return int(l1), _coluna_para_indice(c1), int(l2), _coluna_para_indice(c2)
+
+
+def _como_texto(valor, entrada_usuario):
+    if valor is None: return ""
+    texto = str(valor)
+    # USER_ENTERED: apóstrofo inicial força texto e não aparece na célula (igual ao Sheets)
+    if entrada_usuario and texto.startswith("'"): texto = texto[1:]
+    return texto
+
+
+class AbaLocal:
+    def __init__(self, conexao, nome):
+        self._conexao = conexao
+        self.title = nome
+
+    @property
+    def _linhas(self):
+        return self._conexao._abas.setdefault(self.title, [])
+
+    def get_all_values(self):
+        self._conexao._chamar()
+        with self._conexao._lock:
+            return [list(l) for l in self._linhas]
+
+    def row_values(self, numero):
+        self._conexao._chamar()
+        with self._conexao._lock:
+            linhas = self._linhas
+            if numero > len(linhas): return []
+            linha = list(linhas[numero - 1])
+            while linha and linha[-1] == "": linha.pop()
+            return linha
+
+    def append_rows(self, values, value_input_option="RAW", table_range=None, **kwargs):
+        self._conexao._chamar()
+        entrada = value_input_option == "USER_ENTERED"
+        with self._conexao._lock:
+            linhas = self._linhas
+            while linhas and not any(linhas[-1]): linhas.pop()
+            linhas.extend([_como_texto(v, entrada) for v in linha] for linha in values)
+            self._conexao._persistir(self.title)
+
+    def batch_update(self, data, value_input_option="RAW", **kwargs):
+        self._conexao._chamar()
+        entrada = value_input_option == "USER_ENTERED"
+        with self._conexao._lock:
+            linhas = self._linhas
+            for bloco in data:
+                l1, c1, _, _ = interpretar_intervalo(bloco["range"])
+                for dl, valores in enumerate(bloco["values"]):
+                    r = l1 - 1 + dl
+                    while len(linhas) <= r: linhas.append([])
+                    linha = linhas[r]
+                    for dc, v in enumerate(valores):
+                        while len(linha) <= c1 + dc: linha.append("")
+                        linha[c1 + dc] = _como_texto(v, entrada)
+            self._conexao._persistir(self.title)
+
+    def batch_get(self, ranges, **kwargs):
+        self._conexao._chamar()
+        with self._conexao._lock:
+            linhas = self._linhas
+            saida = []
+            for a1 in ranges:
+                l1, c1, l2, c2 = interpretar_intervalo(a1)
+                saida.append([list(linhas[r][c1:c2 + 1]) if r < len(linhas) else [] for r in range(l1 - 1, l2)])
+            return saida
+
+    def clear(self):
+        self._conexao._chamar()
+        with self._conexao._lock:
+            self._conexao._abas[self.title] = []
+            self._conexao._persistir(self.title)
+
+
+class ConexaoLocal:
+    def __init__(self, pasta=None, latencia=0.0, cota_por_minuto=None, taxa_falhas=0.0, janela=60.0):
+        self.pasta = pasta
+        self.latencia = latencia
+        self.cota_por_minuto = cota_por_minuto
+        self.taxa_falhas = taxa_falhas
+        self.janela = janela
+        self.chamadas = 0
+        self.recusadas = 0
+        self._recentes = deque()
+        self._lock = threading.RLock()
+        self._abas = {}
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+            for arquivo in os.listdir(pasta):
+                if arquivo.endswith(".csv"):
+                    with open(os.path.join(pasta, arquivo), newline="", encoding="utf-8") as f:
+                        self._abas[arquivo[:-4]] = [list(l) for l in csv.reader(f)]
+
+    def aba(self, nome):
+        return AbaLocal(self, nome)
+
+    def aba_aberta(self, nome):
+        """Como a ConexaoGoogle depois da primeira abertura: a aba sai sem requisição."""
+        return AbaLocal(self, nome)
+
+    def _chamar(self):
+        with self._lock:
+            self.chamadas += 1
+            agora = time.monotonic()
+            while self._recentes and agora - self._recentes[0] >= self.janela: self._recentes.popleft()
+            # Como no Google, a chamada recusada também conta para a cota
+            self._recentes.append(agora)
+            if (self.cota_por_minuto and len(self._recentes) > self.cota_por_minuto) or \
+                    (self.taxa_falhas and random.random() < self.taxa_falhas):
+                self.recusadas += 1
+                raise ErroCota("429 RESOURCE_EXHAUSTED: Quota exceeded (simulado)")
+        if self.latencia: time.sleep(self.latencia)
+
+    def _persistir(self, nome):
+        if not self.pasta: return
+        caminho = os.path.join(self.pasta, f"{nome}.csv")
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self._abas.get(nome, []))
+        os.replace(temporario, caminho)
+
+    # --- API compatível com GSheetsConnection ---
+    def read(self, worksheet=None, ttl=None, **kwargs):
+        self._chamar()
+        with self._lock:
+            linhas = [list(l) for l in self._abas.get(worksheet, [])]
+        if not linhas: return pd.DataFrame()
+        largura = max(len(l) for l in linhas)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(l + [""] * (largura - len(l)) for l in linhas)
+        buffer.seek(0)
+        # skip_blank_lines=False mantém o índice = linha da planilha - 2, como no gspread
+        return pd.read_csv(buffer, skip_blank_lines=False)
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        if data is None: return None
+        self._chamar()
+        linhas = [[str(c) for c in data.columns]]
+        for registro in data.itertuples(index=False, name=None):
+            linhas.append(["" if pd.isna(v) else _como_texto(v, True) for v in registro])
+        with self._lock:
+            self._abas[worksheet] = linhas
+            self._persistir(worksheet)
+        return data
@@ -0,0 +1,177 @@
+"""
+Acesso ao Google Sheets dentro da cota da API.
+
+`ConexaoComCota` embrulha a conexão (ConexaoGoogle ou ConexaoLocal) e
+todas as chamadas passam por ela: `read`, `update` e as operações de aba do
+gspread (via `aba(nome)`).
+
+* Orçamento por minuto: as chamadas dos últimos `janela` segundos ficam
+  contadas; acima de `folga` do limite as chamadas passam a ser espaçadas
+  (janela / limite) e, no limite, esperam a mais antiga sair da janela.
+* Erros de cota (429) e falhas temporárias do Google (500/502/503/504) são
+  repetidos com espera exponencial e jitter, até `max_tentativas`. Gravações
+  que não podem ser repetidas às cegas (`append_rows`, `update`, `clear`: um
+  5xx pode chegar depois de o Google já ter gravado) só são repetidas no 429
+  e em falhas de conexão antes do envio; o resto sobe para quem chamou (a
+  fila de escrita confere a planilha antes de anexar de novo).
+* Lotes: as gravações já saem agrupadas pelos chamadores (`batch_get` e
+  `batch_update` com vários intervalos, `append_rows` com várias linhas).
+  Aqui cada uma conta como uma requisição, e `operacoes` soma os intervalos e
+  linhas que viajaram nela (ver `relatorio()`).
+* Abrir uma aba só conta na primeira vez: a conexão guarda as abas abertas
+  (`aba_aberta`); um erro 400/404 numa aba a tira desse cache.
+"""
+import random
+import threading
+import time
+from collections import deque
+
+CODIGOS_TEMPORARIOS = {429, 500, 502, 503, 504}
+# Recusadas antes de gravar qualquer coisa: seguras de repetir mesmo em gravações
+CODIGOS_RECUSADOS = {429}
+# Aba renomeada ou apagada na planilha: o Worksheet guardado pela conexão ficou velho
+CODIGOS_ABA_PERDIDA = {400, 404}
+# Exceções de conexão (requests/urllib3) em que a requisição não chegou a sair
+ERROS_ANTES_DO_ENVIO = {"ConnectTimeout", "NewConnectionError", "NameResolutionError", "ConnectionRefusedError"}
+
+
+def codigo_erro(erro):
+    """Código HTTP de um erro da API (gspread APIError, ErroCota do stub local), se houver."""
+    codigo = getattr(erro, "codigo", None)
+    if codigo is None: codigo = getattr(getattr(erro, "response", None), "status_code", None)
+    if codigo is None and ("RESOURCE_EXHAUSTED" in str(erro) or "Quota exceeded" in str(erro)): codigo = 429
+    return codigo
+
+
+def antes_do_envio(erro):
+    """True se a falha foi ao abrir a conexão (o Google não recebeu a requisição)."""
+    return any(c.__name__ in ERROS_ANTES_DO_ENVIO for c in type(erro).__mro__)
+
+
+def pode_repetir(erro, idempotente=True):
+    """Se a chamada pode ser repetida depois do erro (gravações não idempotentes só quando nada foi gravado)."""
+    if antes_do_envio(erro): return True
+    return codigo_erro(erro) in (CODIGOS_TEMPORARIOS if idempotente else CODIGOS_RECUSADOS)
+
+
+class OrcamentoRequisicoes:
+    def __init__(self, limite_por_minuto=60, janela=60.0, folga=0.8):
+        self.limite = limite_por_minuto
+        self.janela = janela
+        self.folga = folga
+        self._chamadas = deque()
+        self._lock = threading.Lock()
+        self.esperado = 0.0  # segundos gastos esperando o orçamento
+
+    def _limpar(self, agora):
+        while self._chamadas and agora - self._chamadas[0] >= self.janela: self._chamadas.popleft()
+
+    def reservar(self):
+        """Bloqueia o tempo necessário para a próxima chamada caber no orçamento e a registra."""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._limpar(agora)
+                usadas = len(self._chamadas)
+                if usadas >= self.limite:
+                    espera = self._chamadas[0] + self.janela - agora
+                elif usadas >= self.limite * self.folga and self._chamadas:
+                    # Perto do limite: uma chamada a cada janela/limite segundos
+                    espera = self._chamadas[-1] + self.janela / self.limite - agora
+                else:
+                    espera = 0
+                if espera <= 0:
+                    self._chamadas.append(agora)
+                    return
+            self.esperado += espera
+            time.sleep(espera)
+
+    def usadas(self):
+        with self._lock:
+            self._limpar(time.monotonic())
+            return len(self._chamadas)
+
+
+class _AbaComCota:
+    _CHAMADAS = ("get_all_values", "row_values", "append_rows", "batch_update", "batch_get", "clear", "update")
+    _NAO_IDEMPOTENTES = ("append_rows", "clear", "update")
+
+    def __init__(self, aba, conexao, nome):
+        self._aba = aba
+        self._conexao = conexao
+        self._nome = nome
+
+    def __getattr__(self, nome):
+        alvo = getattr(self._aba, nome)
+        if nome not in self._CHAMADAS: return alvo
+
+        def chamada(*args, **kwargs):
+            operacoes = len(args[0]) if nome in ("batch_update", "batch_get", "append_rows") and args else 1
+            try:
+                return self._conexao._executar(lambda: alvo(*args, **kwargs), operacoes,
+                                               idempotente=nome not in self._NAO_IDEMPOTENTES)
+            except Exception as e:
+                if codigo_erro(e) in CODIGOS_ABA_PERDIDA: self._conexao.esquecer_aba(self._nome)
+                raise
+        return chamada
+
+
+class ConexaoComCota:
+    def __init__(self, conn, limite_por_minuto=60, janela=60.0, max_tentativas=5, espera_base=1.0, espera_max=32.0):
+        self._conn = conn
+        self.orcamento = OrcamentoRequisicoes(limite_por_minuto, janela)
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.requisicoes = 0
+        self.operacoes = 0
+        self.repeticoes = 0
+        self.ultimo_erro = None
+
+    def _executar(self, funcao, operacoes=1, idempotente=True):
+        for tentativa in range(1, self.max_tentativas + 1):
+            self.orcamento.reservar()
+            self.requisicoes += 1
+            try:
+                resultado = funcao()
+                self.operacoes += operacoes
+                return resultado
+            except Exception as e:
+                if not pode_repetir(e, idempotente) or tentativa == self.max_tentativas: raise
+                self.ultimo_erro = str(e)
+                self.repeticoes += 1
+                atraso = min(self.espera_max, self.espera_base * 2 ** (tentativa - 1))
+                time.sleep(atraso * random.uniform(0.5, 1.0))
+
+    def read(self, worksheet=None, **kwargs):
+        return self._executar(lambda: self._conn.read(worksheet=worksheet, **kwargs))
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        return self._executar(lambda: self._conn.update(worksheet=worksheet, data=data, **kwargs), idempotente=False)
+
+    def aba(self, nome):
+        abrir = getattr(self._conn, "aba", None)
+        if abrir is None: return None
+        aberta = getattr(self._conn, "aba_aberta", None)
+        aba = aberta(nome) if aberta else None
+        # Abrir a aba também é uma chamada à API no gspread
+        if aba is None: aba = self._executar(lambda: abrir(nome))
+        return None if aba is None else _AbaComCota(aba, self, nome)
+
+    def esquecer_aba(self, nome=None):
+        esquecer = getattr(self._conn, "esquecer_aba", None)
+        if esquecer: esquecer(nome)
+
+    def relatorio(self):
+        return {
+            "requisicoes": self.requisicoes,
+            "operacoes": self.operacoes,
+            "repeticoes": self.repeticoes,
+            "no_ultimo_minuto": self.orcamento.usadas(),
+            "limite_por_minuto": self.orcamento.limite,
+            "segundos_esperando": round(self.orcamento.esperado, 2),
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
@@ -0,0 +1,206 @@
+"""
+Diário da quadra: cada evento do domínio (chamada, sorteio, substituição,
+resultado, mudança de configuração) é anotado num arquivo JSONL só de acréscimo *antes* dos efeitos
+(estado em disco, fila de escrita). Se o processo cair no meio, a abertura
+seguinte reconstrói tudo a partir dele.
+
+* O estado da quadra de cada grupo (os campos de state_<grupo>.json) é a
+  dobra dos eventos com `aplicar_evento`: substituição e resultado passam
+  pelas regras de volei/rotacao.py; chamada, sorteio e configuração guardam
+  o que foi decidido (o sorteio não é determinístico).
+* Um resultado leva as alterações do elenco e a linha do Historico, e fica
+  pendente até `confirmar` (depois de entrar na fila de escrita): na
+  abertura, `pendentes()` são os que o processo não chegou a enfileirar.
+  Se a confirmação não chegar ao disco (queda logo depois de enfileirar), o
+  resultado volta para a fila com o mesmo id e a fila o descarta: ele ainda
+  está nela ou já consta entre os entregues.
+* `abrir(recuperar)` roda a recuperação uma vez por processo, chamada pelo
+  app depois de criar a fila de escrita e os demais recursos que ela usa.
+* Compactação: a cada `compactar_a_cada` eventos o estado dobrado vira um
+  snapshot (gravação atômica) e o diário recomeça vazio. A recuperação lê o
+  snapshot e só os eventos depois dele, então o tempo de abertura não cresce
+  com o tempo de uso.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+from volei.rotacao import nova_quadra, registrar_vitoria, substituir
+
+# --- DOBRA DOS EVENTOS ---
+def _quadra(estado, indice):
+    """Quadra no formato de volei.rotacao: uma das várias quadras ou a quadra única (campos soltos do estado)."""
+    if indice is not None:
+        quadras = estado.get('quadras') or []
+        return dict(quadras[indice]) if indice < len(quadras) else nova_quadra()
+    quadra = nova_quadra()
+    jogo = estado.get('jogo_atual') or {}
+    quadra.update(A=jogo.get('A'), B=jogo.get('B'), streak=estado.get('streak_vitorias', 0),
+                  vencedores=estado.get('time_vencedor_anterior'), ultimos_times=estado.get('ultimos_times'))
+    return quadra
+
+
+def _guardar_quadra(estado, indice, quadra):
+    if indice is not None:
+        quadras = list(estado.get('quadras') or [])
+        quadras += [nova_quadra() for _ in range(indice + 1 - len(quadras))]
+        quadras[indice] = quadra
+        estado['quadras'] = quadras
+        return
+    estado.update(streak_vitorias=quadra['streak'], time_vencedor_anterior=quadra['vencedores'],
+                  ultimos_times=quadra['ultimos_times'],
+                  jogo_atual={'A': list(quadra['A']), 'B': list(quadra['B'])} if quadra['A'] else None)
+
+
+def aplicar_evento(estado, evento):
+    """Estado da quadra depois do evento (o dict recebido não é alterado)."""
+    estado = dict(estado)
+    tipo, d = evento['tipo'], evento['dados']
+    if tipo in ('inicio', 'configuracao'):
+        estado.update(d)
+    elif tipo == 'chamada':
+        estado.update(todos_presentes=d['presentes'], todos_levantadores=d['levantadores'])
+    elif tipo == 'sorteio':
+        if 'quadras' in d: estado['quadras'] = d['quadras']
+        else: _guardar_quadra(estado, d.get('quadra'), d['rodada'])
+        estado['fila_espera'] = d['fila_espera']
+    elif tipo == 'substituicao':
+        resultado = substituir(_quadra(estado, d.get('quadra')), d['lado'], d['saindo'], estado.get('fila_espera', []))
+        if resultado:
+            quadra, estado['fila_espera'], _ = resultado
+            _guardar_quadra(estado, d.get('quadra'), quadra)
+    elif tipo == 'resultado':
+        quadra = _quadra(estado, d.get('quadra'))
+        quadra.update(A=d['A'], B=d['B'])
+        quadra, estado['fila_espera'] = registrar_vitoria(quadra, d['lado'], estado.get('fila_espera', []))
+        _guardar_quadra(estado, d.get('quadra'), quadra)
+    return estado
+
+
+class Diario:
+    def __init__(self, arquivo="diario.jsonl", compactar_a_cada=500):
+        """arquivo=None: só em memória (benchmarks)."""
+        self.arquivo = arquivo
+        self.arquivo_snapshot = os.path.splitext(arquivo)[0] + "_snapshot.json" if arquivo else None
+        self.compactar_a_cada = compactar_a_cada
+        self.seq = 0
+        self._estados = {}    # grupo -> estado da quadra (dobra)
+        self._seqs = {}       # grupo -> seq do último evento que mudou a quadra
+        self._pendentes = {}  # id -> resultado ainda não enfileirado
+        self._desde_snapshot = 0
+        self._lock = threading.Lock()
+        self._lock_abertura = threading.Lock()
+        self.recuperado = False
+        inicio = time.perf_counter()
+        lidos = self._carregar()
+        self.recuperacao = {"eventos": lidos, "ms": (time.perf_counter() - inicio) * 1000}
+
+    # --- LEITURA ---
+    def _carregar(self):
+        if not self.arquivo: return 0
+        if os.path.exists(self.arquivo_snapshot):
+            with open(self.arquivo_snapshot, encoding="utf-8") as f: snapshot = json.load(f)
+            self.seq = snapshot['seq']
+            self._estados, self._seqs = snapshot['estados'], snapshot['seqs']
+            self._pendentes = {e['id']: e for e in snapshot['pendentes']}
+        lidos = 0
+        if os.path.exists(self.arquivo):
+            with open(self.arquivo, encoding="utf-8") as f:
+                for linha in f:
+                    try: evento = json.loads(linha)
+                    except ValueError: continue  # última linha cortada por uma queda no meio da escrita
+                    # Queda entre gravar o snapshot e esvaziar o diário: esses eventos já estão no snapshot
+                    if evento['seq'] <= self.seq: continue
+                    self._dobrar(evento)
+                    self.seq = evento['seq']
+                    lidos += 1
+        self._desde_snapshot = lidos
+        return lidos
+
+    def _dobrar(self, evento):
+        grupo = evento['grupo']
+        if evento['tipo'] == 'confirmado':
+            self._pendentes.pop(evento['dados']['ref'], None)
+            return
+        self._estados[grupo] = aplicar_evento(self._estados.get(grupo, {}), evento)
+        self._seqs[grupo] = evento['seq']
+        if evento['tipo'] == 'resultado': self._pendentes[evento['id']] = evento
+
+    # --- ESCRITA ---
+    def _anotar(self, grupo, tipo, dados):
+        self.seq += 1
+        linha = json.dumps({"seq": self.seq, "id": uuid.uuid4().hex, "ts": time.time(), "grupo": grupo, "tipo": tipo,
+                            "dados": dados}, ensure_ascii=False, separators=(",", ":"))
+        evento = json.loads(linha)  # cópia: as listas de quem chamou (ex.: a sessão) continuam mudando
+        if self.arquivo:
+            with open(self.arquivo, "a", encoding="utf-8") as f:
+                f.write(linha + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self._dobrar(evento)
+        self._desde_snapshot += 1
+        return evento
+
+    def registrar(self, grupo, tipo, dados, base=None):
+        """
+        Anota um evento do grupo e devolve-o (com `id` e `seq`).
+        base: estado atual da quadra (ou função que o devolve), usado só no primeiro evento do
+        grupo para o diário não começar do zero em quadras que já estavam em andamento.
+        """
+        with self._lock:
+            if grupo not in self._estados and base is not None:
+                self._anotar(grupo, 'inicio', base() if callable(base) else base)
+            evento = self._anotar(grupo, tipo, dados)
+            if self.compactar_a_cada and self._desde_snapshot >= self.compactar_a_cada: self._compactar()
+        return evento
+
+    def confirmar(self, id_evento):
+        """Marca o resultado como entregue à fila de escrita."""
+        with self._lock:
+            evento = self._pendentes.get(id_evento)
+            if evento is not None: self._anotar(evento['grupo'], 'confirmado', {'ref': id_evento})
+
+    def abrir(self, recuperar):
+        """Roda `recuperar(diario)` uma vez por processo (na primeira sessão que chegar aqui)."""
+        with self._lock_abertura:
+            if self.recuperado: return
+            recuperar(self)
+            self.recuperado = True
+
+    # --- COMPACTAÇÃO ---
+    def _compactar(self):
+        if self.arquivo:
+            snapshot = {"seq": self.seq, "estados": self._estados, "seqs": self._seqs,
+                        "pendentes": list(self._pendentes.values())}
+            temporario = self.arquivo_snapshot + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.arquivo_snapshot)
+            open(self.arquivo, "w").close()
+        self._desde_snapshot = 0
+
+    def compactar(self):
+        with self._lock: self._compactar()
+
+    # --- CONSULTAS ---
+    def grupos(self):
+        with self._lock: return list(self._estados)
+
+    def estado(self, grupo):
+        """Campos da quadra do grupo segundo o diário ({} se não há eventos)."""
+        with self._lock: return dict(self._estados.get(grupo, {}))
+
+    def seq_grupo(self, grupo):
+        return self._seqs.get(grupo, 0)
+
+    def pendentes(self):
+        """Resultados anotados e ainda não confirmados, na ordem em que aconteceram."""
+        with self._lock: return sorted(self._pendentes.values(), key=lambda e: e['seq'])
+
+    def status(self):
+        with self._lock:
+            return {"eventos": self._desde_snapshot, "pendentes": len(self._pendentes), "seq": self.seq}
@@ -0,0 +1,163 @@
+"""
+Elenco de jogadores indexado por (Grupo, Nome).
+
+Todas as consultas da quadra (montar times, substituir, aplicar resultado)
+passam por aqui e custam O(tamanho do time), independente de quantos
+jogadores existem nos outros grupos da planilha.
+
+As colunas numéricas são arrays do próprio elenco que o DataFrame só
+enxerga (sem cópia): uma partida escreve direto nas posições dos jogadores.
+Por isso as consultas devolvem cópias das linhas, nunca vistas do `df`.
+"""
+import numpy as np
+import pandas as pd
+
+COLUNAS_NUMERICAS = ['Elo', 'Partidas', 'Vitorias']
+
+
+def normalizar_jogadores(df):
+    """Limpa a leitura crua da aba Jogadores (linhas vazias e colunas numéricas)."""
+    df = df.dropna(how="all")
+    for c in COLUNAS_NUMERICAS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0 if c != 'Elo' else 1200)
+            df[c] = df[c].astype(float if c == 'Elo' else int)
+    return df
+
+
+def compactar_jogadores(df):
+    """
+    Tipos enxutos para o elenco em memória: Grupo/Nome categóricos e
+    Partidas/Vitorias int32. Elo continua float64: a assinatura usada no
+    controle de concorrência (volei/concorrencia.py) compara 4 casas decimais.
+    """
+    df = df.copy()
+    for c in ('Grupo', 'Nome'):
+        if c in df.columns: df[c] = df[c].astype(str).astype('category')
+    for c in ('Partidas', 'Vitorias'):
+        if c in df.columns: df[c] = df[c].astype(np.int32)
+    return df
+
+
+class Elenco:
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.versao = 0  # sobe a cada alteração: quem deriva tabelas do elenco sabe quando refazer
+        self._ligar_colunas()
+        self._indexar()
+
+    def _ligar_colunas(self):
+        # Cópia própria (o df recebido pode ser dividido com outros) e DataFrame montado por cima dela
+        self._valores = {c: self.df[c].to_numpy(copy=True) for c in COLUNAS_NUMERICAS if c in self.df.columns}
+        self.df = pd.DataFrame({c: self._valores.get(c, self.df[c]) for c in self.df.columns}, index=self.df.index, copy=False)
+
+    def _indexar(self):
+        self.posicao = {}
+        self.por_grupo = {}
+        for i, (g, n) in enumerate(zip(self.df['Grupo'], self.df['Nome'])):
+            self.posicao[(g, n)] = i
+            self.por_grupo.setdefault(g, []).append(i)
+
+    # --- CONSULTAS ---
+    def grupos(self):
+        return list(self.por_grupo.keys())
+
+    def existe(self, grupo, nome):
+        return (grupo, nome) in self.posicao
+
+    def posicoes(self, grupo, nomes):
+        """Posições (linhas do DataFrame) dos nomes no grupo, ignorando desconhecidos."""
+        return [self.posicao[(grupo, n)] for n in nomes if (grupo, n) in self.posicao]
+
+    def _linhas(self, pos):
+        # iloc com todas as posições em ordem devolve uma vista, que veria as partidas seguintes
+        return self.df.iloc[pos].copy()
+
+    def jogadores(self, grupo, nomes):
+        """Registros dos nomes pedidos, na mesma ordem."""
+        return self._linhas(self.posicoes(grupo, nomes))
+
+    def _localizar(self, grupo, nomes):
+        nomes = [n for n in nomes if (grupo, n) in self.posicao]
+        return [self.posicao[(grupo, n)] for n in nomes], nomes
+
+    def valores(self, grupo, nomes):
+        """(nomes, elos, partidas) como listas, sem montar DataFrame (times em quadra: volei/times.py)."""
+        pos, nomes = self._localizar(grupo, nomes)
+        return nomes, self._valores['Elo'][pos].tolist(), self._valores['Partidas'][pos].tolist()
+
+    def registros(self, grupo, nomes):
+        """Dicts (Grupo, Nome e colunas numéricas) dos nomes pedidos: a base das alterações enfileiradas."""
+        pos, nomes = self._localizar(grupo, nomes)
+        colunas = [self._valores[c][pos].tolist() for c in COLUNAS_NUMERICAS]
+        return [dict(zip(COLUNAS_NUMERICAS, v), Grupo=grupo, Nome=n) for n, *v in zip(nomes, *colunas)]
+
+    def do_grupo(self, grupo):
+        return self._linhas(self.por_grupo.get(grupo, []))
+
+    # --- ALTERAÇÕES ---
+    def aplicar_partida(self, grupo, vencedores, perdedores, delta):
+        """
+        Aplica Elo/Partidas/Vitorias de uma partida inteira de uma vez (vetorizado por coluna).
+        delta: pontos somados aos vencedores e tirados dos perdedores, ou dict Nome -> variação
+        de cada um (motores com incerteza por jogador). Retorna as chaves (Grupo, Nome) alteradas.
+        """
+        pos_v, nomes_v = self._localizar(grupo, vencedores)
+        pos_p, nomes_p = self._localizar(grupo, perdedores)
+        if not pos_v and not pos_p: return []
+
+        pos = pos_v + pos_p
+        if isinstance(delta, dict): elos = [delta.get(n, 0.0) for n in nomes_v + nomes_p]
+        else: elos = [delta] * len(pos_v) + [-delta] * len(pos_p)
+        ajustes = {'Elo': elos, 'Partidas': 1, 'Vitorias': [1] * len(pos_v) + [0] * len(pos_p)}
+        # Só as posições da partida: o custo não cresce com o tamanho da liga
+        for c in COLUNAS_NUMERICAS:
+            valores = self._valores[c]
+            valores[pos] += np.asarray(ajustes[c], dtype=valores.dtype)
+        self.versao += 1
+
+        return [(grupo, n) for n in nomes_v + nomes_p]
+
+    def adicionar(self, registro):
+        """Inclui um jogador novo (dict com as colunas da aba) no fim do elenco."""
+        for c in ('Grupo', 'Nome'):
+            # Elenco compacto: o valor novo precisa virar categoria antes, senão a coluna volta a ser object
+            if isinstance(self.df[c].dtype, pd.CategoricalDtype) and registro[c] not in self.df[c].cat.categories:
+                self.df[c] = self.df[c].cat.add_categories([registro[c]])
+        novo = pd.DataFrame([registro]).reindex(columns=self.df.columns).astype(self.df.dtypes.to_dict())
+        self.df = pd.concat([self.df, novo], ignore_index=True)
+        self._ligar_colunas()
+        i = len(self.df) - 1
+        chave = (registro['Grupo'], registro['Nome'])
+        self.posicao[chave] = i
+        self.por_grupo.setdefault(chave[0], []).append(i)
+        self.versao += 1
+        return chave
+
+    def somar_alteracoes(self, alteracoes):
+        """
+        Soma ao elenco lido do backend as alterações que ainda estão na fila de escrita
+        (formato de volei/concorrencia.py): jogadores novos entram, deltas são somados.
+        """
+        for a in alteracoes:
+            if 'registro' in a and not self.existe(*a['chave']): self.adicionar(a['registro'])
+        deltas = [a for a in alteracoes if 'delta' in a and self.existe(*a['chave'])]
+        if not deltas: return
+        pos = [self.posicao[tuple(a['chave'])] for a in deltas]
+        for c in COLUNAS_NUMERICAS:
+            valores = self._valores[c]
+            np.add.at(valores, pos, np.asarray([a['delta'].get(c, 0) for a in deltas], dtype=valores.dtype))
+        self.versao += 1
+
+    def substituir_valores(self, grupo, df_novos):
+        """
+        Sobrescreve Elo/Partidas/Vitorias do grupo com os valores de `df_novos`
+        (colunas Nome + numéricas). Nomes fora do elenco são ignorados. Retorna as chaves alteradas.
+        """
+        df_novos = df_novos[[(grupo, n) in self.posicao for n in df_novos['Nome']]]
+        if df_novos.empty: return []
+        pos = self.posicoes(grupo, df_novos['Nome'])
+        for c in COLUNAS_NUMERICAS:
+            if c in df_novos.columns: self._valores[c][pos] = df_novos[c].to_numpy(dtype=self._valores[c].dtype)
+        self.versao += 1
+        return [(grupo, n) for n in df_novos['Nome']]
@@ -0,0 +1,182 @@
+"""
+Cálculo de Elo e reconstrução dos ratings a partir do Histórico.
+
+`ReplayElo` reaplica `calcular_novo_elo` partida a partida, na ordem em que
+aparecem na aba Historico, e guarda checkpoints periódicos dos ratings:
+corrigir ou remover a partida N só reprocessa a partir do checkpoint
+anterior a N. Partidas e Vitorias não dependem da ordem e são contadas de
+uma vez com NumPy.
+"""
+import numpy as np
+import pandas as pd
+
+K_FACTOR = 32
+ELO_INICIAL = 1200
+
+
+def expectativa(rating_a, rating_b):
+    """Probabilidade de vitória de quem tem `rating_a` contra `rating_b`."""
+    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+
+
+def calcular_novo_elo(rating_vencedor, rating_perdedor, k=K_FACTOR):
+    return rating_vencedor + k * (1 - expectativa(rating_vencedor, rating_perdedor))
+
+
+def separar_time(texto):
+    """'Ana, Bia, Caio' -> ['Ana', 'Bia', 'Caio'] (formato gravado no Historico)."""
+    if not isinstance(texto, str): return []
+    nomes = texto.split(", ")
+    # Caminho rápido para o formato gravado pelo app; só normaliza se houver espaços/vírgulas extras
+    if "," in texto.replace(", ", "") or any(n != n.strip() or not n for n in nomes):
+        nomes = [n.strip() for n in texto.split(",") if n.strip()]
+    return nomes
+
+
+def time_vencedor(vencedor):
+    """'A', 'B' ou None a partir do texto da coluna Vencedor."""
+    v = str(vencedor)
+    if "Time A" in v or "Time_A" in v: return "A"
+    if "Time B" in v or "Time_B" in v: return "B"
+    return None
+
+
+def pontos_registrados(valor):
+    """Converte a coluna Pontos_Elo ("'+16.1", "+16.1", 16.1) em float (0.0 se vazia)."""
+    try: return float(str(valor).lstrip("'").replace(",", "."))
+    except ValueError: return 0.0
+
+
+def estimar_elo_inicial(df_historico, df_atual, motor="elo"):
+    """
+    Elo com que cada jogador começou: Elo atual menos a soma dos pontos
+    registrados no histórico (Pontos_Elo), somados para o lado vencedor e
+    subtraídos do perdedor. Serve de ponto de partida para o ReplayElo
+    de quem foi cadastrado com Elo diferente de 1200.
+    motor: motor que registrou as partidas do grupo. Só no Elo todos do time
+    variam igual; nos outros (Glicko-2) Pontos_Elo guarda a média do time
+    vencedor e não dá para saber quanto cada um ganhou: devolve None.
+    """
+    if motor != "elo": return None
+    saldo = {}
+    linhas = ReplayElo._linhas(df_historico)
+    pontos = df_historico['Pontos_Elo'].tolist() if 'Pontos_Elo' in df_historico.columns else [0] * len(df_historico)
+    for (_, a, b, v), pts in zip(linhas, pontos):
+        lado = time_vencedor(v)
+        if lado is None: continue
+        delta = abs(pontos_registrados(pts))
+        venc, perd = (a, b) if lado == "A" else (b, a)
+        for n in separar_time(venc): saldo[n] = saldo.get(n, 0.0) + delta
+        for n in separar_time(perd): saldo[n] = saldo.get(n, 0.0) - delta
+    atual = dict(zip(df_atual['Nome'], df_atual['Elo']))
+    return {n: atual[n] - s for n, s in saldo.items() if n in atual}
+
+
+class ReplayElo:
+    def __init__(self, df_historico, k=K_FACTOR, elo_inicial=None, intervalo_checkpoint=1000):
+        """
+        df_historico: linhas da aba Historico de um grupo, em ordem cronológica.
+        elo_inicial: dict opcional Nome -> Elo de partida (padrão 1200 para todos).
+        """
+        self.k = k
+        self.intervalo = intervalo_checkpoint
+        self.nomes = []
+        self._id = {}
+        self.vencedores = []   # por partida: tupla de ids
+        self.perdedores = []
+        self.ativa = []        # False = partida removida
+        for _, a, b, v in self._linhas(df_historico):
+            lado = time_vencedor(v)
+            ids_a, ids_b = self._ids(separar_time(a)), self._ids(separar_time(b))
+            valida = lado is not None and ids_a and ids_b
+            self.vencedores.append(ids_a if lado == "A" else ids_b)
+            self.perdedores.append(ids_b if lado == "A" else ids_a)
+            self.ativa.append(bool(valida))
+        elo_inicial = elo_inicial or {}
+        self.iniciais = [float(elo_inicial.get(n, ELO_INICIAL)) for n in self.nomes]
+        self._checkpoints = {}  # índice da partida -> ratings antes dela
+        self.ratings = None
+        self.deltas = []
+
+    @staticmethod
+    def _linhas(df):
+        col_a = 'Time A' if 'Time A' in df.columns else 'Time_A'
+        col_b = 'Time B' if 'Time B' in df.columns else 'Time_B'
+        return zip(range(len(df)), df[col_a].tolist(), df[col_b].tolist(), df['Vencedor'].tolist())
+
+    def _ids(self, nomes):
+        mapa = self._id
+        for n in nomes:
+            if n not in mapa:
+                mapa[n] = len(self.nomes)
+                self.nomes.append(n)
+        return tuple([mapa[n] for n in nomes])
+
+    # --- REPLAY ---
+    def executar(self, a_partir_de=0):
+        """Recalcula os ratings. Reaproveita o checkpoint mais próximo antes de `a_partir_de`."""
+        inicio = max((c for c in self._checkpoints if c <= a_partir_de), default=0)
+        ratings = list(self._checkpoints[inicio]) if inicio in self._checkpoints else list(self.iniciais)
+        self._checkpoints = {c: r for c, r in self._checkpoints.items() if c <= inicio}
+        self.deltas = self.deltas[:inicio] + [0.0] * (len(self.ativa) - inicio)
+
+        k, intervalo = self.k, self.intervalo
+        vencedores, perdedores, ativa, deltas = self.vencedores, self.perdedores, self.ativa, self.deltas
+        for i in range(inicio, len(ativa)):
+            if i % intervalo == 0: self._checkpoints[i] = ratings.copy()
+            if not ativa[i]: continue
+            v, p = vencedores[i], perdedores[i]
+            mv = sum([ratings[j] for j in v]) / len(v)
+            mp = sum([ratings[j] for j in p]) / len(p)
+            delta = k * (1 - 1 / (1 + 10 ** ((mp - mv) / 400)))
+            for j in v: ratings[j] += delta
+            for j in p: ratings[j] -= delta
+            deltas[i] = delta
+        self.ratings = ratings
+        return ratings
+
+    def corrigir_partida(self, indice, time_a=None, time_b=None, vencedor=None, remover=False):
+        """Edita (ou remove) a partida `indice` e refaz só o trecho afetado."""
+        if remover:
+            self.ativa[indice] = False
+        else:
+            ids_a, ids_b = self._ids(time_a), self._ids(time_b)
+            if len(self.iniciais) < len(self.nomes):
+                # Nomes novos entram com o Elo padrão (também nos checkpoints já guardados)
+                extra = [float(ELO_INICIAL)] * (len(self.nomes) - len(self.iniciais))
+                self.iniciais += extra
+                for r in self._checkpoints.values(): r.extend(extra)
+            lado = time_vencedor(vencedor)
+            self.vencedores[indice] = ids_a if lado == "A" else ids_b
+            self.perdedores[indice] = ids_b if lado == "A" else ids_a
+            self.ativa[indice] = True
+        return self.executar(a_partir_de=indice)
+
+    # --- RESULTADOS ---
+    def contagens(self):
+        """(partidas, vitorias) por jogador, contados de forma vetorizada."""
+        n = len(self.nomes)
+        ativa = np.array(self.ativa, dtype=bool)
+        tam_v = np.array([len(v) for v in self.vencedores]) * ativa
+        tam_p = np.array([len(p) for p in self.perdedores]) * ativa
+        ids_v = np.fromiter((j for v, a in zip(self.vencedores, self.ativa) if a for j in v), dtype=np.int64, count=int(tam_v.sum()))
+        ids_p = np.fromiter((j for p, a in zip(self.perdedores, self.ativa) if a for j in p), dtype=np.int64, count=int(tam_p.sum()))
+        vitorias = np.bincount(ids_v, minlength=n)
+        partidas = vitorias + np.bincount(ids_p, minlength=n)
+        return partidas, vitorias
+
+    def resultado(self):
+        if self.ratings is None: self.executar()
+        partidas, vitorias = self.contagens()
+        return pd.DataFrame({'Nome': self.nomes, 'Elo': self.ratings, 'Partidas': partidas, 'Vitorias': vitorias})
+
+    def comparar(self, df_atual):
+        """
+        Diferença entre os ratings reconstruídos e os atuais (df com Nome/Elo/Partidas/Vitorias do grupo).
+        Jogadores sem partidas no histórico ficam de fora.
+        """
+        novo = self.resultado()
+        atual = df_atual[['Nome', 'Elo', 'Partidas', 'Vitorias']]
+        df = novo.merge(atual, on='Nome', how='left', suffixes=('', '_atual'))
+        df['Diferenca'] = df['Elo'] - df['Elo_atual']
+        return df.sort_values('Diferenca', key=lambda s: s.abs(), ascending=False).reset_index(drop=True)
@@ -0,0 +1,240 @@
+"""
+Motor de equilíbrio de times.
+
+Divide os jogadores em Time A e Time B minimizando a diferença entre as
+médias de Elo, respeitando:
+  * jogadores fixos (`fixos_a` / `fixos_b`, ex.: vencedores redistribuídos);
+  * levantadores espalhados entre os times (diferença máxima de 1);
+  * não repetir exatamente os times da partida anterior (quando houver outra opção).
+
+Motores disponíveis (ver `MOTORES`):
+  * "exato": branch-and-bound, ótimo para os tamanhos usuais (2x2 a 6x6);
+  * "heuristico": divisão inicial + trocas locais, para grupos grandes;
+  * "guloso": o algoritmo antigo (maior Elo vai para o time mais fraco).
+O modo "auto" usa o heurístico como ponto de partida e o exato para refinar,
+sempre dentro do limite de tempo.
+"""
+import time
+
+LIMITE_EXATO = 24           # acima disso de jogadores livres, só heurística
+TEMPO_PADRAO = 0.25         # segundos
+
+
+def _tamanhos(total, tamanho_time, n_fixos_a, n_fixos_b):
+    """Quantas vagas cada time terá com `total` jogadores disponíveis."""
+    total = min(total, tamanho_time * 2)
+    na = min(tamanho_time, max((total + 1) // 2, n_fixos_a), total - n_fixos_b)
+    nb = min(tamanho_time, total - na)
+    return na, nb
+
+
+class _Problema:
+    def __init__(self, jogadores, levantadores, tamanho_time, fixos_a, fixos_b, evitar):
+        fixos = set(fixos_a) | set(fixos_b)
+        elos = {j['Nome']: float(j['Elo']) for j in jogadores}
+        self.fixos_a = [n for n in fixos_a if n in elos]
+        self.fixos_b = [n for n in fixos_b if n in elos]
+        livres = [n for n in elos if n not in fixos]
+        self.na, self.nb = _tamanhos(len(livres) + len(self.fixos_a) + len(self.fixos_b),
+                                     tamanho_time, len(self.fixos_a), len(self.fixos_b))
+        self.vagas_a = max(self.na - len(self.fixos_a), 0)
+        self.vagas_b = max(self.nb - len(self.fixos_b), 0)
+
+        # Livres em ordem decrescente de Elo; sobra quem não couber (os de menor prioridade ficam de fora)
+        livres = livres[:self.vagas_a + self.vagas_b]
+        livres.sort(key=lambda n: -elos[n])
+        self.livres = livres
+        self.elos = [elos[n] for n in livres]
+        levs = set(levantadores)
+        self.lev = [n in levs for n in livres]
+
+        self.soma_fixa_a = sum(elos[n] for n in self.fixos_a)
+        self.soma_fixa_b = sum(elos[n] for n in self.fixos_b)
+        self.lev_fixo_a = sum(n in levs for n in self.fixos_a)
+        self.lev_fixo_b = sum(n in levs for n in self.fixos_b)
+        self.alvos_lev = self._alvos_levantadores()
+        self.evitar = [frozenset(t) for t in (evitar or []) if t]
+
+    def _alvos_levantadores(self):
+        """Valores aceitos para o nº de levantadores no Time A (o mais perto possível da metade)."""
+        livres = sum(self.lev)
+        total = livres + self.lev_fixo_a + self.lev_fixo_b
+        possiveis = [self.lev_fixo_a + k for k in range(max(0, livres - self.vagas_b), min(livres, self.vagas_a) + 1)]
+        if not possiveis: return set()
+        melhor = min(abs(2 * s - total) for s in possiveis)
+        return {s for s in possiveis if abs(2 * s - total) <= max(melhor, 1)}
+
+    def diferenca(self, soma_a, soma_b):
+        ma = soma_a / self.na if self.na else 0
+        mb = soma_b / self.nb if self.nb else 0
+        return abs(ma - mb)
+
+    def avaliar(self, em_a):
+        """em_a: lista de bool por jogador livre. Retorna (diferença, repete_times)."""
+        soma_a = self.soma_fixa_a + sum(e for e, a in zip(self.elos, em_a) if a)
+        soma_b = self.soma_fixa_b + sum(e for e, a in zip(self.elos, em_a) if not a)
+        return self.diferenca(soma_a, soma_b), self.repete(em_a)
+
+    def repete(self, em_a):
+        if not self.evitar: return False
+        time_a = frozenset(self.fixos_a + [n for n, a in zip(self.livres, em_a) if a])
+        time_b = frozenset(self.fixos_b + [n for n, a in zip(self.livres, em_a) if not a])
+        return time_a in self.evitar or time_b in self.evitar
+
+    def levantadores_ok(self, em_a):
+        if not self.alvos_lev: return True
+        return self.lev_fixo_a + sum(l for l, a in zip(self.lev, em_a) if a) in self.alvos_lev
+
+    def times(self, em_a):
+        time_a = self.fixos_a + [n for n, a in zip(self.livres, em_a) if a]
+        time_b = self.fixos_b + [n for n, a in zip(self.livres, em_a) if not a]
+        return time_a, time_b
+
+
+# --- MOTORES ---
+def _guloso(p, prazo):
+    """Algoritmo original: levantadores primeiro, depois os demais, cada um para o time de menor soma."""
+    em_a = [False] * len(p.livres)
+    soma_a, soma_b, qa, qb = p.soma_fixa_a, p.soma_fixa_b, len(p.fixos_a), len(p.fixos_b)
+    ordem = [i for i in range(len(p.livres)) if p.lev[i]] + [i for i in range(len(p.livres)) if not p.lev[i]]
+    for i in ordem:
+        vai_a = qa < p.na and (qb >= p.nb or soma_a <= soma_b)
+        if vai_a:
+            em_a[i] = True; soma_a += p.elos[i]; qa += 1
+        else:
+            soma_b += p.elos[i]; qb += 1
+    return em_a, True
+
+
+def _chave(p, em_a):
+    dif, repete = p.avaliar(em_a)
+    return (not p.levantadores_ok(em_a), repete, dif)
+
+
+def _heuristico(p, prazo, inicial=None):
+    """Divisão gulosa seguida de trocas A<->B enquanto alguma troca melhorar o resultado."""
+    em_a = list(inicial) if inicial is not None else _guloso(p, prazo)[0]
+    melhor = _chave(p, em_a)
+    melhorou = True
+    while melhorou and time.perf_counter() < prazo:
+        melhorou = False
+        idx_a = [i for i, a in enumerate(em_a) if a]
+        idx_b = [i for i, a in enumerate(em_a) if not a]
+        troca, chave_troca = None, melhor
+        for i in idx_a:
+            for j in idx_b:
+                em_a[i], em_a[j] = False, True
+                chave = _chave(p, em_a)
+                em_a[i], em_a[j] = True, False
+                if chave < chave_troca: troca, chave_troca = (i, j), chave
+        if troca:
+            i, j = troca
+            em_a[i], em_a[j] = False, True
+            melhor = chave_troca
+            melhorou = True
+    return em_a, not melhorou
+
+
+def _exato(p, prazo, inicial=None):
+    """
+    Branch-and-bound sobre os jogadores livres (ordem decrescente de Elo).
+    O limite inferior usa o intervalo de somas que o Time A ainda consegue
+    atingir com as vagas restantes; ramos que não podem bater a melhor solução são podados.
+    """
+    m = len(p.livres)
+    elos = p.elos
+    sufixo = [0.0] * (m + 1)
+    for i in range(m - 1, -1, -1): sufixo[i] = sufixo[i + 1] + elos[i]
+    inv_a = 1 / p.na if p.na else 0
+    inv_b = 1 / p.nb if p.nb else 0
+    lev_rest = [0] * (m + 1)
+    for i in range(m - 1, -1, -1): lev_rest[i] = lev_rest[i + 1] + p.lev[i]
+    alvos = p.alvos_lev
+    alvo_min = min(alvos) if alvos else None
+    alvo_max = max(alvos) if alvos else None
+
+    melhor_em_a = list(inicial) if inicial is not None else None
+    melhor = _chave(p, melhor_em_a) if melhor_em_a is not None else (True, True, float("inf"))
+    em_a = [False] * m
+    nos = 0
+    esgotou = [False]
+    # Sem fixos e times do mesmo tamanho, A/B são simétricos: fixa o primeiro jogador no Time A
+    simetrico = not p.fixos_a and not p.fixos_b and p.na == p.nb and m > 0
+
+    def limite(i, soma_a, soma_b, vagas_a):
+        # Soma que ainda irá para A fica entre os `vagas_a` menores e os `vagas_a` maiores restantes
+        resto = sufixo[i]
+        x_min = sufixo[m - vagas_a] if vagas_a else 0.0
+        x_max = sufixo[i] - sufixo[i + vagas_a]
+        base = soma_a * inv_a - (soma_b + resto) * inv_b
+        lo = base + x_min * (inv_a + inv_b)
+        hi = base + x_max * (inv_a + inv_b)
+        if lo <= 0 <= hi: return 0.0
+        return min(abs(lo), abs(hi))
+
+    def buscar(i, soma_a, soma_b, vagas_a, vagas_b, lev_a):
+        nonlocal melhor, melhor_em_a, nos
+        nos += 1
+        if nos % 2048 == 0 and time.perf_counter() > prazo:
+            esgotou[0] = True
+        if esgotou[0]: return
+        if alvos and (lev_a > alvo_max or lev_a + lev_rest[i] < alvo_min): return
+        if i == m:
+            chave = (False, p.repete(em_a), p.diferenca(soma_a, soma_b))
+            if chave < melhor: melhor, melhor_em_a = chave, list(em_a)
+            return
+        if (False, False, limite(i, soma_a, soma_b, vagas_a)) >= melhor: return
+        opcoes = ((True, False) if soma_a * inv_a <= soma_b * inv_b else (False, True))
+        if simetrico and i == 0: opcoes = (True,)
+        for vai_a in opcoes:
+            if vai_a and vagas_a:
+                em_a[i] = True
+                buscar(i + 1, soma_a + elos[i], soma_b, vagas_a - 1, vagas_b, lev_a + p.lev[i])
+                em_a[i] = False
+            elif not vai_a and vagas_b:
+                buscar(i + 1, soma_a, soma_b + elos[i], vagas_a, vagas_b - 1, lev_a)
+            if melhor[2] < 1e-9 and not melhor[0] and not melhor[1]: return
+
+    buscar(0, p.soma_fixa_a, p.soma_fixa_b, p.vagas_a, p.vagas_b, p.lev_fixo_a)
+    if melhor_em_a is None: return _guloso(p, prazo)[0], False
+    return melhor_em_a, not esgotou[0]
+
+
+def _auto(p, prazo):
+    inicial, _ = _heuristico(p, prazo)
+    if len(p.livres) > LIMITE_EXATO: return inicial, False
+    return _exato(p, prazo, inicial=inicial)
+
+
+MOTORES = {
+    "auto": _auto,
+    "exato": _exato,
+    "heuristico": _heuristico,
+    "guloso": _guloso,
+}
+
+
+def equilibrar(jogadores, levantadores, tamanho_time, fixos_a=None, fixos_b=None,
+               evitar=None, motor="auto", tempo_limite=TEMPO_PADRAO):
+    """
+    jogadores: registros (dicts com 'Nome' e 'Elo') de todos os envolvidos, inclusive os fixos.
+    evitar: lista de times (listas de nomes) que não devem se repetir, ex.: os da última partida.
+
+    Retorna dict com 'A', 'B' (listas de nomes), 'diferenca' (entre médias de Elo),
+    'tempo_ms', 'motor' e 'otimo' (True se a busca terminou dentro do prazo).
+    """
+    inicio = time.perf_counter()
+    p = _Problema(jogadores, levantadores, tamanho_time, fixos_a or [], fixos_b or [], evitar)
+    em_a, completo = MOTORES[motor](p, inicio + tempo_limite)
+    time_a, time_b = p.times(em_a)
+    dif, repete = p.avaliar(em_a)
+    return {
+        "A": time_a,
+        "B": time_b,
+        "diferenca": dif,
+        "repete_times": repete,
+        "levantadores_ok": p.levantadores_ok(em_a),
+        "tempo_ms": (time.perf_counter() - inicio) * 1000,
+        "motor": motor,
+        "otimo": completo and motor in ("auto", "exato"),
+    }
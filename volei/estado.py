@@ -0,0 +1,104 @@
+"""
+Persistência do estado da quadra de cada grupo (state_<grupo>.json).
+Outros dados por grupo usam o mesmo armazém com outro `prefixo`.
+
+* Escrita atômica: grava num arquivo temporário e troca com os.replace,
+  então uma queda no meio da escrita nunca deixa o arquivo pela metade.
+* Debounce: salvamentos seguidos do mesmo grupo dentro de `atraso` segundos
+  viram uma única escrita, com o estado mais recente.
+* O estado pode ser uma função sem argumentos: só é chamada na gravação,
+  então salvamentos seguidos de um dado grande viram uma conversão só.
+* Versão: cada salvamento incrementa a versão do grupo. Quem salva informa a
+  versão que carregou; se outra sessão salvou depois disso, `salvar` levanta
+  ConflitoEstado em vez de sobrescrever o trabalho dela.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+
+
+class ConflitoEstado(Exception):
+    def __init__(self, grupo, versao_atual):
+        super().__init__(f"O estado de '{grupo}' foi alterado por outra sessão (versão {versao_atual}).")
+        self.grupo = grupo
+        self.versao_atual = versao_atual
+
+
+class ArmazemEstado:
+    def __init__(self, pasta=".", atraso=0.5, prefixo="state"):
+        self.pasta = pasta
+        self.prefixo = prefixo
+        self.atraso = atraso
+        self._lock = threading.Lock()
+        self._pendentes = {}  # grupo -> (estado, versao) ainda não gravados
+        self._versoes = {}    # grupo -> (mtime do arquivo, versao) da última leitura/escrita
+        self._timer = None
+        atexit.register(self.descarregar)
+
+    def caminho(self, grupo):
+        if not grupo: return None
+        nome_seguro = re.sub(r'[^\w\s-]', '', grupo).strip().replace(' ', '_')
+        return os.path.join(self.pasta, f"{self.prefixo}_{nome_seguro}.json")
+
+    # --- LEITURA ---
+    def _ler_arquivo(self, grupo):
+        """(estado, versao) do disco; (None, 0) se não existir ou estiver ilegível."""
+        arquivo = self.caminho(grupo)
+        try:
+            mtime = os.stat(arquivo).st_mtime_ns
+            with open(arquivo, encoding="utf-8") as f: dados = json.load(f)
+        except FileNotFoundError:
+            return None, 0
+        except Exception as e:
+            print(f"Erro ao ler estado de {grupo}: {e}")
+            return None, 0
+        if 'estado' not in dados: dados = {'versao': 0, 'estado': dados}  # formato antigo, sem versão
+        self._versoes[grupo] = (mtime, dados['versao'])
+        return dados['estado'], dados['versao']
+
+    def _versao_atual(self, grupo):
+        if grupo in self._pendentes: return self._pendentes[grupo][1]
+        try: mtime = os.stat(self.caminho(grupo)).st_mtime_ns
+        except FileNotFoundError: return 0
+        conhecida = self._versoes.get(grupo)
+        if conhecida and conhecida[0] == mtime: return conhecida[1]
+        return self._ler_arquivo(grupo)[1]
+
+    def carregar(self, grupo):
+        """(estado, versao) mais recente do grupo, incluindo o que ainda não foi gravado."""
+        with self._lock:
+            if grupo in self._pendentes:
+                estado, versao = self._pendentes[grupo]
+                return (estado() if callable(estado) else estado), versao
+            return self._ler_arquivo(grupo)
+
+    # --- ESCRITA ---
+    def salvar(self, grupo, estado, versao_base, forcar=False):
+        """Agenda a gravação e devolve a nova versão. forcar=True ignora a conferência de versão."""
+        with self._lock:
+            atual = self._versao_atual(grupo)
+            if not forcar and versao_base != atual: raise ConflitoEstado(grupo, atual)
+            self._pendentes[grupo] = (estado, atual + 1)
+            if self._timer is None:
+                self._timer = threading.Timer(self.atraso, self.descarregar)
+                self._timer.daemon = True
+                self._timer.start()
+            return atual + 1
+
+    def descarregar(self):
+        """Grava agora tudo que está pendente."""
+        with self._lock:
+            pendentes, self._pendentes, self._timer = self._pendentes, {}, None
+            for grupo, (estado, versao) in pendentes.items():
+                arquivo = self.caminho(grupo)
+                temporario = arquivo + ".tmp"
+                try:
+                    if callable(estado): estado = estado()
+                    with open(temporario, "w", encoding="utf-8") as f:
+                        json.dump({'versao': versao, 'estado': estado}, f, ensure_ascii=False, separators=(",", ":"))
+                    os.replace(temporario, arquivo)
+                    self._versoes[grupo] = (os.stat(arquivo).st_mtime_ns, versao)
+                except Exception as e:
+                    print(f"Erro ao salvar estado de {grupo}: {e}")
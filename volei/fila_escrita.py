@@ -0,0 +1,250 @@
+"""
+Fila de escrita em segundo plano.
+
+Cada resultado de partida entra na fila (gravada em disco, JSONL) e a tela
+segue para a próxima rodada na hora. Uma thread esvazia a fila no backend:
+partidas seguidas viram uma única escrita em lote (alterações de Jogadores
+mescladas por chave + todas as linhas de Historico de uma vez). Em caso de
+erro tenta de novo com espera exponencial; depois de `max_tentativas` as
+partidas ficam marcadas como falhas até alguém pedir nova tentativa.
+
+Os itens levam alterações (deltas + assinatura da base, ver
+volei/concorrencia.py), não valores absolutos: o backend os aplica sobre os
+valores atuais, então sessões com cópias velhas do elenco não apagam o
+trabalho umas das outras. `versao` muda quando algum envio encontrou
+conflito, sinal para as sessões relerem o elenco.
+
+Antes de gravar os deltas, os itens do lote são marcados (`aplicando`) no
+arquivo. Se o envio falhar ou o processo cair antes de a fila anotar o
+resultado, a nova tentativa repete exatamente esse lote, conferindo no
+backend o que já foi gravado: o mesmo delta nunca é somado duas vezes.
+
+Os ids dos últimos itens gravados ficam em <arquivo>_entregues.json: um
+resultado que o diário da quadra reenvia na abertura (confirmação perdida) é
+descartado mesmo que a fila já o tenha gravado e esquecido.
+
+Depois de cada envio o registro Meta (último grupo ativo e lista de grupos,
+ver volei/meta.py) é atualizado se mudou.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from volei.concorrencia import mesclar_alteracoes
+from volei.meta import atualizar_meta
+
+MAX_ENTREGUES = 1000  # ids de itens gravados lembrados para descartar reenvios
+
+
+class FilaEscrita:
+    def __init__(self, backend, arquivo="fila_escrita.jsonl", max_tentativas=5, espera_base=1.0, espera_max=60.0,
+                 ao_enviar=None):
+        """ao_enviar: função chamada após cada lote gravado com sucesso."""
+        self.backend = backend
+        self.ao_enviar = ao_enviar
+        self.ultimo_envio = None
+        self.arquivo = arquivo
+        self.arquivo_entregues = os.path.splitext(arquivo)[0] + "_entregues.json" if arquivo else None
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.ultimo_erro = None
+        self.enviando = False
+        self.versao = 0
+        self._itens = []
+        self._entregues = {}  # id -> None, em ordem de entrega
+        self._meta = None
+        self._lock = threading.Lock()
+        self._lock_meta = threading.Lock()
+        self._acordar = threading.Event()
+        self._carregar_arquivo()
+        self._thread = threading.Thread(target=self._laco, daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        if self._itens: self._acordar.set()
+        return self
+
+    # --- PERSISTÊNCIA DA FILA ---
+    def _carregar_arquivo(self):
+        if self.arquivo_entregues and os.path.exists(self.arquivo_entregues):
+            try:
+                with open(self.arquivo_entregues, encoding="utf-8") as f: self._entregues = dict.fromkeys(json.load(f))
+            except Exception as e:
+                print(f"Erro ao ler ids entregues da fila de escrita: {e}")
+        if not self.arquivo or not os.path.exists(self.arquivo): return
+        try:
+            with open(self.arquivo, encoding="utf-8") as f:
+                self._itens = [json.loads(l) for l in f if l.strip()]
+        except Exception as e:
+            print(f"Erro ao ler fila de escrita: {e}")
+        # Queda entre anotar a entrega e tirar os itens do arquivo
+        self._itens = [i for i in self._itens if i["id"] not in self._entregues]
+        for item in self._itens:
+            # Formato antigo: linhas completas dos jogadores, gravadas por cima do que estiver na planilha
+            if "jogadores" in item:
+                item["alteracoes"] = [{"chave": [l['Grupo'], l['Nome']], "registro": l, "sobrescrever": True}
+                                      for l in item.pop("jogadores")]
+
+    def _regravar_arquivo(self):
+        if not self.arquivo: return
+        temporario = self.arquivo + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            for item in self._itens: f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        os.replace(temporario, self.arquivo)
+
+    def _lembrar_entregues(self, ids):
+        for id_item in ids: self._entregues[id_item] = None
+        for id_item in list(self._entregues)[:-MAX_ENTREGUES]: del self._entregues[id_item]
+        if not self.arquivo_entregues: return
+        temporario = self.arquivo_entregues + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f: json.dump(list(self._entregues), f)
+        os.replace(temporario, self.arquivo_entregues)
+
+    # --- ENTRADA ---
+    def enfileirar(self, alteracoes, registros_historico, id_item=None):
+        """
+        Registra uma partida (ou outra mudança no elenco) para envio. Retorna o id do item.
+        id_item: id já definido (resultado anotado no diário); se já está na fila ou já foi
+        gravado, não entra de novo e o retorno é None.
+        """
+        item = {
+            "id": id_item or uuid.uuid4().hex,
+            "criado_em": time.time(),
+            "alteracoes": alteracoes,
+            "historico": registros_historico,
+            "tentativas": 0,
+            "falhou": False,
+        }
+        with self._lock:
+            if id_item in self._entregues: return None
+            if id_item and any(i["id"] == id_item for i in self._itens): return id_item
+            self._itens.append(item)
+            if self.arquivo:
+                with open(self.arquivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self._acordar.set()
+        return item["id"]
+
+    def tentar_novamente(self):
+        """Devolve à fila os itens que tinham desistido."""
+        with self._lock:
+            for item in self._itens:
+                item["falhou"] = False
+                item["tentativas"] = 0
+            self._regravar_arquivo()
+        self._acordar.set()
+
+    def alteracoes_pendentes(self):
+        """Alterações do elenco ainda não gravadas no backend (inclui as que falharam)."""
+        with self._lock:
+            return [a for item in self._itens for a in item["alteracoes"]]
+
+    def status(self):
+        with self._lock:
+            falhas = sum(1 for i in self._itens if i["falhou"])
+            return {
+                "pendentes": len(self._itens) - falhas,
+                "falhas": falhas,
+                "enviando": self.enviando,
+                "ultimo_erro": self.ultimo_erro,
+            }
+
+    # --- META ---
+    def meta(self):
+        """Registro Meta do backend, lido uma vez por processo e mantido em dia pelos envios."""
+        if self._meta is None:
+            try:
+                self._meta = self.backend.ler_meta()
+            except Exception as e:
+                print(f"Erro ao ler registro Meta: {e}")
+                return {}
+        return self._meta
+
+    def completar_meta(self, grupos, ultimo_grupo=None):
+        """Inclui grupos (e o último grupo ativo) no registro Meta, gravando só se algo mudou."""
+        # Falha aqui não pode derrubar quem chamou (no envio, as partidas já foram gravadas)
+        try:
+            with self._lock_meta:
+                novo = atualizar_meta(self.meta(), grupos, ultimo_grupo)
+                if novo is not None:
+                    self.backend.gravar_meta(novo)
+                    self._meta = novo
+        except Exception as e:
+            print(f"Erro ao gravar registro Meta: {e}")
+
+    # --- ENVIO ---
+    def _lote(self):
+        with self._lock:
+            lote = [i for i in self._itens if not i["falhou"]]
+            # Lote cujos deltas podem já estar gravados: vai sozinho, para a conferência achar base + delta
+            return [i for i in lote if i.get("aplicando")] or lote
+
+    def enviar(self):
+        """Envia tudo que está pendente em uma escrita. Retorna nº de partidas enviadas."""
+        lote = self._lote()
+        if not lote: return 0
+
+        alteracoes = mesclar_alteracoes([a for item in lote for a in item["alteracoes"]])
+        historico = [r for item in lote for r in item["historico"]]
+
+        if alteracoes:
+            conferir = any(item.get("aplicando") for item in lote)
+            with self._lock:
+                for item in lote: item["aplicando"] = bool(item["alteracoes"])
+                self._regravar_arquivo()
+            self.ultimo_envio = self.backend.aplicar_alteracoes(alteracoes, conferir=conferir)
+            if self.ultimo_envio.get("conflitos"): self.versao += 1
+        # Deltas não podem ser aplicados duas vezes: se o Historico falhar, a nova tentativa só reenvia ele.
+        # Um erro no anexo pode chegar depois de a planilha ter gravado: a nova tentativa confere antes.
+        conferir = any(item.get("anexando") for item in lote)
+        with self._lock:
+            for item in lote: item.update(alteracoes=[], aplicando=False, anexando=bool(item["historico"]))
+            self._regravar_arquivo()
+        if historico: self.backend.anexar_historico(historico, conferir=conferir)
+        ultimo = historico[-1].get('Grupo') if historico else None
+        self.completar_meta([a['chave'][0] for a in alteracoes] + [r.get('Grupo') for r in historico], ultimo)
+        if self.ao_enviar: self.ao_enviar()
+
+        ids = {i["id"] for i in lote}
+        with self._lock:
+            self._lembrar_entregues(i["id"] for i in lote)
+            self._itens = [i for i in self._itens if i["id"] not in ids]
+            self._regravar_arquivo()
+            # Um lote conferido vai sozinho: o que chegou enquanto isso segue logo depois
+            if any(not i["falhou"] for i in self._itens): self._acordar.set()
+        return len(lote)
+
+    def _laco(self):
+        espera = None
+        while True:
+            self._acordar.wait(espera)
+            self._acordar.clear()
+            self.enviando = True
+            try:
+                self.enviar()
+                self.ultimo_erro = None
+                espera = None
+            except Exception as e:
+                self.ultimo_erro = str(e)
+                print(f"Erro ao enviar fila de escrita: {e}")
+                espera = self._registrar_falha()
+            finally:
+                self.enviando = False
+
+    def _registrar_falha(self):
+        """Conta a tentativa e devolve quanto esperar (exponencial com jitter)."""
+        with self._lock:
+            tentativas = 0
+            for item in self._itens:
+                if item["falhou"]: continue
+                item["tentativas"] += 1
+                if item["tentativas"] >= self.max_tentativas: item["falhou"] = True
+                tentativas = max(tentativas, item["tentativas"])
+            self._regravar_arquivo()
+            if all(i["falhou"] for i in self._itens): return None
+        atraso = min(self.espera_max, self.espera_base * 2 ** (tentativas - 1))
+        return atraso * random.uniform(0.5, 1.0)
@@ -0,0 +1,179 @@
+"""
+Cache compartilhado da aba Historico.
+
+A aba é lida uma vez e fica em memória já separada por Grupo. Cada mudança
+incrementa `versao`, para que quem deriva dados do histórico saiba quando
+recalcular. Partidas gravadas pelo próprio app entram direto no cache
+(`registrar`), sem nova leitura; edições feitas à mão na planilha são
+captadas por uma revalidação em segundo plano a cada `intervalo` segundos.
+As partidas registradas ficam também numa lista de pendentes até aparecerem
+numa leitura (a fila de escrita grava depois): recargas e `invalidar` as
+reaplicam, para não sumirem da tela enquanto a fila não esvaziou.
+O índice normalizado (`indice()`) e os agregados por dia (`agregados()`)
+são montados uma vez por leitura e depois recebem as partidas novas.
+"""
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+from volei.agregados_dia import AgregadosDia
+from volei.indice_historico import IndiceHistorico
+from volei.planilhas import COLUNAS_HISTORICO
+
+
+def normalizar_historico(df):
+    df = df.dropna(how="all").reset_index(drop=True)
+    for c in COLUNAS_HISTORICO:
+        if c not in df.columns: df[c] = ""
+    return df
+
+
+def _chave(registro):
+    """Partida comparável entre o que o app registrou e o que a planilha devolve ('+12.3 x +12.3 x 12.3)."""
+    chave = []
+    for c in COLUNAS_HISTORICO:
+        valor = registro.get(c)
+        texto = "" if valor is None or (isinstance(valor, float) and pd.isna(valor)) else str(valor).lstrip("'")
+        if c == 'Pontos_Elo':
+            try: texto = f"{float(texto):+.4f}"
+            except ValueError: pass
+        chave.append(texto)
+    return tuple(chave)
+
+
+class CacheHistorico:
+    def __init__(self, ler, intervalo=300, folga=200):
+        """
+        ler: função sem argumentos que devolve a aba Historico crua (DataFrame).
+        folga: quantas linhas além das pendentes procurar no fim de cada leitura para dar uma pendente como gravada.
+        """
+        self._ler = ler
+        self.intervalo = intervalo
+        self.folga = folga
+        self.versao = 0
+        self._df = None
+        self._pendentes = []  # registros de `registrar` que ainda não vieram numa leitura
+        self._por_grupo = {}
+        self._indice = None
+        self._agregados = None
+        self._carregado_em = 0.0
+        self._lock = threading.Lock()
+        self._revalidando = False
+        self._versao_origem = None
+
+    # --- LEITURA ---
+    def _carregar(self):
+        df = normalizar_historico(self._ler())
+        with self._lock:
+            self._definir(df)
+            return self._df, self._por_grupo
+
+    def _definir(self, df):
+        if self._pendentes:
+            recentes = Counter(_chave(r) for r in df.iloc[-(len(self._pendentes) + self.folga):].to_dict('records'))
+            faltando = []
+            for registro in self._pendentes:
+                chave = _chave(registro)
+                if recentes[chave]: recentes[chave] -= 1
+                else: faltando.append(registro)
+            self._pendentes = faltando
+            if faltando:
+                novos = pd.DataFrame(faltando, columns=COLUNAS_HISTORICO)
+                novos.index = range(len(df), len(df) + len(novos))
+                df = pd.concat([df, novos])
+        self._df = df
+        self._por_grupo = {g: parte for g, parte in df.groupby('Grupo', sort=False)} if not df.empty else {}
+        self._indice = None
+        self._agregados = None
+        self._carregado_em = time.monotonic()
+        self.versao += 1
+
+    def _revalidar_em_segundo_plano(self):
+        with self._lock:
+            if self._revalidando: return
+            self._revalidando = True
+
+        def tarefa():
+            try: self._carregar()
+            except Exception as e: print(f"Erro ao revalidar histórico: {e}")
+            finally:
+                with self._lock: self._revalidando = False
+
+        threading.Thread(target=tarefa, daemon=True).start()
+
+    def _garantir(self):
+        """
+        (df, por_grupo) atuais, pegos juntos sob o lock: a fila de escrita e a sincronização podem
+        chamar `invalidar` de outra thread, e quem consulta segue com a referência que recebeu.
+        """
+        with self._lock:
+            df, por_grupo = self._df, self._por_grupo
+        if df is None: return self._carregar()
+        if self.intervalo and time.monotonic() - self._carregado_em > self.intervalo:
+            # Entrega o que já tem e atualiza por trás (stale-while-revalidate)
+            self._revalidar_em_segundo_plano()
+        return df, por_grupo
+
+    def todos(self):
+        return self._garantir()[0]
+
+    def do_grupo(self, grupo):
+        df, por_grupo = self._garantir()
+        parte = por_grupo.get(grupo)
+        if parte is None: return df.iloc[0:0]
+        return parte
+
+    def indice(self):
+        """IndiceHistorico da versão atual (montado na primeira consulta após cada recarga)."""
+        df, _ = self._garantir()
+        with self._lock:
+            # Recarregado ou invalidado desde o _garantir: índice só desta consulta
+            if self._df is not df: return IndiceHistorico(df)
+            if self._indice is None: self._indice = IndiceHistorico(df)
+            return self._indice
+
+    def agregados(self):
+        """AgregadosDia da versão atual (montados a partir do índice na primeira consulta após cada recarga)."""
+        df, _ = self._garantir()
+        with self._lock:
+            if self._df is not df: return AgregadosDia(IndiceHistorico(df))
+            if self._indice is None: self._indice = IndiceHistorico(df)
+            if self._agregados is None: self._agregados = AgregadosDia(self._indice)
+            return self._agregados
+
+    def ultimo_grupo(self):
+        df = self.todos()
+        return None if df.empty else df.iloc[-1]['Grupo']
+
+    # --- ESCRITA / INVALIDAÇÃO ---
+    def registrar(self, registros):
+        """Inclui partidas recém-gravadas pelo app, sem reler a planilha."""
+        novos = pd.DataFrame(registros, columns=COLUNAS_HISTORICO)
+        with self._lock:
+            self._pendentes.extend(novos.to_dict('records'))
+            if self._df is None: return  # ainda não carregado: a primeira leitura já soma as pendentes
+            novos.index = range(len(self._df), len(self._df) + len(novos))
+            self._df = pd.concat([self._df, novos])
+            for g, parte in novos.groupby('Grupo', sort=False):
+                anterior = self._por_grupo.get(g)
+                self._por_grupo[g] = parte if anterior is None else pd.concat([anterior, parte])
+            if self._indice is not None:
+                partidas, participacoes = self._indice.anexar(novos)
+                if self._agregados is not None: self._agregados.anexar(partidas, participacoes)
+            self.versao += 1
+
+    def acompanhar_origem(self, versao_origem):
+        """Invalida o cache quando a fonte dos dados avisa que mudou (ex.: sincronização externa)."""
+        if self._versao_origem is not None and versao_origem != self._versao_origem:
+            self.invalidar()
+        self._versao_origem = versao_origem
+
+    def invalidar(self):
+        """Descarta o cache; a próxima consulta relê a planilha (as pendentes continuam)."""
+        with self._lock:
+            self._df = None
+            self._por_grupo = {}
+            self._indice = None
+            self._agregados = None
@@ -0,0 +1,156 @@
+"""
+Índice normalizado das partidas da aba Historico.
+
+A planilha guarda os times como texto ("Ana, Bia, Caio") e, nas linhas
+antigas, a data sem ano ("%d/%m %H:%M"). Aqui cada versão do histórico vira:
+
+* partidas:      uma linha por partida (match_id, Grupo, Timestamp, Dia, Lado_vencedor, Pontos)
+* participacoes: formato longo (match_id, Grupo, Jogador, Lado, Venceu)
+
+mais dicionários (grupo, dia) -> partidas e (grupo, jogador) -> partidas para
+consultas diretas. O match_id é o índice da linha no DataFrame do histórico.
+"""
+import datetime
+
+import pandas as pd
+import pytz
+
+from volei.elo import time_vencedor
+
+FORMATO_DATA = "%d/%m/%Y %H:%M"
+FUSO_HORARIO = pytz.timezone('America/Sao_Paulo')  # o mesmo com que o app carimba as partidas
+_PADRAO_DATA = r"^'?\s*(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\s+(\d{1,2}):(\d{2})"
+
+_MINUTOS_DIA = 1440
+_VIRADA_ANO = 183 * _MINUTOS_DIA  # "voltar" mais que isso de uma linha para a seguinte = virada de ano
+
+
+def _minuto_do_ano(mes, dia, hora, minuto):
+    # Aproximado (meses de 31 dias): só é usado para comparar datas do mesmo ano
+    return ((mes - 1) * 31 + dia) * _MINUTOS_DIA + hora * 60 + minuto
+
+
+def interpretar_datas(datas, agora=None):
+    """
+    Coluna Data -> Série de Timestamps (NaT quando ilegível).
+
+    Aceita o formato atual (com ano) e o antigo, sem ano. No antigo o ano é
+    deduzido de trás para frente: a linha mais recente fica no ano de `agora`
+    (ou no anterior, se cairia no futuro) e cada linha anterior fica no ano da
+    seguinte, voltando um ano quando a data "pula para frente" mais de meio ano,
+    o que só acontece numa virada de ano. `agora` padrão: hora de Brasília, não a do
+    servidor (em UTC a noite de 31/12 já seria o ano seguinte).
+    """
+    agora = agora or datetime.datetime.now(FUSO_HORARIO)
+    partes = pd.Series(datas, dtype=object).astype(str).str.extract(_PADRAO_DATA)
+    dia, mes, ano, hora, minuto = (partes[i].astype(float) for i in range(5))
+    ano = ano.where(~(ano < 100), ano + 2000)
+
+    anos = ano.tolist()
+    chaves = _minuto_do_ano(mes, dia, hora, minuto).tolist()
+    ano_seguinte = agora.year
+    chave_seguinte = _minuto_do_ano(agora.month, agora.day, agora.hour, agora.minute)
+    tolerancia = _MINUTOS_DIA  # contra `agora` basta um dia de folga (fuso/relógio)
+    for i in range(len(anos) - 1, -1, -1):
+        chave = chaves[i]
+        if chave != chave: continue  # NaN: data ilegível
+        if anos[i] != anos[i]:
+            anos[i] = ano_seguinte - 1 if chave - chave_seguinte > tolerancia else ano_seguinte
+        ano_seguinte, chave_seguinte, tolerancia = anos[i], chave, _VIRADA_ANO
+
+    componentes = pd.DataFrame({'year': anos, 'month': mes, 'day': dia, 'hour': hora, 'minute': minuto},
+                               index=partes.index)
+    validas = componentes.notna().all(axis=1)
+    resultado = pd.Series(pd.NaT, index=partes.index, dtype="datetime64[ns]")
+    if validas.any():
+        resultado[validas] = pd.to_datetime(componentes[validas].astype(int), errors='coerce')
+    return resultado
+
+
+def _pontos(coluna):
+    # Mesmo resultado de abs(pontos_registrados(v)), vetorizado
+    texto = coluna.astype(str).str.lstrip("'").str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors='coerce').fillna(0.0).abs()
+
+
+class IndiceHistorico:
+    def __init__(self, df_historico, agora=None):
+        """df_historico: aba Historico inteira (todos os grupos), em ordem cronológica."""
+        self.partidas = self._tabela_partidas(df_historico, agora)
+        self.participacoes = self._tabela_participacoes(df_historico, self.partidas)
+        self._por_dia = {}
+        self._por_jogador = {}
+        self._ultimo = {}  # grupo -> Timestamp da partida mais recente
+        self._indexar(self.partidas, self.participacoes)
+
+    # --- CONSTRUÇÃO ---
+    @staticmethod
+    def _tabela_partidas(df, agora):
+        ts = interpretar_datas(df['Data'], agora)
+        partidas = pd.DataFrame({
+            'Grupo': df['Grupo'],
+            'Timestamp': ts,
+            'Dia': ts.dt.date,
+            'Lado_vencedor': df['Vencedor'].map(time_vencedor),
+            'Pontos': _pontos(df['Pontos_Elo']) if 'Pontos_Elo' in df.columns else 0.0,
+        }, index=df.index)
+        partidas.index.name = 'match_id'
+        return partidas
+
+    @staticmethod
+    def _tabela_participacoes(df, partidas):
+        blocos = []
+        for lado, coluna in (("A", 'Time A'), ("B", 'Time B')):
+            # Mesmo resultado de separar_time, mas vetorizado: split + explode + strip
+            jogadores = df[coluna].fillna("").astype(str).str.split(",").explode().str.strip()
+            jogadores = jogadores[jogadores != ""]
+            blocos.append(pd.DataFrame({
+                'Grupo': partidas['Grupo'].reindex(jogadores.index),
+                'Jogador': jogadores,
+                'Lado': lado,
+                'Venceu': (partidas['Lado_vencedor'] == lado).reindex(jogadores.index),
+            }))
+        participacoes = pd.concat(blocos).sort_index(kind='stable')
+        participacoes.index.name = 'match_id'
+        return participacoes
+
+    def _indexar(self, partidas, participacoes):
+        datadas = partidas[partidas['Timestamp'].notna()]
+        if not datadas.empty:
+            ids = datadas.index.to_numpy()
+            for chave, posicoes in datadas.groupby(['Grupo', 'Dia'], sort=False).indices.items():
+                self._por_dia.setdefault(chave, []).extend(ids[posicoes].tolist())
+            for grupo, ts in datadas.groupby('Grupo', sort=False)['Timestamp'].max().items():
+                if grupo not in self._ultimo or ts >= self._ultimo[grupo]: self._ultimo[grupo] = ts
+        if participacoes.empty: return
+        ids = participacoes.index.to_numpy()
+        for chave, posicoes in participacoes.groupby(['Grupo', 'Jogador'], sort=False).indices.items():
+            self._por_jogador.setdefault(chave, []).extend(ids[posicoes].tolist())
+
+    def anexar(self, df_novos, agora=None):
+        """Inclui partidas recém-gravadas (df com o mesmo índice usado no histórico). Retorna (partidas, participacoes) novas."""
+        partidas = self._tabela_partidas(df_novos, agora)
+        participacoes = self._tabela_participacoes(df_novos, partidas)
+        self.partidas = pd.concat([self.partidas, partidas])
+        self.participacoes = pd.concat([self.participacoes, participacoes])
+        self._indexar(partidas, participacoes)
+        return partidas, participacoes
+
+    # --- CONSULTAS ---
+    def ultima_sessao(self, grupo):
+        """Dia (datetime.date) da partida mais recente do grupo, ou None."""
+        ts = self._ultimo.get(grupo)
+        return None if ts is None else ts.date()
+
+    def partidas_do_dia(self, grupo, dia):
+        """match_ids das partidas do grupo naquele dia, em ordem."""
+        return list(self._por_dia.get((grupo, dia), []))
+
+    def jogadores_do_dia(self, grupo, dia):
+        ids = self._por_dia.get((grupo, dia))
+        if not ids: return set()
+        return set(self.participacoes.loc[ids, 'Jogador'])
+
+    def partidas_do_jogador(self, grupo, nome):
+        """match_ids das partidas em que o jogador entrou, em ordem."""
+        return list(self._por_jogador.get((grupo, nome), []))
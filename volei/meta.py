@@ -0,0 +1,40 @@
+"""
+Registro Meta: o mínimo que o app precisa para abrir (último grupo ativo e
+lista de grupos), sem baixar Jogadores e Historico inteiros.
+
+Fica numa aba/tabela de duas colunas (Chave, Valor) e é atualizado pela fila
+de escrita a cada envio que muda alguma das informações. Planilhas antigas
+não têm o registro: nesse caso `ler_meta` devolve {} e o app cai no caminho
+antigo (ler o histórico para descobrir o último grupo).
+"""
+import json
+
+import pandas as pd
+
+COLUNAS_META = ["Chave", "Valor"]
+
+
+def meta_de_tabela(df):
+    """DataFrame Chave/Valor -> dict (valores em JSON; tabela vazia ou inválida = {})."""
+    if df is None or df.empty or not set(COLUNAS_META) <= set(df.columns): return {}
+    meta = {}
+    for chave, valor in df[COLUNAS_META].dropna(subset=["Chave"]).itertuples(index=False, name=None):
+        try: meta[str(chave)] = json.loads(valor)
+        except (TypeError, ValueError): meta[str(chave)] = valor
+    return meta
+
+
+def tabela_de_meta(meta):
+    return pd.DataFrame([(k, json.dumps(v, ensure_ascii=False)) for k, v in meta.items()], columns=COLUNAS_META)
+
+
+def atualizar_meta(meta, grupos, ultimo_grupo=None):
+    """Meta com os grupos novos no fim da lista (e o último grupo ativo, se dado). None se nada mudou."""
+    lista = list(meta.get("grupos", []))
+    conhecidos = set(lista)
+    for g in grupos:
+        if g and g not in conhecidos:
+            lista.append(g)
+            conhecidos.add(g)
+    novo = {**meta, "grupos": lista, "ultimo_grupo": ultimo_grupo or meta.get("ultimo_grupo")}
+    return None if novo == meta else novo
@@ -0,0 +1,227 @@
+"""
+Acesso de baixo nível às abas do Google Sheets.
+
+O `conn.update` do st-gsheets-connection limpa a aba inteira e regrava todas
+as linhas. Aqui ficam as operações que mexem só no necessário.
+"""
+from collections import Counter
+
+import pandas as pd
+
+COLUNAS_HISTORICO = ["Data", "Time A", "Time B", "Vencedor", "Pontos_Elo", "Grupo"]
+
+# Abas cujo cabeçalho já foi conferido neste processo (evita ler a linha 1 a cada escrita)
+_cabecalhos_conferidos = {}
+
+
+def obter_aba(conn, nome_aba):
+    """Retorna o objeto Worksheet (gspread) da aba ou None se a conexão não expõe a API (ver `aba` em ConexaoGoogle)."""
+    abrir = getattr(conn, "aba", None)
+    return abrir(nome_aba) if abrir else None
+
+
+def _valores_para_envio(df):
+    """Converte o DataFrame em lista de linhas com tipos aceitos pela API."""
+    linhas = []
+    for registro in df.itertuples(index=False, name=None):
+        linhas.append(["" if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in registro])
+    return linhas
+
+
+def _canonico(valor):
+    """Valor como a planilha devolve (USER_ENTERED some com o apóstrofo inicial)."""
+    texto = "" if valor is None else str(valor)
+    return texto[1:] if texto.startswith("'") else texto
+
+
+def _ja_gravadas(aba, linhas, largura, folga=50):
+    """Índices de `linhas` que já estão entre as últimas da aba (envio anterior que falhou depois de gravar)."""
+    recentes = aba.get_all_values()[1:][-(len(linhas) + folga):]
+    fim = Counter(tuple(_canonico(v) for v in (l + [""] * largura)[:largura]) for l in recentes)
+    repetidas = set()
+    for i, linha in enumerate(linhas):
+        chave = tuple(_canonico(v) for v in linha[:largura])
+        if fim[chave]:
+            fim[chave] -= 1
+            repetidas.add(i)
+    return repetidas
+
+
+def anexar_linhas(conn, nome_aba, df, colunas=None, conferir=False):
+    """
+    Acrescenta as linhas de `df` ao fim da aba, sem reler nem regravar o conteúdo existente.
+    Se a aba ainda estiver vazia, escreve o cabeçalho antes.
+    conferir: nova tentativa de um envio que falhou; linhas que já estão no fim da aba não vão de novo.
+    """
+    if df.empty: return 0
+    colunas = list(colunas or df.columns)
+    df = df.reindex(columns=colunas)
+
+    aba = obter_aba(conn, nome_aba)
+    if aba is None:
+        raise RuntimeError("A conexão atual não permite escrita incremental (use uma Service Account).")
+
+    cabecalho = _cabecalhos_conferidos.get(nome_aba)
+    if cabecalho is None:
+        cabecalho = aba.row_values(1)
+        if not cabecalho:
+            aba.append_rows([colunas], value_input_option="USER_ENTERED", table_range="A1")
+            cabecalho = colunas
+        _cabecalhos_conferidos[nome_aba] = cabecalho
+
+    # Respeita a ordem de colunas que já existe na planilha
+    if cabecalho != colunas:
+        df = df.reindex(columns=cabecalho + [c for c in colunas if c not in cabecalho])
+
+    linhas = _valores_para_envio(df)
+    if conferir:
+        repetidas = _ja_gravadas(aba, linhas, len(cabecalho))
+        linhas = [l for i, l in enumerate(linhas) if i not in repetidas]
+        if not linhas: return 0
+    aba.append_rows(linhas, value_input_option="USER_ENTERED", table_range="A1")
+    return len(linhas)
+
+
+def anexar_historico(conn, registros, conferir=False):
+    """Grava uma ou mais partidas no fim da aba Historico."""
+    df = pd.DataFrame(registros, columns=COLUNAS_HISTORICO)
+    return anexar_linhas(conn, "Historico", df, COLUNAS_HISTORICO, conferir)
+
+
+def esquecer_cabecalhos(nome_aba=None):
+    """Descarta o cache de cabeçalhos (de uma aba ou de todas): após regravar a aba inteira ou relê-la de fora."""
+    if nome_aba is None: _cabecalhos_conferidos.clear()
+    else: _cabecalhos_conferidos.pop(nome_aba, None)
+
+
+# --- GRAVAÇÃO POR LINHAS (DELTA) ---
+def letra_coluna(numero):
+    """1 -> A, 27 -> AA."""
+    letras = ""
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _agrupar_consecutivas(linhas):
+    """[2, 3, 4, 9] -> [(2, 4), (9, 9)]"""
+    blocos = []
+    for linha in sorted(linhas):
+        if blocos and linha == blocos[-1][1] + 1: blocos[-1][1] = linha
+        else: blocos.append([linha, linha])
+    return [tuple(b) for b in blocos]
+
+
+class SincronizadorJogadores:
+    """
+    Sabe em que linha da aba Jogadores está cada (Grupo, Nome) e quais chaves
+    mudaram desde a última leitura, para regravar só essas linhas.
+
+    Espera o DataFrame como lido da planilha: o índice original (antes do
+    `dropna`) corresponde à linha da planilha menos 2 (cabeçalho na linha 1).
+    """
+    def __init__(self, df, nome_aba="Jogadores"):
+        self.nome_aba = nome_aba
+        self.alteradas = set()
+        self.ultimo_envio = None
+        self._mapear(df, posicional=False)
+
+    def _mapear(self, df, posicional):
+        self.colunas = list(df.columns)
+        chaves = list(zip(df['Grupo'], df['Nome'])) if not df.empty else []
+        if posicional: linhas = range(2, len(df) + 2)
+        else: linhas = [int(i) + 2 for i in df.index] if pd.api.types.is_integer_dtype(df.index) else []
+        self.linha_por_chave = dict(zip(chaves, linhas))
+        # Ordem desconhecida: índice não numérico ou chaves repetidas na planilha
+        self.ordem_conhecida = len(self.linha_por_chave) == len(df) and len(linhas) == len(df)
+
+    def marcar(self, chaves):
+        """Registra chaves (Grupo, Nome) alteradas em memória."""
+        self.alteradas.update(chaves)
+
+    def invalidar(self):
+        """Força regravação completa na próxima escrita."""
+        self.ordem_conhecida = False
+
+    def enviar(self, conn, df):
+        """
+        Grava as alterações pendentes. Retorna um resumo com o modo usado e o
+        número de linhas/células enviadas (também guardado em `ultimo_envio`).
+        """
+        aba = obter_aba(conn, self.nome_aba) if self.ordem_conhecida else None
+        if aba is None or set(df.columns) != set(self.colunas):
+            return self._enviar_completo(conn, df)
+        df = df[self.colunas]  # mesma ordem de colunas da planilha
+
+        pendentes = list(self.alteradas)
+        if not pendentes:
+            self.ultimo_envio = {"modo": "nada", "linhas": 0, "celulas": 0, "intervalos": 0}
+            return self.ultimo_envio
+
+        linha_df = {k: i for i, k in enumerate(zip(df['Grupo'], df['Nome']))}
+        if any(chave not in linha_df for chave in pendentes):
+            return self._enviar_completo(conn, df)  # jogador removido: reescreve tudo
+        return self.enviar_linhas(aba, {chave: df.iloc[linha_df[chave]] for chave in pendentes})
+
+    def enviar_linhas(self, aba, linhas_por_chave):
+        """Regrava as linhas das chaves (Series por chave); chaves novas vão para o fim da aba."""
+        if not linhas_por_chave: return {"modo": "nada", "linhas": 0, "celulas": 0, "intervalos": 0}
+        proxima_livre = max(self.linha_por_chave.values(), default=1) + 1
+        valores_por_linha = {}
+        for chave, registro in linhas_por_chave.items():
+            linha = self.linha_por_chave.get(chave)
+            if linha is None:
+                linha = proxima_livre
+                proxima_livre += 1
+            valores_por_linha[linha] = _valores_para_envio(registro.reindex(self.colunas).to_frame().T)[0]
+            self.linha_por_chave[chave] = linha
+
+        ultima_col = letra_coluna(len(self.colunas))
+        blocos = [
+            {"range": f"A{ini}:{ultima_col}{fim}", "values": [valores_por_linha[l] for l in range(ini, fim + 1)]}
+            for ini, fim in _agrupar_consecutivas(valores_por_linha)
+        ]
+        aba.batch_update(blocos, value_input_option="USER_ENTERED")
+        self.alteradas.difference_update(linhas_por_chave)
+        self.ultimo_envio = {
+            "modo": "linhas", "linhas": len(valores_por_linha),
+            "celulas": len(valores_por_linha) * len(self.colunas), "intervalos": len(blocos)
+        }
+        return self.ultimo_envio
+
+    def ler_linhas(self, conn, chaves):
+        """
+        Valores atuais, na planilha, só das linhas das chaves pedidas (um batch_get).
+        Retorna None quando não dá para confiar no mapa de linhas: chave desconhecida,
+        cabeçalho diferente ou linha que mudou de lugar (alguém ordenou/apagou na planilha).
+        """
+        aba = obter_aba(conn, self.nome_aba) if self.ordem_conhecida else None
+        if aba is None or any(k not in self.linha_por_chave for k in chaves): return None
+        ultima_col = letra_coluna(len(self.colunas))
+        intervalos = _agrupar_consecutivas({self.linha_por_chave[k] for k in chaves})
+        blocos = aba.batch_get([f"A1:{ultima_col}1"] + [f"A{ini}:{ultima_col}{fim}" for ini, fim in intervalos],
+                               value_render_option="UNFORMATTED_VALUE")
+        if not blocos[0] or [str(c) for c in blocos[0][0]] != self.colunas: return None
+
+        valores = {}
+        for (ini, _), bloco in zip(intervalos, blocos[1:]):
+            for deslocamento, linha in enumerate(bloco): valores[ini + deslocamento] = list(linha)
+        registros = []
+        for chave in chaves:
+            linha = valores.get(self.linha_por_chave[chave], [])
+            registro = dict(zip(self.colunas, linha + [""] * (len(self.colunas) - len(linha))))
+            if (str(registro.get('Grupo')), str(registro.get('Nome'))) != (str(chave[0]), str(chave[1])): return None
+            registros.append(registro)
+        return pd.DataFrame(registros, columns=self.colunas)
+
+    def _enviar_completo(self, conn, df):
+        conn.update(worksheet=self.nome_aba, data=df)
+        esquecer_cabecalhos(self.nome_aba)  # a aba foi regravada inteira, cabeçalho incluído
+        self._mapear(df, posicional=True)
+        self.alteradas.clear()
+        self.ultimo_envio = {
+            "modo": "completo", "linhas": len(df),
+            "celulas": (len(df) + 1) * len(df.columns), "intervalos": 1
+        }
+        return self.ultimo_envio
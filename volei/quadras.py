@@ -0,0 +1,106 @@
+"""
+Várias quadras ao mesmo tempo a partir da mesma chamada.
+
+`dividir_quadras` forma os 2*N times de uma vez (partição em k partes):
+  * levantadores primeiro, cada um para o time com menos levantadores (e
+    menor soma de Elo); depois os demais, em ordem decrescente de Elo, para
+    o time incompleto de menor soma;
+  * trocas entre times (levantador por levantador, demais por demais)
+    enquanto reduzirem a soma dos quadrados dos desvios das médias: isso
+    aproxima todos os times da média geral, dentro e entre quadras;
+  * os times são pareados por média (vizinhos na mesma quadra) e cada quadra
+    é refinada por `equilibrar`, que só troca jogadores entre os dois times
+    dela (a média da quadra não muda).
+
+As rodadas de cada quadra seguem `volei.rotacao`, com a fila de espera
+compartilhada entre todas. Tudo aqui trabalha com nomes e um dict
+Nome -> Elo, sem Streamlit.
+"""
+import time
+
+from volei.equilibrio import equilibrar
+
+TEMPO_PADRAO = 0.25  # segundos
+
+
+def _media(elos, nomes):
+    return sum(elos[n] for n in nomes) / len(nomes) if nomes else 0.0
+
+
+# --- PARTIÇÃO EM K TIMES ---
+def _distribuir(ordenados, levantadores, n_times, tamanho_time):
+    """Divisão inicial gulosa: índices dos times de cada jogador e somas de Elo por time."""
+    times = [[] for _ in range(n_times)]
+    somas = [0.0] * n_times
+    levs = [0] * n_times
+    for nome, elo in ordenados:
+        if nome not in levantadores: continue
+        t = min(range(n_times), key=lambda i: (len(times[i]) >= tamanho_time, levs[i], somas[i]))
+        times[t].append(nome); somas[t] += elo; levs[t] += 1
+    for nome, elo in ordenados:
+        if nome in levantadores: continue
+        t = min((i for i in range(n_times) if len(times[i]) < tamanho_time), key=lambda i: somas[i])
+        times[t].append(nome); somas[t] += elo
+    return times, somas
+
+
+def _trocar(times, somas, elos, levantadores, prazo):
+    """Melhor troca entre dois times por passada, enquanto houver ganho (times do mesmo tamanho: soma ~ média)."""
+    while time.perf_counter() < prazo:
+        melhor, troca = -1e-9, None
+        for t in range(len(times)):
+            for u in range(t + 1, len(times)):
+                dif = somas[t] - somas[u]
+                if abs(dif) < 1e-9: continue
+                for i, a in enumerate(times[t]):
+                    lev_a = a in levantadores
+                    for j, b in enumerate(times[u]):
+                        if (b in levantadores) != lev_a: continue
+                        d = elos[b] - elos[a]
+                        # Variação de (S_t - m)² + (S_u - m)² ao trocar a <-> b
+                        ganho = 2 * d * dif + 2 * d * d
+                        if ganho < melhor: melhor, troca = ganho, (t, u, i, j, d)
+        if troca is None: return
+        t, u, i, j, d = troca
+        times[t][i], times[u][j] = times[u][j], times[t][i]
+        somas[t] += d; somas[u] -= d
+
+
+def dividir_quadras(pool, elos, levantadores, tamanho_time, n_quadras, tempo_limite=TEMPO_PADRAO):
+    """
+    pool: nomes em ordem de prioridade (quem está há mais tempo na fila primeiro).
+    Usa tantas quadras completas quanto couberem (até `n_quadras`); quem sobrar volta para a fila.
+
+    Retorna dict com 'quadras' (lista de dicts A/B), 'fila', 'diferencas' (entre os times de cada
+    quadra), 'amplitude' (maior - menor média entre todos os times) e 'tempo_ms'.
+    """
+    inicio = time.perf_counter()
+    pool = [n for n in pool if n in elos]
+    k = min(n_quadras, len(pool) // (2 * tamanho_time))
+    if k <= 0: return {"quadras": [], "fila": pool, "diferencas": [], "amplitude": 0.0, "tempo_ms": 0.0}
+    em_quadra, fila = pool[:2 * k * tamanho_time], pool[2 * k * tamanho_time:]
+    levantadores = set(levantadores) & set(em_quadra)
+
+    ordenados = sorted(((n, elos[n]) for n in em_quadra), key=lambda x: -x[1])
+    times, somas = _distribuir(ordenados, levantadores, 2 * k, tamanho_time)
+    _trocar(times, somas, elos, levantadores, inicio + tempo_limite / 2)
+
+    # Vizinhos em média jogam juntos; cada quadra ainda é refinada só entre os seus dois times
+    pares = sorted(range(2 * k), key=lambda t: somas[t])
+    prazo_quadra = max(tempo_limite / 2 - (time.perf_counter() - inicio), 0.005) / k
+    quadras, diferencas = [], []
+    for q in range(k):
+        nomes = times[pares[2 * q]] + times[pares[2 * q + 1]]
+        r = equilibrar([{"Nome": n, "Elo": elos[n]} for n in nomes], levantadores, tamanho_time,
+                       tempo_limite=prazo_quadra)
+        quadras.append({"A": r["A"], "B": r["B"]})
+        diferencas.append(r["diferenca"])
+
+    medias = [_media(elos, q[lado]) for q in quadras for lado in ("A", "B")]
+    return {
+        "quadras": quadras,
+        "fila": fila,
+        "diferencas": diferencas,
+        "amplitude": max(medias) - min(medias),
+        "tempo_ms": (time.perf_counter() - inicio) * 1000,
+    }
@@ -0,0 +1,155 @@
+"""
+Medição de tempos por execução do script (cada rerun do Streamlit).
+
+`Rastreador.trecho(nome)` mede um bloco e guarda duração, linhas e células
+movidas. As medições feitas na thread do script entram na execução atual;
+as das threads de fundo (fila de escrita, sincronização) vão para
+`segundo_plano`. Cada execução finalizada pode ser anexada a um log JSONL.
+
+`ConexaoRastreada` embrulha a conexão (GSheetsConnection ou ConexaoLocal)
+e mede `read`, `update` e as operações de aba do gspread.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class Rastreador:
+    def __init__(self, arquivo_log=None, max_segundo_plano=200):
+        self.arquivo_log = arquivo_log
+        self.segundo_plano = deque(maxlen=max_segundo_plano)
+        self._local = threading.local()
+        self._lock_log = threading.Lock()
+
+    # --- EXECUÇÕES ---
+    def iniciar_execucao(self, rotulo=""):
+        """Abre a execução da thread atual e a devolve (guarde para finalizar depois)."""
+        agora = time.perf_counter()
+        execucao = {"inicio": time.time(), "rotulo": rotulo, "_t0": agora, "_fim": agora, "etapas": []}
+        self._local.execucao = execucao
+        return execucao
+
+    def atual(self):
+        """Execução aberta na thread atual (None num rerun só de fragmento, que não passa pelo topo do script)."""
+        return getattr(self._local, "execucao", None)
+
+    def finalizar_execucao(self, execucao, interrompida=False):
+        """
+        Fecha a execução (só na primeira chamada) e grava no log.
+        interrompida=True: o script parou antes do fim (st.rerun/st.stop); o total vai até a última medição.
+        """
+        if execucao is None or "total_ms" in execucao: return execucao
+        fim = execucao["_fim"] if interrompida else time.perf_counter()
+        execucao["total_ms"] = round((fim - execucao["_t0"]) * 1000, 2)
+        execucao["interrompida"] = interrompida
+        if getattr(self._local, "execucao", None) is execucao: self._local.execucao = None
+        self._gravar_log(execucao)
+        return execucao
+
+    @contextmanager
+    def trecho(self, nome, **dados):
+        """Mede o bloco. O dict entregue pode receber `linhas`/`celulas` durante o bloco."""
+        etapa = {"nome": nome, **dados}
+        execucao = getattr(self._local, "execucao", None)
+        inicio = time.perf_counter()
+        if execucao is not None: etapa["em_ms"] = round((inicio - execucao["_t0"]) * 1000, 2)
+        try:
+            yield etapa
+        finally:
+            fim = time.perf_counter()
+            etapa["ms"] = round((fim - inicio) * 1000, 3)
+            if execucao is not None:
+                execucao["etapas"].append(etapa)
+                execucao["_fim"] = fim
+            else:
+                etapa["quando"] = time.time()
+                self.segundo_plano.append(etapa)
+
+    # --- LOG ---
+    def _gravar_log(self, execucao):
+        if not self.arquivo_log: return
+        registro = {k: v for k, v in execucao.items() if not k.startswith("_")}
+        try:
+            with self._lock_log, open(self.arquivo_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            print(f"Erro ao gravar log de desempenho: {e}")
+
+
+def resumir(etapas):
+    """Uma linha por nome de etapa: chamadas, tempo total/máximo, linhas e células."""
+    if not etapas: return pd.DataFrame(columns=["Etapa", "Chamadas", "Total (ms)", "Máx (ms)", "Linhas", "Células"])
+    df = pd.DataFrame(etapas).reindex(columns=["nome", "ms", "linhas", "celulas"])
+    resumo = df.groupby("nome", sort=False).agg(
+        Chamadas=("ms", "size"), Total=("ms", "sum"), Maximo=("ms", "max"),
+        Linhas=("linhas", lambda s: s.sum(min_count=1)), Celulas=("celulas", lambda s: s.sum(min_count=1)),
+    ).reset_index()
+    resumo.columns = ["Etapa", "Chamadas", "Total (ms)", "Máx (ms)", "Linhas", "Células"]
+    return resumo.sort_values("Total (ms)", ascending=False).round(1).reset_index(drop=True)
+
+
+# --- CONEXÃO RASTREADA ---
+def _tamanho(df):
+    return {"linhas": len(df), "celulas": int(df.size)} if isinstance(df, pd.DataFrame) else {}
+
+
+def _linhas_enviadas(metodo, args, kwargs):
+    """Linhas/células de uma chamada de aba do gspread, a partir dos argumentos."""
+    if metodo == "append_rows":
+        valores = args[0] if args else kwargs.get("values", [])
+    elif metodo == "batch_update":
+        valores = [l for bloco in (args[0] if args else kwargs.get("data", [])) for l in bloco.get("values", [])]
+    else:
+        return {}
+    return {"linhas": len(valores), "celulas": sum(len(l) for l in valores)}
+
+
+class _AbaRastreada:
+    _MEDIDAS = ("get_all_values", "row_values", "append_rows", "batch_update", "batch_get", "clear")
+
+    def __init__(self, aba, rastreador):
+        self._aba = aba
+        self._rastreador = rastreador
+
+    def __getattr__(self, nome):
+        alvo = getattr(self._aba, nome)
+        if nome not in self._MEDIDAS: return alvo
+
+        def medido(*args, **kwargs):
+            with self._rastreador.trecho(f"aba.{nome} {getattr(self._aba, 'title', '')}".strip(),
+                                         **_linhas_enviadas(nome, args, kwargs)) as etapa:
+                resultado = alvo(*args, **kwargs)
+                if nome in ("batch_get", "get_all_values", "row_values") and resultado is not None:
+                    linhas = {"batch_get": lambda: [l for bloco in resultado for l in bloco],
+                              "row_values": lambda: [resultado]}.get(nome, lambda: resultado)()
+                    etapa.update(linhas=len(linhas), celulas=sum(len(l) for l in linhas))
+                return resultado
+        return medido
+
+
+class ConexaoRastreada:
+    def __init__(self, conn, rastreador):
+        self._conn = conn
+        self._rastreador = rastreador
+
+    def read(self, worksheet=None, **kwargs):
+        with self._rastreador.trecho(f"conn.read {worksheet}") as etapa:
+            df = self._conn.read(worksheet=worksheet, **kwargs)
+            etapa.update(_tamanho(df))
+            return df
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        with self._rastreador.trecho(f"conn.update {worksheet}", **_tamanho(data)):
+            return self._conn.update(worksheet=worksheet, data=data, **kwargs)
+
+    def aba(self, nome):
+        abrir = getattr(self._conn, "aba", None)
+        aba = abrir(nome) if abrir else None
+        return None if aba is None else _AbaRastreada(aba, self._rastreador)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
@@ -0,0 +1,276 @@
+"""
+Motores de rating com a mesma interface: Elo (padrão) e Glicko-2.
+
+Um motor trabalha sobre arrays por jogador: 'r' (rating na escala do Elo,
+que é o valor gravado na coluna Elo) e as colunas de `extras` (no Glicko-2,
+'RD' = incerteza e 'Vol' = volatilidade, guardadas à parte por grupo).
+Partidas são matrizes de índices, uma linha por partida e -1 completando
+times menores.
+
+* `onda` atualiza de uma vez, vetorizado, partidas sem jogadores em comum;
+* `lote` divide uma sequência de partidas em ondas: cada partida vai para a
+  onda seguinte à última de qualquer um dos seus jogadores. O resultado é o
+  mesmo de aplicar as partidas uma a uma, na ordem, e partidas de outros
+  grupos (ou de outras quadras na mesma noite) são processadas juntas;
+* a partida ao vivo do app (`aplicar_partida`) é uma onda de uma partida só.
+
+Times: como no Elo do app, a expectativa sai da média dos times. No Glicko-2
+cada jogador é atualizado contra o time adversário como um oponente só
+(média de μ e φ quadrático médio), com a própria incerteza: quem tem RD alto
+(novato, pouco jogo) anda mais rápido que quem é assíduo. Cada partida é um
+período de rating para os seus jogadores.
+"""
+import threading
+
+import numpy as np
+
+from volei.elo import K_FACTOR, ReplayElo
+
+ESCALA_GLICKO = 173.7178
+RD_INICIAL = 350.0
+VOL_INICIAL = 0.06
+
+
+def _media(valores, times):
+    """Média de `valores` em cada linha de `times` (índices, -1 = vaga vazia)."""
+    validos = times >= 0
+    soma = np.where(validos, valores[np.maximum(times, 0)], 0.0).sum(axis=1)
+    return soma / np.maximum(validos.sum(axis=1), 1)
+
+
+def _por_jogador(times, por_partida):
+    """(índices dos jogadores, valor da partida de cada um) achatados, sem as vagas vazias."""
+    validos = times >= 0
+    return times[validos], np.broadcast_to(np.asarray(por_partida)[:, None], times.shape)[validos]
+
+
+# --- ELO ---
+class MotorElo:
+    nome = "elo"
+    extras = ()
+
+    def __init__(self, k=K_FACTOR):
+        self.k = k
+
+    def iniciais(self, partidas=0):
+        return []
+
+    def prever(self, jog, V, P):
+        """Probabilidade de vitória do time V em cada partida."""
+        return 1 / (1 + 10 ** ((_media(jog['r'], P) - _media(jog['r'], V)) / 400))
+
+    def onda(self, jog, V, P):
+        """Aplica partidas sem jogadores em comum (V vence P). Retorna a previsão de vitória de V, antes delas."""
+        e = self.prever(jog, V, P)
+        delta = self.k * (1 - e)
+        for times, sinal in ((V, 1), (P, -1)):
+            idx, d = _por_jogador(times, sinal * delta)
+            np.add.at(jog['r'], idx, d)
+        return e
+
+
+# --- GLICKO-2 ---
+def _volatilidade(phi2, sigma, v, delta, tau, eps=1e-6, max_iter=100):
+    """Passo 5 do Glicko-2 (Illinois), vetorizado: nova volatilidade de cada jogador."""
+    a = np.log(sigma ** 2)
+    d2 = delta ** 2
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (d2 - phi2 - v - ex) / (2 * (phi2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a.copy()
+    acima = d2 > phi2 + v
+    B = np.where(acima, np.log(np.where(acima, d2 - phi2 - v, 1.0)), a - tau)
+    falta = ~acima & (f(B) < 0)
+    for _ in range(max_iter):
+        if not falta.any(): break
+        B = np.where(falta, B - tau, B)
+        falta &= f(B) < 0
+    fA, fB = f(A), f(B)
+    for _ in range(max_iter):
+        ativo = np.abs(B - A) > eps
+        if not ativo.any(): break
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        troca = ativo & (fC * fB <= 0)
+        A, fA = np.where(troca, B, A), np.where(troca, fB, np.where(ativo, fA / 2, fA))
+        B, fB = np.where(ativo, C, B), np.where(ativo, fC, fB)
+    return np.exp(A / 2)
+
+
+def _g(phi2):
+    return 1 / np.sqrt(1 + 3 * phi2 / np.pi ** 2)
+
+
+class MotorGlicko2:
+    nome = "glicko2"
+    extras = ("RD", "Vol")
+
+    def __init__(self, tau=0.5):
+        self.tau = tau
+
+    def iniciais(self, partidas=0):
+        """
+        [RD, Vol] de quem ainda não tem: o RD cai com as partidas já jogadas (cada jogo equilibrado soma 1/4
+        à precisão 1/φ²) até o ponto em que a volatilidade repõe o que cada jogo tira.
+        """
+        s2 = VOL_INICIAL ** 2
+        piso = (np.sqrt(s2 ** 2 + 16 * s2) - s2) / 2
+        phi2 = 1 / ((ESCALA_GLICKO / RD_INICIAL) ** 2 + partidas / 4)
+        return [float(np.sqrt(max(phi2, piso)) * ESCALA_GLICKO), VOL_INICIAL]
+
+    def prever(self, jog, V, P):
+        mu, phi2 = (jog['r'] - 1500) / ESCALA_GLICKO, (jog['RD'] / ESCALA_GLICKO) ** 2
+        dif = _media(mu, V) - _media(mu, P)
+        return 1 / (1 + np.exp(-_g(_media(phi2, V) + _media(phi2, P)) * dif))
+
+    def onda(self, jog, V, P):
+        e_v = self.prever(jog, V, P)
+        mu, phi2 = (jog['r'] - 1500) / ESCALA_GLICKO, (jog['RD'] / ESCALA_GLICKO) ** 2
+        mu_v, mu_p = _media(mu, V), _media(mu, P)
+        phi2_v, phi2_p = _media(phi2, V), _media(phi2, P)
+        novos = []
+        for time_, s, dif, phi2_outro in ((V, 1.0, mu_v - mu_p, phi2_p), (P, 0.0, mu_p - mu_v, phi2_v)):
+            g = _g(phi2_outro)
+            idx, g_j = _por_jogador(time_, g)
+            _, e_j = _por_jogador(time_, 1 / (1 + np.exp(-g * dif)))
+            v = 1 / (g_j ** 2 * e_j * (1 - e_j))
+            sigma = _volatilidade(phi2[idx], jog['Vol'][idx], v, v * g_j * (s - e_j), self.tau)
+            phi2_novo = 1 / (1 / (phi2[idx] + sigma ** 2) + 1 / v)
+            novos.append((idx, mu[idx] + phi2_novo * g_j * (s - e_j), phi2_novo, sigma))
+        # Os dois times são atualizados a partir dos valores de antes da partida
+        for idx, mu_novo, phi2_novo, sigma in novos:
+            jog['r'][idx] = mu_novo * ESCALA_GLICKO + 1500
+            jog['RD'][idx] = np.sqrt(phi2_novo) * ESCALA_GLICKO
+            jog['Vol'][idx] = sigma
+        return e_v
+
+
+MOTORES_RATING = {"elo": MotorElo, "glicko2": MotorGlicko2}
+
+
+def criar_motor(nome, **parametros):
+    return MOTORES_RATING.get(nome, MotorElo)(**parametros)
+
+
+# --- LOTES ---
+def ondas(partidas, n_jogadores):
+    """
+    Número da onda de cada partida (0, 1, ...): uma depois da última onda de qualquer jogador dela.
+    partidas: sequências com os índices de todos os jogadores de cada partida.
+    """
+    ultima = [-1] * n_jogadores
+    resultado = np.empty(len(partidas), dtype=np.int64)
+    for i, ids in enumerate(partidas):
+        w = max([ultima[j] for j in ids], default=-1) + 1
+        for j in ids: ultima[j] = w
+        resultado[i] = w
+    return resultado
+
+
+def lote(motor, jog, V, P, numero=None):
+    """
+    Aplica as partidas (em ordem) com um `onda` por conjunto de partidas independentes.
+    numero: ondas já calculadas (ver `ondas`). Retorna a previsão de vitória do vencedor em cada partida.
+    """
+    previsoes = np.empty(len(V))
+    if not len(V): return previsoes
+    if numero is None:
+        numero = ondas([[j for j in linha if j >= 0] for linha in np.hstack([V, P]).tolist()], len(jog['r']))
+    ordem = np.argsort(numero, kind='stable')
+    cortes = np.flatnonzero(np.diff(numero[ordem])) + 1
+    for partidas in np.split(ordem, cortes):
+        previsoes[partidas] = motor.onda(jog, V[partidas], P[partidas])
+    return previsoes
+
+
+def matriz_times(times):
+    """Lista de tuplas de índices -> matriz (partidas x maior time) com -1 nas vagas vazias."""
+    tamanhos = np.fromiter(map(len, times), dtype=np.int64, count=len(times))
+    largura = max(int(tamanhos.max(initial=0)), 1)
+    matriz = np.full((len(times), largura), -1, dtype=np.int64)
+    matriz[np.arange(largura) < tamanhos[:, None]] = np.fromiter(
+        (j for t in times for j in t), dtype=np.int64, count=int(tamanhos.sum()))
+    return matriz
+
+
+def aplicar_partida(motor, ratings, extras, vencedores, perdedores, partidas=None):
+    """
+    Partida ao vivo. ratings: dict Nome -> Elo; extras: dict Nome -> [valores de motor.extras]
+    (atualizado no lugar); partidas: dict Nome -> partidas já jogadas, para quem ainda não tem extras.
+    Retorna dict Nome -> variação do rating.
+    """
+    nomes = list(vencedores) + list(perdedores)
+    partidas = partidas or {}
+    jog = {'r': np.array([ratings[n] for n in nomes], dtype=float)}
+    valores = [extras[n] if n in extras else motor.iniciais(partidas.get(n, 0)) for n in nomes]
+    for i, coluna in enumerate(motor.extras):
+        jog[coluna] = np.array([v[i] for v in valores], dtype=float)
+    V = np.arange(len(vencedores))[None, :]
+    P = np.arange(len(vencedores), len(nomes))[None, :]
+    motor.onda(jog, V, P)
+    for k, n in enumerate(nomes):
+        if motor.extras: extras[n] = [float(jog[c][k]) for c in motor.extras]
+    return {n: float(jog['r'][k]) - ratings[n] for k, n in enumerate(nomes)}
+
+
+class ReplayLote(ReplayElo):
+    """ReplayElo com qualquer motor, em lote (o histórico todo de uma vez)."""
+
+    def __init__(self, df_historico, motor, elo_inicial=None):
+        super().__init__(df_historico, elo_inicial=elo_inicial)
+        self.motor = motor
+        self.extras = {}
+        self.previsoes = None
+
+    def executar(self, a_partir_de=0):
+        n = len(self.nomes)
+        jog = {'r': np.array(self.iniciais, dtype=float)}
+        for coluna, inicial in zip(self.motor.extras, self.motor.iniciais()): jog[coluna] = np.full(n, inicial)
+        ativas = [i for i, a in enumerate(self.ativa) if a]
+        vencedores = [self.vencedores[i] for i in ativas]
+        perdedores = [self.perdedores[i] for i in ativas]
+        numero = ondas([v + p for v, p in zip(vencedores, perdedores)], n)
+        self.previsoes = lote(self.motor, jog, matriz_times(vencedores), matriz_times(perdedores), numero)
+        self.ratings = jog['r'].tolist()
+        self.extras = {c: jog[c] for c in self.motor.extras}
+        return self.ratings
+
+    def resultado(self):
+        df = super().resultado()
+        for coluna, valores in self.extras.items(): df[coluna] = valores
+        return df
+
+
+# --- ESTADO POR GRUPO ---
+class IncertezasRating:
+    """
+    Colunas extras dos motores (ex.: RD/Vol do Glicko-2) por grupo, salvas em rating_<grupo>.json.
+    Quem altera os dicts segura `lock` e chama `salvar` depois de soltá-lo (a gravação também o usa).
+    """
+
+    def __init__(self, armazem):
+        self._armazem = armazem
+        self._grupos = {}
+        self.lock = threading.Lock()
+
+    def do_grupo(self, grupo):
+        """dict Nome -> [valores]; vazio para quem ainda não tem (entra com os valores iniciais do motor)."""
+        extras = self._grupos.get(grupo)
+        if extras is None:
+            dados, _ = self._armazem.carregar(grupo)
+            with self.lock: extras = self._grupos.setdefault(grupo, dict(dados or {}))
+        return extras
+
+    def salvar(self, grupo):
+        extras = self.do_grupo(grupo)
+
+        def copiar():
+            with self.lock: return dict(extras)
+
+        self._armazem.salvar(grupo, copiar, 0, forcar=True)
+
+    def definir(self, grupo, extras):
+        with self.lock: self._grupos[grupo] = dict(extras)
+        self.salvar(grupo)
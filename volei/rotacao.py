@@ -0,0 +1,91 @@
+"""
+Regras de rotação de uma quadra: quem joga, quem espera e o "rei da quadra".
+
+Funções puras sobre o estado de uma quadra (ver `nova_quadra`), a fila de
+espera (lista de nomes, primeiro = próximo a entrar) e um dict Nome -> Elo.
+Servem à quadra única e a cada quadra do modo de várias quadras do app, e
+ao simulador (`volei.simulacao`), que roda as mesmas regras em lote.
+
+  * vencedores ficam em quadra (time A) e a fila completa os times;
+  * ao atingir `limite` vitórias seguidas os vencedores são separados entre
+    os dois times e tudo é sorteado de novo;
+  * perdedores vão para o fim da fila.
+"""
+import random
+
+from volei.equilibrio import equilibrar
+
+
+def nova_quadra():
+    """Estado de uma quadra: times em jogo (None entre partidas), sequência do rei da quadra e nº de jogos."""
+    return {"A": None, "B": None, "streak": 0, "vencedores": None, "ultimos_times": None, "jogos": 0}
+
+
+def limite_atingido(quadra, disponiveis, limite):
+    """True se a próxima rodada vai separar os vencedores (limite de vitórias seguidas)."""
+    return quadra.get("streak", 0) >= limite and any(p in disponiveis for p in quadra.get("vencedores") or [])
+
+
+def proxima_rodada(quadra, fila, disponiveis, elos, levantadores, tamanho_time, limite, motor="auto",
+                   embaralhar=random.shuffle):
+    """
+    Monta a próxima partida da quadra.
+    disponiveis: presentes que podem entrar (no modo de várias quadras, sem quem está nas outras).
+    Retorna (quadra, fila, sorteio) com sorteio = resultado de `equilibrar` ou None (vencedores mantidos).
+    """
+    quadra = dict(quadra)
+    presentes = set(disponiveis)
+    vencedores = [p for p in quadra.get("vencedores") or [] if p in presentes][:tamanho_time]
+    candidatos = presentes.difference(vencedores)
+    fila_real = [p for p in fila if p in candidatos and p in elos]
+    na_fila = set(fila_real)
+    resto = [p for p in disponiveis if p in candidatos and p not in na_fila and p in elos]
+    embaralhar(resto)
+    pool = fila_real + resto
+    fila_fora = [p for p in fila if p not in candidatos]  # em jogo noutra quadra ou ausentes: ficam como estão
+
+    def sortear(nomes, fixos_a=None, fixos_b=None):
+        return equilibrar([{"Nome": n, "Elo": elos[n]} for n in nomes], levantadores, tamanho_time,
+                          fixos_a=fixos_a, fixos_b=fixos_b, evitar=quadra.get("ultimos_times"), motor=motor)
+
+    if quadra.get("streak", 0) >= limite and vencedores:
+        # Limite atingido: os vencedores são separados e completados pela fila
+        embaralhar(vencedores)
+        vagas = 2 * tamanho_time - len(vencedores)
+        entram, pool = pool[:vagas], pool[vagas:]
+        sorteio = sortear(vencedores + entram, vencedores[::2], vencedores[1::2])
+        quadra.update(streak=0, vencedores=None)
+    else:
+        time_a = list(vencedores)
+        vagas_a = tamanho_time - len(time_a)
+        time_a += pool[:vagas_a]
+        pool = pool[vagas_a:]
+        time_b, pool = pool[:tamanho_time], pool[tamanho_time:]
+        if vencedores and quadra.get("streak", 0) > 0:
+            sorteio = None
+            quadra.update(A=time_a, B=time_b)
+        else:
+            sorteio = sortear(time_a + time_b)
+    if sorteio is not None: quadra.update(A=sorteio["A"], B=sorteio["B"])
+    return quadra, pool + fila_fora, sorteio
+
+
+def registrar_vitoria(quadra, lado, fila):
+    """Encerra a partida da quadra com vitória de `lado` ('A'/'B'). Retorna (quadra, fila) com os perdedores no fim da fila."""
+    quadra = dict(quadra)
+    venc, perd = list(quadra[lado]), list(quadra["B" if lado == "A" else "A"])
+    anteriores = quadra.get("vencedores")
+    if anteriores and set(venc) == set(anteriores): quadra["streak"] = quadra.get("streak", 0) + 1
+    else: quadra.update(streak=1, vencedores=venc)
+    quadra.update(A=None, B=None, ultimos_times=[venc, perd], jogos=quadra.get("jogos", 0) + 1)
+    perdedores = set(perd)
+    return quadra, [p for p in fila if p not in perdedores] + perd
+
+
+def substituir(quadra, lado, saindo, fila):
+    """Troca `saindo` pelo primeiro da fila; quem sai vai para o fim. Retorna (quadra, fila, entrando) ou None se a fila está vazia."""
+    if not fila: return None
+    entrando, fila = fila[0], fila[1:] + [saindo]
+    quadra = dict(quadra)
+    quadra[lado] = [entrando if n == saindo else n for n in quadra[lado]]
+    return quadra, fila, entrando
@@ -0,0 +1,95 @@
+"""
+Simulador de noites de jogo com as regras de `volei.rotacao`.
+
+Cada noite tem `presentes` jogadores com força "verdadeira" sorteada (normal
+em torno de 1200) e Elo inicial igual à força, jogando `partidas` rodadas
+seguidas numa quadra. O vencedor de cada partida é sorteado com a
+probabilidade do Elo (`expectativa`) entre as forças médias dos times, e o
+Elo é atualizado como no app (delta da média do time para todos). Por
+jogador: jogos na noite, maior sequência de rodadas esperando e deriva do
+Elo (final - inicial, isto é, quanto o rating se afastou da força real).
+
+`simular` roda várias noites de uma regra e resume as distribuições;
+`comparar_regras` faz isso para uma grade de tamanhos de time x limites.
+"""
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from volei.elo import K_FACTOR, expectativa
+from volei.rotacao import nova_quadra, proxima_rodada, registrar_vitoria
+
+
+def simular_noite(forcas, tamanho_time, limite, partidas, levantadores=(), motor="guloso", rng=None, k=K_FACTOR):
+    """forcas: força de cada jogador (o índice é o nome). Retorna arrays (jogos, espera_max, deriva) por jogador."""
+    rng = rng or random.Random()
+    n = len(forcas)
+    jogadores = list(range(n))
+    elos = dict(enumerate(float(f) for f in forcas))
+    jogos = [0] * n
+    espera = [0] * n
+    espera_max = [0] * n
+    quadra, fila = nova_quadra(), []
+    for _ in range(partidas):
+        quadra, fila, _ = proxima_rodada(quadra, fila, jogadores, elos, levantadores, tamanho_time, limite,
+                                         motor=motor, embaralhar=rng.shuffle)
+        time_a, time_b = quadra['A'], quadra['B']
+        em_quadra = set(time_a) | set(time_b)
+        for j in jogadores:
+            if j in em_quadra:
+                jogos[j] += 1
+                espera[j] = 0
+            else:
+                espera[j] += 1
+                if espera[j] > espera_max[j]: espera_max[j] = espera[j]
+        forca_a = sum(forcas[j] for j in time_a) / len(time_a)
+        forca_b = sum(forcas[j] for j in time_b) / len(time_b)
+        lado = "A" if rng.random() < expectativa(forca_a, forca_b) else "B"
+        venc, perd = (time_a, time_b) if lado == "A" else (time_b, time_a)
+        mv = sum(elos[j] for j in venc) / len(venc)
+        mp = sum(elos[j] for j in perd) / len(perd)
+        delta = k * (1 - expectativa(mv, mp))
+        for j in venc: elos[j] += delta
+        for j in perd: elos[j] -= delta
+        quadra, fila = registrar_vitoria(quadra, lado, fila)
+    deriva = [elos[j] - forcas[j] for j in jogadores]
+    return np.array(jogos), np.array(espera_max), np.array(deriva)
+
+
+def simular(tamanho_time, limite, noites=1000, presentes=None, partidas=20, levantadores=0, motor="guloso",
+            desvio_forca=150.0, seed=0):
+    """
+    Roda `noites` noites independentes de uma regra e resume as distribuições.
+    presentes: jogadores por noite (padrão: dois times em quadra e um e meio esperando).
+    levantadores: quantos dos presentes são levantadores.
+    """
+    presentes = presentes or 2 * tamanho_time + (3 * tamanho_time + 1) // 2
+    rng = random.Random(seed)
+    jogos, esperas, derivas, topo = [], [], [], []
+    inicio = time.perf_counter()
+    for _ in range(noites):
+        forcas = [rng.gauss(1200, desvio_forca) for _ in range(presentes)]
+        j, e, d = simular_noite(forcas, tamanho_time, limite, partidas, range(levantadores), motor, rng)
+        jogos.append(j); esperas.append(e); derivas.append(d)
+        topo.append(d[np.argsort(forcas)[-max(1, presentes // 4):]].mean())  # deriva dos 25% mais fortes
+    segundos = time.perf_counter() - inicio
+    jogos, esperas, derivas = np.array(jogos), np.array(esperas), np.array(derivas)
+    return {
+        "Tamanho": tamanho_time, "Limite": limite, "Presentes": presentes, "Noites": noites,
+        "Jogos (média)": jogos.mean(),
+        "Jogos (desvio)": jogos.std(axis=1).mean(),        # desigualdade dentro da noite
+        "Jogos (mín)": jogos.min(axis=1).mean(),
+        "Espera máx (média)": esperas.max(axis=1).mean(),
+        "Espera máx (p95)": np.percentile(esperas.max(axis=1), 95),
+        "Deriva |Elo| (média)": np.abs(derivas).mean(),
+        "Deriva |Elo| (p95)": np.percentile(np.abs(derivas), 95),
+        "Deriva Elo (25% fortes)": float(np.mean(topo)),
+        "Noites/s": noites / segundos if segundos else float("inf"),
+    }
+
+
+def comparar_regras(tamanhos=range(2, 7), limites=range(2, 7), **kwargs):
+    """Uma linha de `simular` por combinação de tamanho de time e limite de vitórias."""
+    return pd.DataFrame([simular(t, l, **kwargs) for t in tamanhos for l in limites])
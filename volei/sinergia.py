@@ -0,0 +1,180 @@
+"""
+Parcerias e confrontos de cada grupo: matrizes esparsas jogador x jogador.
+
+* parceiros[a][b]:   [jogos juntos, vitórias juntos, saldo de Elo juntos]
+  (a mesma lista fica em [a][b] e em [b][a]);
+* adversarios[a][b]: [jogos contra, vitórias de a, saldo de Elo de a]
+  ([b][a] guarda o mesmo confronto visto por b).
+
+Só existem entradas para pares que já se encontraram, e a consulta de um
+jogador lê só a linha dele (não depende do tamanho do elenco). Partidas
+gravadas pelo app entram com `registrar`: t*(t-1)/2 parcerias por time e t²
+confrontos por partida. O histórico inteiro só é varrido em `reconstruir`,
+a pedido. Cada grupo é salvo em sinergia_<grupo>.json pelo ArmazemEstado.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def _tabela(linhas, coluna_par):
+    df = pd.DataFrame(linhas, columns=["Jogador", coluna_par, "Jogos", "Vitorias", "Saldo_Elo"])
+    df.insert(4, "Aproveitamento", (df["Vitorias"] / df["Jogos"]).round(3))
+    df["Saldo_Elo"] = df["Saldo_Elo"].round(1)
+    return df
+
+
+class SinergiaGrupo:
+    def __init__(self, partidas=0):
+        self.partidas = partidas  # partidas já somadas (para comparar com o histórico)
+        self.parceiros = {}
+        self.adversarios = {}
+        self.lock = threading.Lock()
+
+    # --- ATUALIZAÇÃO ---
+    def _parceria(self, a, b):
+        linha = self.parceiros.setdefault(a, {}).get(b)
+        if linha is None:
+            linha = self.parceiros[a][b] = [0, 0, 0.0]
+            self.parceiros.setdefault(b, {})[a] = linha
+        return linha
+
+    def _confronto(self, a, b):
+        return self.adversarios.setdefault(a, {}).setdefault(b, [0, 0, 0.0])
+
+    def _somar(self, vencedores, perdedores, pontos):
+        for time_, venceu, saldo in ((vencedores, 1, pontos), (perdedores, 0, -pontos)):
+            for i, a in enumerate(time_):
+                for b in time_[i + 1:]:
+                    linha = self._parceria(a, b)
+                    linha[0] += 1; linha[1] += venceu; linha[2] += saldo
+        for a in vencedores:
+            for b in perdedores:
+                va, vb = self._confronto(a, b), self._confronto(b, a)
+                va[0] += 1; va[1] += 1; va[2] += pontos
+                vb[0] += 1; vb[2] -= pontos
+        self.partidas += 1
+
+    def registrar(self, vencedores, perdedores, pontos):
+        """Soma uma partida (nomes dos dois times e os pontos de Elo, positivos)."""
+        with self.lock: self._somar(list(vencedores), list(perdedores), float(pontos))
+
+    @classmethod
+    def de_historico(cls, partidas, participacoes):
+        """Monta do zero a partir das tabelas do IndiceHistorico (já filtradas pelo grupo)."""
+        validas = partidas[partidas['Lado_vencedor'].notna()]
+        sinergia = cls(len(validas))
+        linhas = participacoes[['Jogador', 'Lado', 'Venceu']].join(validas[['Pontos']], how='inner').reset_index()
+        linhas = linhas.drop_duplicates(['match_id', 'Jogador'])
+        if linhas.empty: return sinergia
+        pares = linhas.merge(linhas, on='match_id', suffixes=('', '_b'))
+        pares = pares[pares['Jogador'] < pares['Jogador_b']]
+        venceu = pares['Venceu'].astype(bool).to_numpy()
+        pares = pares.assign(Venceu=venceu, Saldo=np.where(venceu, pares['Pontos'], -pares['Pontos']))
+        juntos = pares['Lado'] == pares['Lado_b']
+        for filtro, definir in ((juntos, sinergia._definir_parceria), (~juntos, sinergia._definir_confronto)):
+            soma = pares[filtro].groupby(['Jogador', 'Jogador_b'], sort=False).agg(
+                Jogos=('Venceu', 'size'), Vitorias=('Venceu', 'sum'), Saldo=('Saldo', 'sum'))
+            for (a, b), j, v, s in zip(soma.index, soma['Jogos'].tolist(), soma['Vitorias'].tolist(), soma['Saldo'].tolist()):
+                definir(a, b, j, v, s)
+        return sinergia
+
+    def _definir_parceria(self, a, b, jogos, vitorias, saldo):
+        linha = self._parceria(a, b)
+        linha[:] = [int(jogos), int(vitorias), float(saldo)]
+
+    def _definir_confronto(self, a, b, jogos, vitorias, saldo):
+        """Confronto visto por a; o lado de b é o complemento."""
+        self._confronto(a, b)[:] = [int(jogos), int(vitorias), float(saldo)]
+        self._confronto(b, a)[:] = [int(jogos), int(jogos) - int(vitorias), -float(saldo)]
+
+    # --- PERSISTÊNCIA ---
+    def serializar(self):
+        """Dict JSON com cada par uma vez só (a < b)."""
+        with self.lock:
+            return {
+                "partidas": self.partidas,
+                "parceiros": [[a, b] + l[:2] + [round(l[2], 2)] for a, linha in self.parceiros.items()
+                              for b, l in linha.items() if a < b],
+                "adversarios": [[a, b] + l[:2] + [round(l[2], 2)] for a, linha in self.adversarios.items()
+                                for b, l in linha.items() if a < b],
+            }
+
+    @classmethod
+    def de_dict(cls, dados):
+        sinergia = cls(dados.get("partidas", 0))
+        for a, b, j, v, s in dados.get("parceiros", []): sinergia._definir_parceria(a, b, j, v, s)
+        for a, b, j, v, s in dados.get("adversarios", []): sinergia._definir_confronto(a, b, j, v, s)
+        return sinergia
+
+    # --- CONSULTAS ---
+    def parceria(self, a, b):
+        """(jogos, vitórias, saldo) de a e b no mesmo time."""
+        return tuple(self.parceiros.get(a, {}).get(b, (0, 0, 0.0)))
+
+    def confronto(self, a, b):
+        """(jogos, vitórias de a, saldo de a) de a contra b."""
+        return tuple(self.adversarios.get(a, {}).get(b, (0, 0, 0.0)))
+
+    def parceiros_de(self, nome, min_jogos=1):
+        with self.lock:
+            linhas = [[nome, b] + l for b, l in self.parceiros.get(nome, {}).items() if l[0] >= min_jogos]
+        return _tabela(linhas, "Parceiro").sort_values(["Saldo_Elo", "Jogos"], ascending=False, ignore_index=True)
+
+    def adversarios_de(self, nome, min_jogos=1):
+        with self.lock:
+            linhas = [[nome, b] + l for b, l in self.adversarios.get(nome, {}).items() if l[0] >= min_jogos]
+        return _tabela(linhas, "Adversario").sort_values(["Saldo_Elo", "Jogos"], ascending=False, ignore_index=True)
+
+    def duplas(self, min_jogos=1):
+        """Todas as parcerias do grupo (cada dupla uma vez), da melhor para a pior."""
+        with self.lock:
+            linhas = [[a, b] + l for a, linha in self.parceiros.items() for b, l in linha.items()
+                      if a < b and l[0] >= min_jogos]
+        return _tabela(linhas, "Parceiro").sort_values(["Saldo_Elo", "Jogos"], ascending=False, ignore_index=True)
+
+    def confrontos(self, min_jogos=1):
+        """Todos os confrontos do grupo, cada um visto por quem leva vantagem."""
+        with self.lock:
+            linhas = [[a, b] + l for a, linha in self.adversarios.items() for b, l in linha.items()
+                      if l[0] >= min_jogos and (l[2] > 0 or (l[2] == 0 and a < b))]
+        return _tabela(linhas, "Adversario").sort_values(["Saldo_Elo", "Jogos"], ascending=False, ignore_index=True)
+
+
+class MatrizesSinergia:
+    def __init__(self, armazem):
+        """armazem: ArmazemEstado (prefixo 'sinergia') onde cada grupo é salvo."""
+        self._armazem = armazem
+        self._grupos = {}
+        self._lock = threading.Lock()
+
+    def do_grupo(self, grupo):
+        """SinergiaGrupo do grupo (da memória ou do disco), ou None se ainda não foi montada."""
+        sinergia = self._grupos.get(grupo)
+        if sinergia is None:
+            # Fora do lock: ao gravar, o armazém chama `serializar` segurando o lock dele
+            dados, _ = self._armazem.carregar(grupo)
+            if dados is None: return None
+            with self._lock: sinergia = self._grupos.setdefault(grupo, SinergiaGrupo.de_dict(dados))
+        return sinergia
+
+    def registrar(self, grupo, vencedores, perdedores, pontos):
+        """Soma a partida se o grupo já tem matrizes; senão `reconstruir` a incluirá pelo histórico."""
+        sinergia = self.do_grupo(grupo)
+        if sinergia is None: return
+        sinergia.registrar(vencedores, perdedores, pontos)
+        self._salvar(grupo, sinergia)
+
+    def reconstruir(self, grupo, indice):
+        """Refaz as matrizes do grupo a partir do IndiceHistorico."""
+        partidas = indice.partidas[indice.partidas['Grupo'] == grupo]
+        participacoes = indice.participacoes[indice.participacoes['Grupo'] == grupo]
+        sinergia = SinergiaGrupo.de_historico(partidas, participacoes)
+        with self._lock: self._grupos[grupo] = sinergia
+        self._salvar(grupo, sinergia)
+        return sinergia
+
+    def _salvar(self, grupo, sinergia):
+        # A conversão para JSON fica para a gravação (debounce): várias partidas seguidas, uma conversão
+        self._armazem.salvar(grupo, sinergia.serializar, 0, forcar=True)
@@ -0,0 +1,112 @@
+"""
+Montagem das tabelas Plotly (ranking e histórico).
+
+Cores e larguras são calculadas coluna a coluna com operações vetorizadas,
+e só a página visível é enviada para o navegador.
+"""
+import numpy as np
+
+COR_FUNDO = "#262730"
+COR_TEXTO = "white"
+
+# (trecho da patente, fundo, texto) - a primeira que casar vale
+CORES_PATENTE = [
+    ("Iniciante", "#f1c40f", "black"),
+    ("Amador", "#d4ac0d", "black"),
+    ("Intermediário", "#1abc9c", "black"),
+    ("Avançado", "#3498db", "black"),
+    ("Lenda", "#2c3e50", "white"),
+]
+
+# Coluna -> (marcadores no campo Vencedor, fundo, texto)
+CORES_VENCEDOR = {
+    "Time A": (("Time A", "Time_A"), "#d1e7dd", "black"),  # Verde claro
+    "Time B": (("Time B", "Time_B"), "#fff3cd", "black"),  # Amarelo claro
+}
+
+
+def paginar(df, pagina, linhas_por_pagina):
+    """Fatia da página (1-based) e total de páginas."""
+    total = max(1, -(-len(df) // linhas_por_pagina))
+    pagina = min(max(1, int(pagina)), total)
+    inicio = (pagina - 1) * linhas_por_pagina
+    return df.iloc[inicio:inicio + linhas_por_pagina], total
+
+
+def calcular_larguras(df, colunas_mostrar):
+    # --- CÁLCULO AGRESSIVO DE LARGURA (Auto-Fit) ---
+    larguras = []
+    for col in colunas_mostrar:
+        # O tamanho final é o maior entre cabeçalho e o maior item da coluna
+        len_content = int(df[col].astype(str).str.len().max()) if len(df) else 0
+        final_len = max(len(str(col)), len_content)
+        # Colunas muito curtas (ex: Elo, Pos) precisam de um pouco mais de "ar";
+        # colunas longas (Nomes) são comprimidas levemente
+        larguras.append(final_len * 1.5 if final_len < 5 else final_len * 0.9)
+    return larguras
+
+
+def calcular_cores(df, colunas_mostrar, destacar_vencedor=False):
+    """Retorna (fill_colors, font_colors), uma lista por coluna."""
+    n = len(df)
+    fundo = np.full(n, COR_FUNDO, dtype=object)
+    texto = np.full(n, COR_TEXTO, dtype=object)
+
+    # 1. Patentes (Prioridade Baixa) - vale para a linha inteira
+    if 'Patente' in df.columns:
+        pat = df['Patente'].astype(str)
+        livre = np.ones(n, dtype=bool)
+        for trecho, cor_fundo, cor_texto in CORES_PATENTE:
+            casou = pat.str.contains(trecho, regex=False).to_numpy() & livre
+            fundo[casou] = cor_fundo
+            texto[casou] = cor_texto
+            livre &= ~casou
+
+    fill_colors, font_colors = [], []
+    venc = df['Vencedor'].astype(str) if destacar_vencedor and 'Vencedor' in df.columns else None
+    for col in colunas_mostrar:
+        # 2. Vencedor (Prioridade Alta - Sobrescreve Patente) só nas colunas dos times
+        if venc is not None and col in CORES_VENCEDOR:
+            marcadores, cor_fundo, cor_texto = CORES_VENCEDOR[col]
+            casou = np.zeros(n, dtype=bool)
+            for m in marcadores: casou |= venc.str.contains(m, regex=False).to_numpy()
+            fill_colors.append(np.where(casou, cor_fundo, fundo).tolist())
+            font_colors.append(np.where(casou, cor_texto, texto).tolist())
+        else:
+            fill_colors.append(fundo.tolist())
+            font_colors.append(texto.tolist())
+    return fill_colors, font_colors
+
+
+def montar_figura(df, colunas_mostrar, destacar_vencedor=False, altura=400):
+    """Figura Plotly pronta para `st.plotly_chart` (df já deve ser só a página a exibir)."""
+    import plotly.graph_objects as go  # importado só quando alguma tabela é desenhada (partida a frio mais rápida)
+
+    larguras = calcular_larguras(df, colunas_mostrar)
+    fill_colors, font_colors = calcular_cores(df, colunas_mostrar, destacar_vencedor)
+
+    fig = go.Figure(data=[go.Table(
+        columnwidth=larguras,
+        header=dict(
+            values=list(colunas_mostrar),
+            fill_color='#0e1117',  # Cabeçalho Preto
+            font=dict(color='white', size=12),
+            align='left'
+        ),
+        cells=dict(
+            values=[df[k].tolist() for k in colunas_mostrar],
+            fill_color=fill_colors,
+            font=dict(color=font_colors, size=11),
+            align='left',
+            height=25  # Altura reduzida para compactar verticalmente também
+        )
+    )])
+
+    # Remove margens para a tabela ocupar tudo e ficar compacta na foto
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=altura,
+        paper_bgcolor="#0e1117",  # Fundo preto para combinar com Dark Mode
+        autosize=True
+    )
+    return fig
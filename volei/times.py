@@ -0,0 +1,54 @@
+"""
+Times em quadra: registros compactos em vez de DataFrames.
+
+Um time tem no máximo 12 jogadores, então cada `Time` guarda só listas
+paralelas (nomes, Elo e partidas de quando entrou em quadra), lidas do
+elenco pelas posições (Grupo, Nome) sem montar DataFrame. Substituir,
+desenhar, salvar (só os nomes) e aplicar o resultado trabalham direto nelas.
+"""
+
+
+class Time:
+    __slots__ = ("nomes", "elos", "partidas")
+
+    def __init__(self, nomes=(), elos=(), partidas=()):
+        self.nomes = list(nomes)
+        self.elos = list(elos)
+        self.partidas = list(partidas)
+
+    @classmethod
+    def do_elenco(cls, elenco, grupo, nomes):
+        """Time com os valores atuais do elenco, na ordem pedida (nomes desconhecidos ficam de fora)."""
+        return cls(*elenco.valores(grupo, nomes))
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __iter__(self):
+        """Pares (nome, elo), na ordem do time."""
+        return zip(self.nomes, self.elos)
+
+    def __contains__(self, nome):
+        return nome in self.nomes
+
+    def __eq__(self, outro):
+        return isinstance(outro, Time) and (self.nomes, self.elos, self.partidas) == (outro.nomes, outro.elos, outro.partidas)
+
+    def __repr__(self):
+        return f"Time({', '.join(f'{n} ({e:.0f})' for n, e in self)})"
+
+    def media(self):
+        return sum(self.elos) / len(self.elos) if self.elos else 0.0
+
+    def ratings(self):
+        return dict(zip(self.nomes, self.elos))
+
+    def jogos(self):
+        return dict(zip(self.nomes, self.partidas))
+
+    def substituir(self, saindo, entrando, elo, partidas):
+        """Troca `saindo` por `entrando` na mesma posição. False se `saindo` não está no time."""
+        try: i = self.nomes.index(saindo)
+        except ValueError: return False
+        self.nomes[i], self.elos[i], self.partidas[i] = entrando, float(elo), int(partidas)
+        return True